@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Benchmark ExcelService against a synthetic database
+
+Seeds a throwaway SQLite database with realistic form submissions, times every
+_export_* method and the full export, records peak RSS, and writes a JSON
+report so export time and memory can be compared across releases.
+
+Every step runs in its own process, so each peak RSS figure covers that step
+alone ("startup" is the interpreter plus imports, common to all of them).
+
+Usage:
+    python benchmark_excel_export.py                      # 1k and 100k rows per table
+    python benchmark_excel_export.py --rows 1000,100000,1000000 --output report.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+SEED_BATCH_SIZE = 10000
+
+# Export steps, in the order they run; each runs in a fresh process
+STARTUP_SCENARIO = "startup (imports only)"
+EXPORT_METHODS = (
+    "_export_newsletter", "_export_contact_forms", "_export_demo_requests",
+    "_export_brochure_forms", "_export_product_profile_forms", "_export_talk_to_sales_forms",
+)
+EXPORT_ALL_SCENARIOS = (
+    "export_all_forms (full rebuild)",
+    "export_all_forms (all sheets cached)",
+    "export_all_forms (newsletter dirty)",
+    "export_all_forms (one new newsletter row)",
+)
+
+FIRST_NAMES = ["James", "Maria", "Ahmed", "Li", "Sofia", "David", "Fatima", "John", "Aisha", "Carlos", "Emma", "Raj"]
+LAST_NAMES = ["Smith", "Garcia", "Khan", "Chen", "Rossi", "Miller", "Ali", "Johnson", "Patel", "Lopez", "Brown", "Nguyen"]
+COMPANIES = [
+    "Oriental Rug Gallery", "Loom & Weave Imports", "Heritage Carpets LLC", "Modern Home Decor",
+    "Atlas Floor Coverings", "Silk Road Rugs Inc.", "Urban Textiles", "Nomad Rug Co."
+]
+JOB_ROLES = ["Owner", "Operations Manager", "CFO", "Warehouse Supervisor", "IT Director", None]
+INDUSTRIES = ["Area Rugs", "Home Furnishing", "Broadloom", "Home Decor", None]
+COMPANY_SIZES = ["1-10", "11-50", "51-200", "201-500", "500+", None]
+SYSTEMS = ["QuickBooks", "SAP Business One", "NetSuite", "Excel spreadsheets", "In-house system", None]
+TIMELINES = ["Immediately", "1-3 months", "3-6 months", "6-12 months", None]
+MESSAGE_WORDS = (
+    "we are looking for an erp that handles inventory across multiple warehouses edi with "
+    "major retailers serialized rugs broadloom cutting orders shipping integrations and "
+    "accounts receivable please share pricing and schedule a demo for our team"
+).split()
+
+
+def _person(rng):
+    first = rng.choice(FIRST_NAMES)
+    last = rng.choice(LAST_NAMES)
+    email = f"{first}.{last}{rng.randint(1, 99999)}@example.com".lower()
+    phone = f"+1 ({rng.randint(200, 999)}) {rng.randint(200, 999)}-{rng.randint(1000, 9999)}"
+    return first, last, email, phone
+
+
+def _message(rng, max_words=60):
+    return " ".join(rng.choice(MESSAGE_WORDS) for _ in range(rng.randint(5, max_words))).capitalize() + "."
+
+
+def _timestamp(rng, start):
+    return start + timedelta(seconds=rng.randint(0, 2 * 365 * 24 * 3600))
+
+
+def _fake_rows(model_name, count, rng, start):
+    """Generate `count` realistic rows for one model"""
+    for _ in range(count):
+        first, last, email, phone = _person(rng)
+        company = rng.choice(COMPANIES)
+        submitted_at = _timestamp(rng, start)
+        if model_name == "NewsletterSubscription":
+            yield {"email": email, "subscribed_at": submitted_at}
+        elif model_name == "ContactForm":
+            # Roughly half are demo requests (demo_date set) - they land on a separate sheet
+            demo_date = (submitted_at + timedelta(days=rng.randint(1, 30))).strftime("%Y-%m-%d") if rng.random() < 0.5 else None
+            yield {
+                "first_name": first, "last_name": last, "email": email, "phone": phone,
+                "company": company, "message": _message(rng), "demo_date": demo_date,
+                "submitted_at": submitted_at,
+            }
+        elif model_name == "BrochureForm":
+            yield {
+                "full_name": f"{first} {last}", "email": email, "company": company, "phone": phone,
+                "job_role": rng.choice(JOB_ROLES), "agreed_to_marketing": True, "submitted_at": submitted_at,
+            }
+        elif model_name == "ProductProfileForm":
+            yield {
+                "first_name": first, "last_name": last, "email": email, "phone": phone,
+                "job_title": rng.choice(JOB_ROLES), "company_name": company,
+                "industry": rng.choice(INDUSTRIES), "company_size": rng.choice(COMPANY_SIZES),
+                "website": f"https://www.{company.split()[0].lower()}.example.com",
+                "address": f"{rng.randint(1, 999)} West {rng.randint(1, 99)} Street, New York, NY",
+                "current_system": rng.choice(SYSTEMS), "warehouses": rng.randint(1, 12),
+                "users": rng.randint(2, 150), "requirements": _message(rng, 40),
+                "timeline": rng.choice(TIMELINES), "submitted_at": submitted_at,
+            }
+        elif model_name == "TalkToSalesForm":
+            yield {
+                "name": f"{first} {last}", "email": email, "phone": phone, "company": company,
+                "message": _message(rng), "current_system": rng.choice(SYSTEMS),
+                "warehouses": rng.randint(1, 12), "users": rng.randint(2, 150),
+                "requirements": _message(rng, 40), "timeline": rng.choice(TIMELINES),
+                "submitted_at": submitted_at,
+            }
+
+
+def _peak_rss_bytes():
+    """Peak resident set size of this process, or None where unsupported"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset
+        except (ImportError, AttributeError):
+            return None
+
+
+def _seed_database(db_path, rows_per_table, seed):
+    """Child process: create and fill the benchmark database"""
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    from sqlalchemy import insert
+    import database
+
+    database.init_db()
+    rng = random.Random(seed)
+    start = datetime(2023, 1, 1)
+    started = time.perf_counter()
+    db = database.SessionLocal()
+    try:
+        for model in (
+            database.NewsletterSubscription, database.ContactForm, database.BrochureForm,
+            database.ProductProfileForm, database.TalkToSalesForm
+        ):
+            batch = []
+            for row in _fake_rows(model.__name__, rows_per_table, rng, start):
+                batch.append(row)
+                if len(batch) >= SEED_BATCH_SIZE:
+                    db.execute(insert(model), batch)
+                    batch = []
+            if batch:
+                db.execute(insert(model), batch)
+            db.commit()
+    finally:
+        db.close()
+    return time.perf_counter() - started
+
+
+def _run_scenario(db_path, export_dir, scenario):
+    """Child process: run one export step against the seeded database.
+
+    Each scenario gets a fresh process, so the peak RSS it reports belongs to
+    that step alone; the workbook and sheet cache on disk carry over from the
+    scenarios before it.
+    """
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    from openpyxl import Workbook
+    import database
+    from services.excel_service import ExcelService, mark_sheets_dirty
+
+    excel_service = ExcelService(excel_dir=export_dir)
+    seconds = None
+    file_path = None
+    db = database.SessionLocal()
+    try:
+        if scenario in EXPORT_METHODS:
+            # One sheet on its own, straight from the database
+            wb = Workbook(write_only=True)
+            started = time.perf_counter()
+            getattr(excel_service, scenario)(wb, db, use_cache=False)
+            seconds = time.perf_counter() - started
+            # Finish the throwaway sheet so its temp file is released cleanly
+            for ws in wb.worksheets:
+                ws.close()
+        elif scenario != STARTUP_SCENARIO:
+            if scenario == "export_all_forms (newsletter dirty)":
+                mark_sheets_dirty("newsletter", excel_dir=export_dir)
+            elif scenario == "export_all_forms (one new newsletter row)":
+                db.add(database.NewsletterSubscription(email="benchmark@example.com", subscribed_at=datetime.now()))
+                db.commit()
+                mark_sheets_dirty("newsletter", excel_dir=export_dir)
+            started = time.perf_counter()
+            file_path = excel_service.export_all_forms(db, full_rebuild=scenario == "export_all_forms (full rebuild)")
+            seconds = time.perf_counter() - started
+    finally:
+        db.close()
+
+    return {
+        "mode": excel_service.mode,
+        "seconds": seconds,
+        "peak_rss_bytes": _peak_rss_bytes(),
+        "workbook_size_bytes": os.path.getsize(file_path) if file_path else None,
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=backend_dir,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _in_subprocess(ctx, func, *args):
+    """Run func(*args) in a new spawned process and return its result"""
+    with ctx.Pool(1) as pool:
+        return pool.apply(func, args)
+
+
+def benchmark(rows_per_table, workdir, seed):
+    """Seed, then run every export scenario in its own process so each peak RSS is per step"""
+    run_dir = Path(tempfile.mkdtemp(prefix=f"bench_{rows_per_table}_", dir=workdir))
+    db_path = run_dir / "bench.db"
+    export_dir = run_dir / "exports"
+    ctx = multiprocessing.get_context("spawn")
+    try:
+        seed_seconds = _in_subprocess(ctx, _seed_database, str(db_path), rows_per_table, seed)
+        timings = {}
+        peak_rss = {}
+        workbook_size = None
+        mode = None
+        for scenario in (STARTUP_SCENARIO,) + EXPORT_METHODS + EXPORT_ALL_SCENARIOS:
+            outcome = _in_subprocess(ctx, _run_scenario, str(db_path), str(export_dir), scenario)
+            mode = outcome["mode"]
+            peak_rss[scenario] = outcome["peak_rss_bytes"]
+            if outcome["seconds"] is not None:
+                timings[scenario] = round(outcome["seconds"], 4)
+            if outcome["workbook_size_bytes"] is not None:
+                workbook_size = outcome["workbook_size_bytes"]
+        return {
+            "mode": mode,
+            "rows_per_table": rows_per_table,
+            "seed_seconds": round(seed_seconds, 4),
+            "database_size_bytes": os.path.getsize(db_path),
+            "timings_seconds": timings,
+            "peak_rss_bytes": peak_rss,
+            "workbook_size_bytes": workbook_size,
+        }
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+
+def _megabytes(value):
+    return f"{value / (1024 * 1024):.1f} MB" if value else "n/a"
+
+
+def print_summary(results):
+    print("\n" + "=" * 70)
+    print("  Excel export benchmark")
+    print("=" * 70)
+    for result in results:
+        startup = result["peak_rss_bytes"].get(STARTUP_SCENARIO)
+        print(f"\nRows per table: {result['rows_per_table']:,} (workbook {result['workbook_size_bytes'] / 1024:.0f} KB, "
+              f"{_megabytes(startup)} RSS after imports)")
+        print(f"  {'':<42} {'time':>10} {'peak RSS':>12}")
+        for name, seconds in result["timings_seconds"].items():
+            print(f"  {name:<42} {seconds:>9.3f}s {_megabytes(result['peak_rss_bytes'].get(name)):>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ExcelService exports against a synthetic database")
+    parser.add_argument("--rows", default="1000,100000",
+                        help="Comma-separated row counts per table (default: 1000,100000)")
+    parser.add_argument("--output", default="benchmark_report.json", help="Path of the JSON report")
+    parser.add_argument("--workdir", default=None, help="Directory for temporary databases (default: system temp)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for generated data")
+    args = parser.parse_args()
+
+    row_counts = [int(value.replace("_", "")) for value in args.rows.split(",") if value.strip()]
+    results = []
+    for rows_per_table in row_counts:
+        print(f"Benchmarking {rows_per_table:,} rows per table...")
+        results.append(benchmark(rows_per_table, args.workdir, args.seed))
+
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "excel_export_mode": os.getenv("EXCEL_EXPORT_MODE", "full"),
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print_summary(results)
+    print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\nBenchmark interrupted by user")
+        sys.exit(0)
@@ -88,6 +88,54 @@ class TalkToSalesForm(Base):
     timeline = Column(String, nullable=True)
     submitted_at = Column(DateTime, default=get_local_time)
 
+class EmailOutbox(Base):
+    """Outgoing email, written in the same transaction as the form row and
+    delivered by the outbox worker (services/outbox_service.py)"""
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, index=True)  # confirmation, brochure, sales_notification, ...
+    to_email = Column(String)
+    subject = Column(String)
+    body = Column(Text)
+    html_body = Column(Text, nullable=True)
+    attachments = Column(Text, nullable=True)  # JSON list of file paths
+    embedded_images = Column(Text, nullable=True)  # JSON object {cid: file path}
+    status = Column(String, default="pending", index=True)  # pending, sending, sent, dead
+    priority = Column(Integer, default=2, index=True)  # lane, 0 = user-facing first (services/send_quota.py)
+    attempts = Column(Integer, default=0)
+    throttled_attempts = Column(Integer, default=0)  # sends the provider refused for rate/quota reasons (not in attempts)
+    next_attempt_at = Column(DateTime, default=get_local_time, index=True)
+    locked_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=get_local_time)
+    sent_at = Column(DateTime, nullable=True)
+
+class DownloadLinkEvent(Base):
+    """Downloads through a signed link (one row per token)"""
+    __tablename__ = "download_link_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    token_id = Column(String, unique=True, index=True)
+    document = Column(String)
+    ref = Column(String, nullable=True)  # form row the link was sent for, e.g. "brochure:42"
+    first_downloaded_at = Column(DateTime, default=get_local_time)
+    last_downloaded_at = Column(DateTime, default=get_local_time)
+    download_count = Column(Integer, default=1)
+
+class AdminDigestEntry(Base):
+    """Admin notification held back for the next digest email (services/digest_service.py)"""
+    __tablename__ = "admin_digest_entries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    digest_key = Column(String, index=True)  # form slug, e.g. "newsletter"
+    form_type = Column(String)  # heading shown in the digest, e.g. "Newsletter Subscription"
+    form_data = Column(Text)  # JSON object, as passed to compose_form_notification
+    status = Column(String, default="pending", index=True)  # pending, flushed
+    outbox_id = Column(Integer, nullable=True)  # email_outbox row of the digest that included it
+    created_at = Column(DateTime, default=get_local_time)
+    flushed_at = Column(DateTime, nullable=True)
+
 # Create tables
 def init_db():
     Base.metadata.create_all(bind=engine)
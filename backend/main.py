@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, EmailStr
 from typing import Optional, List
@@ -7,9 +7,17 @@ import os
 from dotenv import load_dotenv
 from pathlib import Path
 
-from services.email_service import EmailService
+from services.email_service import EmailService, shutdown_email_executor
 from services.chatbot_service import ChatbotService
-from routers import forms, chatbot, download
+from routers import forms, chatbot, download, metrics
+from services.export_scheduler import get_export_scheduler
+from services.api_auth import require_export_api_key
+from services.smtp_pool import close_smtp_pools
+from services.outbox_service import get_email_outbox
+from services.digest_service import get_admin_digest
+from services.chatbot_cache import close_chatbot_cache
+from services.knowledge_base import get_knowledge_base
+from services.chat_history import get_chat_history_budget
 from database import init_db
 
 # Load environment variables - specify the path explicitly
@@ -58,9 +66,32 @@ def run_migration():
     except Exception as e:
         print(f"Migration warning: {e}")
 
+def migrate_email_outbox():
+    """Add email_outbox columns introduced after the table was first created"""
+    from sqlalchemy import inspect, text
+    from database import engine
+    from services.send_quota import KIND_PRIORITIES, LANE_INTERNAL
+
+    try:
+        columns = [column["name"] for column in inspect(engine).get_columns("email_outbox")]
+        with engine.begin() as conn:
+            if "priority" not in columns:
+                conn.execute(text(f"ALTER TABLE email_outbox ADD COLUMN priority INTEGER DEFAULT {LANE_INTERNAL}"))
+                # Put queued user-facing and sales emails in their lanes
+                for kind, priority in KIND_PRIORITIES.items():
+                    conn.execute(text("UPDATE email_outbox SET priority = :priority WHERE kind = :kind"), {"priority": priority, "kind": kind})
+                conn.execute(text("CREATE INDEX IF NOT EXISTS ix_email_outbox_priority ON email_outbox (priority)"))
+            if "throttled_attempts" not in columns:
+                conn.execute(text("ALTER TABLE email_outbox ADD COLUMN throttled_attempts INTEGER DEFAULT 0"))
+    except Exception as e:
+        print(f"Migration warning (email_outbox): {e}")
+
 # Run migration on startup
 run_migration()
 
+# Add email_outbox columns (priority lanes, throttled retries) to existing databases
+migrate_email_outbox()
+
 app = FastAPI(
     title="SPARS Backend API",
     description="Backend API for SPARS website forms and chatbot",
@@ -81,6 +112,54 @@ app.add_middleware(
 app.include_router(forms.router, prefix="/api", tags=["forms"])
 app.include_router(chatbot.router, prefix="/api", tags=["chatbot"])
 app.include_router(download.router, prefix="/api/download", tags=["download"])
+app.include_router(metrics.router, prefix="/api/metrics", tags=["metrics"], dependencies=[Depends(require_export_api_key)])
+
+@app.on_event("startup")
+async def start_email_outbox():
+    """Start delivering queued emails (including any left over from before a restart)"""
+    get_email_outbox().start()
+
+@app.on_event("startup")
+async def start_admin_digest():
+    """Start flushing buffered admin notifications (when ADMIN_DIGEST_FORMS is set)"""
+    get_admin_digest().start()
+
+@app.on_event("startup")
+def build_chatbot_knowledge_base():
+    """Split and index the chatbot knowledge base once, before the first question"""
+    get_knowledge_base()
+
+@app.on_event("startup")
+def load_chat_tokenizer():
+    """Load the tokenizer used to fit chat history into CHATBOT_TOKEN_BUDGET"""
+    get_chat_history_budget()
+
+@app.on_event("shutdown")
+async def stop_admin_digest():
+    """Stop the digest loop; buffered notifications are kept for the next start"""
+    await get_admin_digest().stop()
+
+@app.on_event("shutdown")
+async def stop_email_outbox():
+    """Stop claiming new emails and let in-flight sends finish"""
+    await get_email_outbox().stop()
+
+@app.on_event("shutdown")
+async def shutdown_chatbot():
+    """Close pooled OpenAI API connections and the answer cache's disk tier"""
+    await chatbot.close_chatbot_service()
+    close_chatbot_cache()
+
+@app.on_event("shutdown")
+def shutdown_export_scheduler():
+    """Write out any Excel export still waiting in the coalescing window and stop the export worker"""
+    get_export_scheduler().shutdown()
+
+@app.on_event("shutdown")
+def shutdown_email_delivery():
+    """Let in-flight sends finish, then close pooled SMTP sessions with QUIT"""
+    shutdown_email_executor()
+    close_smtp_pools()
 
 @app.get("/")
 async def root():
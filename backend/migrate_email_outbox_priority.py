@@ -0,0 +1,66 @@
+"""
+Migration script to add the priority lane and throttled attempts columns to the email_outbox table
+Run this once to update the existing database schema
+"""
+import sqlite3
+import os
+from pathlib import Path
+
+# Get database path (DATABASE_URL if it points at SQLite, else the default file)
+database_url = os.getenv("DATABASE_URL", "")
+if database_url.startswith("sqlite:///"):
+    db_path = Path(database_url[len("sqlite:///"):])
+else:
+    db_path = Path(__file__).parent / "spars_forms.db"
+
+if not db_path.exists():
+    print(f"Database not found at {db_path}. It will be created automatically on next server start.")
+    exit(0)
+
+# Connect to database
+conn = sqlite3.connect(str(db_path))
+cursor = conn.cursor()
+
+# Same lanes as services/send_quota.py: 0 = user-facing, 1 = sales, 2 = internal
+KIND_PRIORITIES = {
+    "brochure": 0,
+    "product_profile": 0,
+    "confirmation": 0,
+    "sales_notification": 1,
+}
+
+try:
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='email_outbox'")
+    if cursor.fetchone() is None:
+        print("Table email_outbox does not exist yet. It will be created automatically on next server start.")
+        exit(0)
+
+    # Check if column already exists
+    cursor.execute("PRAGMA table_info(email_outbox)")
+    columns = [row[1] for row in cursor.fetchall()]
+
+    if "priority" not in columns:
+        print("Adding column: priority")
+        cursor.execute("ALTER TABLE email_outbox ADD COLUMN priority INTEGER DEFAULT 2")
+        # Put queued user-facing and sales emails in their lanes
+        for kind, priority in KIND_PRIORITIES.items():
+            cursor.execute("UPDATE email_outbox SET priority = ? WHERE kind = ?", (priority, kind))
+    else:
+        print("Column priority already exists, skipping...")
+
+    if "throttled_attempts" not in columns:
+        print("Adding column: throttled_attempts")
+        cursor.execute("ALTER TABLE email_outbox ADD COLUMN throttled_attempts INTEGER DEFAULT 0")
+    else:
+        print("Column throttled_attempts already exists, skipping...")
+
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_email_outbox_priority ON email_outbox (priority)")
+
+    conn.commit()
+    print("Migration completed successfully!")
+
+except Exception as e:
+    print(f"Error during migration: {e}")
+    conn.rollback()
+finally:
+    conn.close()
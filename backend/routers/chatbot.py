@@ -1,4 +1,7 @@
+import json
+
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict
 
@@ -17,6 +20,13 @@ def get_chatbot_service():
         _chatbot_service = ChatbotService()
     return _chatbot_service
 
+async def close_chatbot_service():
+    """Close the chatbot's pooled API connections, if it was ever used"""
+    global _chatbot_service
+    if _chatbot_service is not None:
+        await _chatbot_service.close()
+        _chatbot_service = None
+
 class ChatMessage(BaseModel):
     message: str
     conversation_history: Optional[List[Dict[str, str]]] = None
@@ -36,6 +46,10 @@ async def chat_with_bot(chat_message: ChatMessage):
             )
         
         chatbot_service = get_chatbot_service()
+        try:
+            chatbot_service.check_message(chat_message.message)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         response = await chatbot_service.get_response(
             chat_message.message,
             chat_message.conversation_history
@@ -53,3 +67,47 @@ async def chat_with_bot(chat_message: ChatMessage):
             detail=f"Error processing chat message: {str(e)}"
         )
 
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/chatbot/stream")
+async def stream_chat_with_bot(chat_message: ChatMessage):
+    """Stream the chatbot reply as Server-Sent Events.
+
+    Events: "token" (a piece of the reply, in order), "fallback" (the whole
+    canned reply when the model is unavailable), "error" (the reply broke off)
+    and a final "done". Each event's data is JSON with a "content" field.
+    If the client disconnects, the response is cancelled and the model call
+    with it.
+    """
+    if not chat_message.message or not chat_message.message.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="Message cannot be empty"
+        )
+
+    chatbot_service = get_chatbot_service()
+    try:
+        chatbot_service.check_message(chat_message.message)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def event_stream():
+        pieces = chatbot_service.stream_response(
+            chat_message.message,
+            chat_message.conversation_history
+        )
+        try:
+            async for event, content in pieces:
+                yield _sse_event(event, {"content": content})
+            yield _sse_event("done", {"success": True})
+        finally:
+            # Runs on disconnect too (the response task is cancelled)
+            await pieces.aclose()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,7 +1,31 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+import csv
+import hashlib
+import io
+import json
 import os
+import shutil
+import tempfile
 from pathlib import Path
+from datetime import datetime
+from typing import Optional
+
+from database import (
+    SessionLocal,
+    NewsletterSubscription,
+    ContactForm,
+    BrochureForm,
+    ProductProfileForm,
+    TalkToSalesForm,
+    DownloadLinkEvent,
+    get_local_time
+)
+from services.api_auth import require_export_api_key
+from services.export_scheduler import get_export_scheduler
+from services.download_links import ExpiredDownloadLink, InvalidDownloadLink, verify_download_token
 
 router = APIRouter()
 
@@ -28,6 +52,97 @@ PRODUCT_PROFILE_PDF = find_pdf([
     "SPARS-ProductProfile.pdf"
 ])
 
+# Snapshots of the workbook served to clients, one file per data fingerprint
+EXCEL_DOWNLOAD_DIR = Path(__file__).parent.parent / "exports" / ".download_cache"
+EXCEL_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# Older snapshots kept around for downloads that may still be streaming
+EXCEL_SNAPSHOTS_KEPT = 3
+
+# Raw form tables available as CSV / NDJSON, keyed by the same names as the form endpoints
+FORM_EXPORTS = {
+    "newsletter": (NewsletterSubscription, NewsletterSubscription.subscribed_at),
+    "contact": (ContactForm, ContactForm.submitted_at),
+    "brochure": (BrochureForm, BrochureForm.submitted_at),
+    "product-profile": (ProductProfileForm, ProductProfileForm.submitted_at),
+    "talk-to-sales": (TalkToSalesForm, TalkToSalesForm.submitted_at),
+}
+# Rows fetched from the cursor (and sent as one chunk) at a time
+FORM_EXPORT_BATCH_SIZE = 1000
+
+def _fingerprint_etag(fingerprint: dict, order: str) -> str:
+    """Strong ETag derived from the data fingerprint and row ordering"""
+    digest = hashlib.sha256(json.dumps([fingerprint, order], sort_keys=True).encode()).hexdigest()[:24]
+    return f'"{digest}"'
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+def _prune_excel_snapshots(keep: Path):
+    snapshots = sorted(EXCEL_DOWNLOAD_DIR.glob("SPARS_Excel_DB.*.xlsx"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in snapshots[EXCEL_SNAPSHOTS_KEPT:]:
+        if old != keep:
+            try:
+                old.unlink()
+            except OSError:
+                pass  # Still being served (Windows) - removed on a later download
+
+def _to_local_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Timestamps are stored as naive server-local time"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def _stream_form_rows(form_type: str, export_format: str, start: Optional[datetime], end: Optional[datetime]):
+    """Yield CSV or NDJSON chunks for one form table, straight from the database cursor.
+
+    Opens its own session so it stays valid for the whole response, and never
+    holds more than FORM_EXPORT_BATCH_SIZE rows in memory.
+    """
+    model, timestamp = FORM_EXPORTS[form_type]
+    columns = list(model.__table__.columns)
+    names = [column.name for column in columns]
+
+    stmt = select(*columns)
+    if start is not None:
+        stmt = stmt.where(timestamp >= start)
+    if end is not None:
+        stmt = stmt.where(timestamp < end)
+    stmt = stmt.order_by(model.id.asc()).execution_options(yield_per=FORM_EXPORT_BATCH_SIZE)
+
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt)
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(names)
+            yield buffer.getvalue()
+            for rows in result.partitions():
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(
+                    [_json_value(value) if value is not None else "" for value in row]
+                    for row in rows
+                )
+                yield buffer.getvalue()
+        else:
+            for rows in result.partitions():
+                yield "".join(
+                    json.dumps(dict(zip(names, (_json_value(value) for value in row)))) + "\n"
+                    for row in rows
+                )
+    finally:
+        db.close()
+
 @router.get("/brochure")
 async def download_brochure():
     """Download brochure PDF"""
@@ -52,3 +167,130 @@ async def download_product_profile():
         filename="SPARS-Product-Profile.pdf"
     )
 
+def _record_link_download(claims: dict):
+    """Track downloads per link token (first download time, count); runs after the response"""
+    db = SessionLocal()
+    try:
+        db.add(DownloadLinkEvent(token_id=claims["jti"], document=claims["doc"], ref=claims.get("ref")))
+        db.commit()
+        print(f"First download of {claims['doc']} link {claims['jti']} ({claims.get('ref')})")
+    except IntegrityError:
+        # Token downloaded before - just bump the counter
+        db.rollback()
+        db.execute(
+            update(DownloadLinkEvent)
+            .where(DownloadLinkEvent.token_id == claims["jti"])
+            .values(download_count=DownloadLinkEvent.download_count + 1, last_downloaded_at=get_local_time())
+        )
+        db.commit()
+    except Exception as e:
+        print(f"Error recording download of link {claims.get('jti')}: {str(e)}")
+    finally:
+        db.close()
+
+@router.get("/link/{token}")
+async def download_with_link(token: str, background_tasks: BackgroundTasks):
+    """Download a PDF through a signed, expiring link sent by email.
+
+    The token is verified from its HMAC signature alone; the download is
+    recorded in the background after the response has been started.
+    """
+    try:
+        claims = verify_download_token(token)
+    except ExpiredDownloadLink:
+        raise HTTPException(status_code=410, detail="This download link has expired. Please request the document again.")
+    except InvalidDownloadLink:
+        raise HTTPException(status_code=404, detail="Invalid download link")
+
+    if claims["doc"] == "brochure":
+        path, filename = BROCHURE_PDF, "SPARS-Brochure.pdf"
+    else:
+        path, filename = PRODUCT_PROFILE_PDF, "SPARS-Product-Profile.pdf"
+    if not path or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    background_tasks.add_task(_record_link_download, claims)
+    return FileResponse(
+        path,
+        media_type="application/pdf",
+        filename=filename,
+        headers={"Cache-Control": "private, no-store", "X-Robots-Tag": "noindex"}
+    )
+
+@router.get("/excel")
+def download_excel(request: Request, _: None = Depends(require_export_api_key)):
+    """Download the forms workbook (requires X-API-Key).
+
+    The workbook is regenerated only when the data fingerprint (row count and
+    max id per table) has changed since the last export; clients sending the
+    previous ETag in If-None-Match get 304 Not Modified.
+    """
+    scheduler = get_export_scheduler()
+    excel_service = scheduler.excel_service
+
+    db = SessionLocal()
+    try:
+        current = excel_service.get_fingerprint(db)
+    finally:
+        db.close()
+
+    etag = _fingerprint_etag(current, excel_service.order)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    with scheduler.export_lock():
+        exported = excel_service.get_exported_fingerprint()
+    if exported == current and _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if exported != current:
+        # Make sure every table that moved is re-read, even rows saved without a dirty marker
+        excel_service.mark_changed_sheets_dirty(exported, current)
+        if scheduler.run_now() is None:
+            raise HTTPException(status_code=500, detail="Error generating Excel export")
+
+    # Snapshot the workbook under the export lock so the copy matches its fingerprint
+    EXCEL_DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    with scheduler.export_lock():
+        exported = excel_service.get_exported_fingerprint()
+        if exported is None:
+            raise HTTPException(status_code=500, detail="Error generating Excel export")
+        etag = _fingerprint_etag(exported, excel_service.order)
+        headers["ETag"] = etag
+        etag_value = etag.strip('"')
+        snapshot = EXCEL_DOWNLOAD_DIR / f"SPARS_Excel_DB.{etag_value}.xlsx"
+        if not snapshot.exists():
+            fd, tmp_path = tempfile.mkstemp(dir=str(EXCEL_DOWNLOAD_DIR), suffix=".tmp")
+            os.close(fd)
+            shutil.copyfile(excel_service.excel_dir / excel_service.filename, tmp_path)
+            os.replace(tmp_path, snapshot)
+    _prune_excel_snapshots(snapshot)
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(snapshot, media_type=EXCEL_MEDIA_TYPE, filename="SPARS_Excel_DB.xlsx", headers=headers)
+
+@router.get("/forms/{form_type}")
+def export_form_table(
+    form_type: str,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    submitted_from: Optional[datetime] = Query(None, description="Include rows submitted at or after this time"),
+    submitted_to: Optional[datetime] = Query(None, description="Include rows submitted before this time"),
+    _: None = Depends(require_export_api_key)
+):
+    """Stream one form table as CSV or NDJSON (requires X-API-Key).
+
+    The submitted_from / submitted_to range is applied in SQL, and rows are
+    sent as they are read, so large exports start immediately.
+    """
+    if form_type not in FORM_EXPORTS:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown form type '{form_type}'. Use one of: {', '.join(FORM_EXPORTS)}"
+        )
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"spars-{form_type}.{format}"
+    return StreamingResponse(
+        _stream_form_rows(form_type, format, _to_local_naive(submitted_from), _to_local_naive(submitted_to)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel, EmailStr
 from typing import Optional
 from datetime import datetime
@@ -8,7 +8,10 @@ from sqlalchemy.orm import Session
 
 from services.email_service import EmailService
 from services.db_service import DatabaseService
-from services.excel_service import ExcelService
+from services.export_scheduler import get_export_scheduler
+from services.outbox_service import enqueue_email, get_email_outbox
+from services.digest_service import get_admin_digest
+from services.download_links import create_download_url, download_links_enabled
 from database import get_db, init_db
 
 router = APIRouter()
@@ -17,7 +20,6 @@ router = APIRouter()
 # This ensures .env is loaded before services are instantiated
 _email_service = None
 _db_service = None
-_excel_service = None
 
 def get_email_service():
     """Get or create email service instance"""
@@ -33,12 +35,22 @@ def get_db_service():
         _db_service = DatabaseService()
     return _db_service
 
-def get_excel_service():
-    """Get or create excel service instance"""
-    global _excel_service
-    if _excel_service is None:
-        _excel_service = ExcelService()
-    return _excel_service
+def schedule_excel_export():
+    """Queue an Excel export, unless the workbook is only generated on demand.
+
+    Set EXCEL_EXPORT_ON_SUBMIT=false to skip per-submission exports and rely on
+    GET /api/download/excel, which regenerates the workbook when data changed.
+    """
+    if os.getenv("EXCEL_EXPORT_ON_SUBMIT", "true").lower() == "true":
+        get_export_scheduler().trigger()
+
+def commit_submission(db: Session):
+    """Commit the form row together with its queued emails, then wake the
+    outbox and digest workers and schedule the Excel export"""
+    db.commit()
+    get_email_outbox().notify()
+    get_admin_digest().notify()
+    schedule_excel_export()
 
 # PDF file paths (you'll need to add these files to backend/pdfs/)
 pdfs_dir = os.path.join(os.path.dirname(__file__), "..", "pdfs")
@@ -146,37 +158,32 @@ class TalkToSalesForm(BaseModel):
 @router.post("/newsletter")
 async def subscribe_newsletter(
     subscription: NewsletterSubscription,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Subscribe to newsletter"""
     try:
-        # Save to database
-        get_db_service().save_newsletter(db, subscription.email)
-        
-        # Export to Excel in background
-        background_tasks.add_task(get_excel_service().export_all_forms, db)
+        # Save to database; emails are queued in the same transaction
+        get_db_service().save_newsletter(db, subscription.email, commit=False)
         
         form_data = {
             "email": subscription.email,
             "subscribed_at": datetime.now().isoformat()
         }
+        email_service = get_email_service()
         
-        # Send notification to admin
-        background_tasks.add_task(
-            get_email_service().send_form_notification,
-            "Newsletter Subscription",
-            form_data
-        )
+        # Notification to admin (buffered for a digest if enabled for this form)
+        get_admin_digest().queue_notification(db, "newsletter", "Newsletter Subscription", form_data)
         
-        # Send confirmation to user
-        background_tasks.add_task(
-            get_email_service().send_confirmation_email,
+        # Confirmation to user
+        enqueue_email(db, email_service.compose_confirmation_email(
             subscription.email,
             "Newsletter Subscription",
             None,
             subscription.email.split("@")[0]  # Use email prefix as name
-        )
+        ))
+        
+        # Commit, then deliver emails and schedule the Excel export in the background
+        commit_submission(db)
         
         return {
             "success": True,
@@ -188,7 +195,6 @@ async def subscribe_newsletter(
 @router.post("/contact")
 async def submit_contact_form(
     form: ContactForm,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Submit general contact/inquiry form"""
@@ -198,7 +204,7 @@ async def submit_contact_form(
         first_name = name_parts[0] if name_parts else form.name
         last_name = name_parts[1] if len(name_parts) > 1 else ""
         
-        # Save to database
+        # Save to database; emails are queued in the same transaction
         form_data = {
             "first_name": first_name,
             "last_name": last_name,
@@ -208,10 +214,7 @@ async def submit_contact_form(
             "message": form.message,
             "demo_date": None
         }
-        get_db_service().save_contact_form(db, form_data)
-        
-        # Export to Excel in background
-        background_tasks.add_task(get_excel_service().export_all_forms, db)
+        get_db_service().save_contact_form(db, form_data, commit=False)
         
         notification_data = {
             "name": form.name,
@@ -223,29 +226,19 @@ async def submit_contact_form(
             "submitted_at": datetime.now().isoformat()
         }
         
-        # Send admin and sales notifications concurrently, then user confirmation
+        # Queue admin and sales notifications and the user confirmation with the form row
         email_service = get_email_service()
-        
-        async def send_admin_notification():
-            return await email_service.send_form_notification(f"Contact Inquiry - {form.inquiry_type}", notification_data)
-        
-        async def send_sales_notification():
-            return await email_service.send_contact_inquiry_sales_notification(notification_data)
-        
-        # Send admin and sales emails concurrently
-        background_tasks.add_task(
-            email_service.send_emails_concurrent,
-            [send_admin_notification, send_sales_notification]
-        )
-        
-        # Send confirmation to user
-        background_tasks.add_task(
-            email_service.send_confirmation_email,
+        get_admin_digest().queue_notification(db, "contact", f"Contact Inquiry - {form.inquiry_type}", notification_data)
+        enqueue_email(db, email_service.compose_contact_inquiry_sales_notification(notification_data))
+        enqueue_email(db, email_service.compose_confirmation_email(
             form.email,
             "Contact Inquiry",
             None,
             form.name
-        )
+        ))
+        
+        # Commit, then deliver emails and schedule the Excel export in the background
+        commit_submission(db)
         
         return {
             "success": True,
@@ -257,7 +250,6 @@ async def submit_contact_form(
 @router.post("/brochure")
 async def request_brochure(
     form: BrochureForm,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Request brochure download"""
@@ -268,7 +260,7 @@ async def request_brochure(
                 detail="Marketing agreement is required"
             )
         
-        # Save to database
+        # Save to database; emails are queued in the same transaction
         form_data = {
             "full_name": form.full_name,
             "email": form.email,
@@ -277,40 +269,42 @@ async def request_brochure(
             "job_role": form.job_role,
             "agreed_to_marketing": form.agreed_to_marketing
         }
-        get_db_service().save_brochure_form(db, form_data)
-        
-        # Export to Excel in background
-        background_tasks.add_task(get_excel_service().export_all_forms, db)
+        brochure = get_db_service().save_brochure_form(db, form_data, commit=False)
         
-        # Prepare PDF attachment if exists
+        # Prepare PDF attachment, or a signed download link (EMAIL_PDF_DELIVERY=link), if the PDF exists
         attachments = []
+        pdf_url = None
         if BROCHURE_PDF and os.path.exists(BROCHURE_PDF):
-            attachments.append(BROCHURE_PDF)
+            if download_links_enabled():
+                pdf_url = create_download_url("brochure", ref=f"brochure:{brochure.id}")
+            else:
+                attachments.append(BROCHURE_PDF)
             print(f"Found brochure PDF: {BROCHURE_PDF}")
         else:
             print(f"Brochure PDF not found in {pdfs_dir}")
         
         notification_data = {**form_data, "submitted_at": datetime.now().isoformat()}
         
-        # Send notification to admin
-        background_tasks.add_task(
-            get_email_service().send_form_notification,
-            "Brochure Request",
-            notification_data
-        )
+        email_service = get_email_service()
+        
+        # Notification to admin (buffered for a digest if enabled for this form)
+        get_admin_digest().queue_notification(db, "brochure", "Brochure Request", notification_data)
         
-        # Send brochure email with PDF to user
-        background_tasks.add_task(
-            get_email_service().send_brochure_email,
+        # Brochure email with PDF (or link) to user
+        enqueue_email(db, email_service.compose_brochure_email(
             form.email,
             form.full_name,
-            attachments if attachments else None
-        )
+            attachments if attachments else None,
+            pdf_url
+        ))
+        
+        # Commit, then deliver emails and schedule the Excel export in the background
+        commit_submission(db)
         
         return {
             "success": True,
             "message": "Brochure request submitted successfully. Check your email for the download link.",
-            "has_pdf": len(attachments) > 0
+            "has_pdf": len(attachments) > 0 or pdf_url is not None
         }
     except HTTPException:
         raise
@@ -320,12 +314,11 @@ async def request_brochure(
 @router.post("/product-profile")
 async def submit_product_profile(
     form: ProductProfileForm,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Submit product profile form"""
     try:
-        # Save to database
+        # Save to database; emails are queued in the same transaction
         form_data = {
             "first_name": form.first_name,
             "last_name": form.last_name,
@@ -343,15 +336,16 @@ async def submit_product_profile(
             "requirements": form.requirements,
             "timeline": form.timeline
         }
-        get_db_service().save_product_profile_form(db, form_data)
+        profile = get_db_service().save_product_profile_form(db, form_data, commit=False)
         
-        # Export to Excel in background
-        background_tasks.add_task(get_excel_service().export_all_forms, db)
-        
-        # Prepare PDF attachment if exists
+        # Prepare PDF attachment, or a signed download link (EMAIL_PDF_DELIVERY=link), if the PDF exists
         attachments = []
+        pdf_url = None
         if PRODUCT_PROFILE_PDF and os.path.exists(PRODUCT_PROFILE_PDF):
-            attachments.append(PRODUCT_PROFILE_PDF)
+            if download_links_enabled():
+                pdf_url = create_download_url("product-profile", ref=f"product-profile:{profile.id}")
+            else:
+                attachments.append(PRODUCT_PROFILE_PDF)
             print(f"Found product profile PDF: {PRODUCT_PROFILE_PDF}")
         else:
             print(f"Product profile PDF not found in {pdfs_dir}")
@@ -363,27 +357,27 @@ async def submit_product_profile(
             elif isinstance(value, int):
                 notification_data[key] = str(value)
         
-        # Send notification to admin
-        background_tasks.add_task(
-            get_email_service().send_form_notification,
-            "Product Profile Request",
-            notification_data
-        )
+        email_service = get_email_service()
+        
+        # Notification to admin (buffered for a digest if enabled for this form)
+        get_admin_digest().queue_notification(db, "product-profile", "Product Profile Request", notification_data)
         
-        # Send product profile email with PDF to user
+        # Product profile email with PDF (or link) to user
         full_name = f"{form.first_name} {form.last_name}"
-        background_tasks.add_task(
-            get_email_service().send_product_profile_email,
+        enqueue_email(db, email_service.compose_product_profile_email(
             form.email,
             full_name,
-            None,  # pdf_url - can be added later if needed
+            pdf_url,
             attachments if attachments else None
-        )
+        ))
+        
+        # Commit, then deliver emails and schedule the Excel export in the background
+        commit_submission(db)
         
         return {
             "success": True,
             "message": "Product profile submitted successfully. Check your email for the download link.",
-            "has_pdf": len(attachments) > 0
+            "has_pdf": len(attachments) > 0 or pdf_url is not None
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing form: {str(e)}")
@@ -391,7 +385,6 @@ async def submit_product_profile(
 @router.post("/request-demo")
 async def request_demo(
     form: DemoRequestForm,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Submit demo request form"""
@@ -406,10 +399,7 @@ async def request_demo(
             "message": form.additional_information or "",
             "demo_date": form.preferred_demo_date
         }
-        get_db_service().save_contact_form(db, form_data)
-        
-        # Export to Excel in background
-        background_tasks.add_task(get_excel_service().export_all_forms, db)
+        get_db_service().save_contact_form(db, form_data, commit=False)
         
         notification_data = {
             "first_name": form.first_name,
@@ -424,29 +414,19 @@ async def request_demo(
             "submitted_at": datetime.now().isoformat()
         }
         
-        # Send admin and sales notifications concurrently, then user confirmation
+        # Queue admin and sales notifications and the user confirmation with the form row
         email_service = get_email_service()
-        
-        async def send_admin_notification():
-            return await email_service.send_form_notification("Demo Request", notification_data)
-        
-        async def send_sales_notification():
-            return await email_service.send_demo_request_sales_notification(notification_data)
-        
-        # Send admin and sales emails concurrently
-        background_tasks.add_task(
-            email_service.send_emails_concurrent,
-            [send_admin_notification, send_sales_notification]
-        )
-        
-        # Send confirmation to user
-        background_tasks.add_task(
-            email_service.send_confirmation_email,
+        get_admin_digest().queue_notification(db, "demo", "Demo Request", notification_data)
+        enqueue_email(db, email_service.compose_demo_request_sales_notification(notification_data))
+        enqueue_email(db, email_service.compose_confirmation_email(
             form.email,
             "Demo Request",
             None,
             f"{form.first_name} {form.last_name}"
-        )
+        ))
+        
+        # Commit, then deliver emails and schedule the Excel export in the background
+        commit_submission(db)
         
         return {
             "success": True,
@@ -458,12 +438,11 @@ async def request_demo(
 @router.post("/talk-to-sales")
 async def talk_to_sales(
     form: TalkToSalesForm,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Submit talk to sales form"""
     try:
-        # Save to database
+        # Save to database; emails are queued in the same transaction
         form_data = {
             "name": form.name,
             "email": form.email,
@@ -476,10 +455,7 @@ async def talk_to_sales(
             "requirements": form.requirements,
             "timeline": form.timeline
         }
-        get_db_service().save_talk_to_sales_form(db, form_data)
-        
-        # Export to Excel in background
-        background_tasks.add_task(get_excel_service().export_all_forms, db)
+        get_db_service().save_talk_to_sales_form(db, form_data, commit=False)
         
         # Prepare notification data with all fields
         notification_data = {
@@ -492,29 +468,19 @@ async def talk_to_sales(
             "submitted_at": datetime.now().isoformat()
         }
         
-        # Send admin and sales notifications concurrently, then user confirmation
+        # Queue admin and sales notifications and the user confirmation with the form row
         email_service = get_email_service()
-        
-        async def send_admin_notification():
-            return await email_service.send_form_notification("Talk to Sales", notification_data)
-        
-        async def send_sales_notification():
-            return await email_service.send_talk_to_sales_notification(notification_data)
-        
-        # Send admin and sales emails concurrently
-        background_tasks.add_task(
-            email_service.send_emails_concurrent,
-            [send_admin_notification, send_sales_notification]
-        )
-        
-        # Send confirmation to user
-        background_tasks.add_task(
-            email_service.send_confirmation_email,
+        get_admin_digest().queue_notification(db, "talk-to-sales", "Talk to Sales", notification_data)
+        enqueue_email(db, email_service.compose_talk_to_sales_notification(notification_data))
+        enqueue_email(db, email_service.compose_confirmation_email(
             form.email,
             "Sales Inquiry",
             None,
             form.name
-        )
+        ))
+        
+        # Commit, then deliver emails and schedule the Excel export in the background
+        commit_submission(db)
         
         return {
             "success": True,
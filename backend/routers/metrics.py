@@ -0,0 +1,70 @@
+from fastapi import APIRouter
+
+from services.export_scheduler import get_export_scheduler
+from services.smtp_pool import get_smtp_pool_stats
+from services.outbox_service import get_email_outbox
+from services.digest_service import get_admin_digest
+from services.send_quota import get_send_quota
+from services.attachment_cache import get_attachment_cache
+from services.email_templates import email_templates
+from services.email_metrics import get_email_stage_metrics
+from services.chatbot_cache import get_chatbot_cache
+from services.knowledge_base import get_knowledge_base
+from services.chat_history import get_chat_history_budget
+
+router = APIRouter()
+
+@router.get("/exports")
+async def export_metrics():
+    """Excel export scheduler counters (triggers received, coalesced, runs)"""
+    return get_export_scheduler().get_stats()
+
+@router.get("/smtp-pool")
+async def smtp_pool_metrics():
+    """Pooled SMTP session counters (opened, reused, reconnects) per server"""
+    return get_smtp_pool_stats()
+
+@router.get("/email-outbox")
+def email_outbox_metrics():
+    """Email outbox throughput, failures and queue depth by status"""
+    return get_email_outbox().get_stats()
+
+@router.get("/email-quota")
+async def email_quota_metrics():
+    """Send quota governor state: tokens left, sends in the last 24h, grants and deferrals per lane"""
+    return get_send_quota().get_stats()
+
+@router.get("/admin-digest")
+def admin_digest_metrics():
+    """Admin digest rules, digests sent and notifications waiting per form"""
+    return get_admin_digest().get_stats()
+
+@router.get("/email-attachments")
+async def email_attachment_metrics():
+    """Encoded attachment cache hits, misses and size"""
+    return get_attachment_cache().get_stats()
+
+@router.get("/email-templates")
+async def email_template_metrics():
+    """Precompiled email template render counts and timings"""
+    return email_templates.get_stats()
+
+@router.get("/email-stages")
+async def email_stage_metrics():
+    """Delivery latency histograms per email kind and stage (mime, acquire, dns, connect, greeting, tls, auth, data, total)"""
+    return get_email_stage_metrics().get_stats()
+
+@router.get("/chatbot-cache")
+async def chatbot_cache_metrics():
+    """Chatbot answer cache hits (memory and disk), misses and history bypasses"""
+    return get_chatbot_cache().get_stats()
+
+@router.get("/chatbot-knowledge")
+async def chatbot_knowledge_metrics():
+    """Knowledge base retrieval: sections indexed, average prompt size against the full document"""
+    return get_knowledge_base().get_stats()
+
+@router.get("/chatbot-history")
+async def chatbot_history_metrics():
+    """Chat history token budgeting: turns kept, dropped and truncated, messages rejected"""
+    return get_chat_history_budget().get_stats()
@@ -0,0 +1,17 @@
+import hmac
+import os
+from typing import Optional
+
+from fastapi import HTTPException, Security
+from fastapi.security import APIKeyHeader
+
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
+
+
+def require_export_api_key(api_key: Optional[str] = Security(api_key_header)):
+    """Protect data exports and operational metrics with the EXPORT_API_KEY shared secret"""
+    expected = os.getenv("EXPORT_API_KEY")
+    if not expected:
+        raise HTTPException(status_code=503, detail="Data export is not configured (EXPORT_API_KEY not set)")
+    if not api_key or not hmac.compare_digest(api_key.encode(), expected.encode()):
+        raise HTTPException(status_code=401, detail="Invalid or missing API key")
@@ -0,0 +1,123 @@
+import base64
+import mimetypes
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from email.mime.nonmultipart import MIMENonMultipart
+from typing import Optional, Tuple
+
+
+class EncodedAsset:
+    """Base64 payload of one file, valid while the file's mtime and size are unchanged"""
+
+    def __init__(self, path: str, mtime_ns: int, size: int, payload: str, maintype: str, subtype: str):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.payload = payload
+        self.maintype = maintype
+        self.subtype = subtype
+        self.filename = os.path.basename(path)
+
+
+class AttachmentCache:
+    """Encodes email assets (brochure PDFs, the logo) once and reuses the base64 text.
+
+    Entries are keyed by path and revalidated against mtime and size on every
+    lookup, so replacing a PDF on disk is picked up on the next send. Cold reads
+    go through mmap, so a large PDF is encoded straight from the page cache.
+    The cache is bounded by total encoded size (least recently used first out).
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        if max_bytes is None:
+            try:
+                max_bytes = int(os.getenv("EMAIL_ATTACHMENT_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+            except (ValueError, TypeError):
+                max_bytes = 32 * 1024 * 1024
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, EncodedAsset]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _encode(path: str) -> str:
+        """Base64 (76-char lines, same as email.encoders.encode_base64) read via mmap"""
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return ""
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return base64.encodebytes(mapped).decode("ascii")
+
+    def get(self, path: str, content_type: Optional[str] = None) -> EncodedAsset:
+        """Encoded asset for `path`, encoding it if it is new or changed on disk"""
+        stat = os.stat(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry
+            if entry is not None:
+                self.invalidations += 1
+            self.misses += 1
+
+        payload = self._encode(path)
+        maintype, subtype = self._content_type(path, content_type)
+        entry = EncodedAsset(path, stat.st_mtime_ns, stat.st_size, payload, maintype, subtype)
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self._bytes -= len(old.payload)
+            if len(payload) <= self.max_bytes:
+                self._entries[path] = entry
+                self._bytes += len(payload)
+                while self._bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._bytes -= len(evicted.payload)
+                    self.evictions += 1
+        return entry
+
+    @staticmethod
+    def _content_type(path: str, content_type: Optional[str]) -> Tuple[str, str]:
+        content_type = content_type or mimetypes.guess_type(path)[0] or "application/octet-stream"
+        maintype, _, subtype = content_type.partition("/")
+        return maintype, subtype
+
+    def mime_part(self, path: str, content_type: Optional[str] = None) -> Tuple[MIMENonMultipart, str]:
+        """New MIME part carrying the cached base64 payload (headers are per message, the payload is shared)"""
+        asset = self.get(path, content_type)
+        part = MIMENonMultipart(asset.maintype, asset.subtype)
+        part.set_payload(asset.payload)
+        part["Content-Transfer-Encoding"] = "base64"
+        return part, asset.filename
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "encoded_bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+            }
+
+
+# Lazy initialization - one cache per process
+_attachment_cache = None
+
+def get_attachment_cache() -> AttachmentCache:
+    """Get or create attachment cache instance"""
+    global _attachment_cache
+    if _attachment_cache is None:
+        _attachment_cache = AttachmentCache()
+    return _attachment_cache
@@ -0,0 +1,168 @@
+import math
+import os
+import threading
+from typing import Dict, List, Optional
+
+# Optional dependency - exact token counts; without it tokens are estimated
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Tokens the chat format adds around every message (role, separators), and
+# before the reply
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 3
+
+TRUNCATED_MARK = " …"
+
+
+def _env_number(name: str, default, cast=int):
+    try:
+        return cast(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+class TokenCounter:
+    """Counts tokens locally with tiktoken (o200k_base, the gpt-4.1 encoding).
+
+    Without tiktoken, or if the encoding cannot be loaded, it estimates one
+    token per 4 bytes of UTF-8. That is close for English and errs on the
+    high side for other scripts.
+    """
+
+    def __init__(self, encoding_name: str = "o200k_base"):
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.get_encoding(encoding_name)
+            except Exception as e:
+                print(f"Warning: could not load tiktoken encoding {encoding_name} ({str(e)}), estimating chat tokens instead")
+        self.method = "tiktoken" if self.encoding is not None else "estimate"
+
+    def count(self, text: str) -> int:
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return math.ceil(len(text.encode("utf-8")) / 4)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """`text` cut to at most `max_tokens` tokens (marked with " …" when cut)"""
+        if self.count(text) <= max_tokens:
+            return text
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            return self.encoding.decode(tokens[:max_tokens]).rstrip() + TRUNCATED_MARK
+        return text.encode("utf-8")[:max_tokens * 4].decode("utf-8", errors="ignore").rstrip() + TRUNCATED_MARK
+
+
+class ChatHistoryBudget:
+    """Fits a chat request into a token budget.
+
+    The whole request (system prompt, history, the new message and room for a
+    `reply_tokens` reply) is kept under `token_budget`. History turns are
+    kept newest first until the budget is spent, so the oldest turns are
+    dropped first. A history turn longer than `max_message_tokens` is
+    truncated; a new message that long is rejected (check_message).
+    Only "user" and "assistant" turns are accepted from the client.
+    """
+
+    def __init__(
+        self,
+        counter: Optional[TokenCounter] = None,
+        token_budget: Optional[int] = None,
+        max_message_tokens: Optional[int] = None,
+    ):
+        self.counter = counter or TokenCounter()
+        self.token_budget = max(token_budget if token_budget is not None else _env_number("CHATBOT_TOKEN_BUDGET", 6000), 1)
+        self.max_message_tokens = max(max_message_tokens if max_message_tokens is not None else _env_number("CHATBOT_MAX_MESSAGE_TOKENS", 1000), 1)
+
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.rejected = 0
+        self.turns_received = 0
+        self.turns_kept = 0
+        self.turns_dropped = 0
+        self.turns_truncated = 0
+        self.prompt_tokens = 0
+
+    def _message_tokens(self, content: str) -> int:
+        return TOKENS_PER_MESSAGE + self.counter.count(content)
+
+    def check_message(self, message: str) -> None:
+        """Raise ValueError if the new user message is over max_message_tokens"""
+        tokens = self.counter.count(message)
+        if tokens > self.max_message_tokens:
+            with self._lock:
+                self.rejected += 1
+            raise ValueError(f"Message is too long ({tokens} tokens, the limit is {self.max_message_tokens}). Please shorten it.")
+
+    def build_messages(
+        self,
+        system_prompt: str,
+        message: str,
+        conversation_history: Optional[List[Dict[str, str]]],
+        reply_tokens: int,
+    ) -> List[Dict[str, str]]:
+        """System prompt, as much recent history as fits, and the new user message"""
+        message = self.counter.truncate(message, self.max_message_tokens)
+        available = (
+            self.token_budget
+            - reply_tokens
+            - TOKENS_PER_REPLY
+            - self._message_tokens(system_prompt)
+            - self._message_tokens(message)
+        )
+
+        turns = [
+            turn for turn in (conversation_history or [])
+            if turn.get("role") in ("user", "assistant") and turn.get("content")
+        ]
+        kept: List[Dict[str, str]] = []
+        truncated = 0
+        for turn in reversed(turns):
+            content = self.counter.truncate(turn["content"], self.max_message_tokens)
+            cost = self._message_tokens(content)
+            if cost > available:
+                break
+            if content is not turn["content"]:
+                truncated += 1
+            kept.append({"role": turn["role"], "content": content})
+            available -= cost
+        kept.reverse()
+
+        with self._lock:
+            self.requests += 1
+            self.turns_received += len(conversation_history or [])
+            self.turns_kept += len(kept)
+            self.turns_dropped += len(conversation_history or []) - len(kept)
+            self.turns_truncated += truncated
+            self.prompt_tokens += self.token_budget - reply_tokens - available
+
+        return [{"role": "system", "content": system_prompt}] + kept + [{"role": "user", "content": message}]
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "tokenizer": self.counter.method,
+                "token_budget": self.token_budget,
+                "max_message_tokens": self.max_message_tokens,
+                "requests": self.requests,
+                "rejected": self.rejected,
+                "turns_received": self.turns_received,
+                "turns_kept": self.turns_kept,
+                "turns_dropped": self.turns_dropped,
+                "turns_truncated": self.turns_truncated,
+                "avg_prompt_tokens": round(self.prompt_tokens / self.requests) if self.requests else None,
+            }
+
+
+# Lazy initialization - the tokenizer is loaded once per process (at app startup)
+_chat_history_budget = None
+
+def get_chat_history_budget() -> ChatHistoryBudget:
+    """Get or create chat history budget instance"""
+    global _chat_history_budget
+    if _chat_history_budget is None:
+        _chat_history_budget = ChatHistoryBudget()
+    return _chat_history_budget
@@ -0,0 +1,216 @@
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def _env_number(name: str, default, cast=int):
+    try:
+        return cast(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase, with punctuation and runs of whitespace folded to single spaces"""
+    return _NON_WORD.sub(" ", message.lower()).strip()
+
+
+class ChatAnswerCache:
+    """Model answers to first-turn chatbot questions, reused for repeats.
+
+    Keys combine the normalized question with a hash of the system prompt and
+    model, so "What is SPARS?" and "what is spars" share an answer and editing
+    the prompt starts a fresh cache. Answers expire after `ttl_seconds`.
+
+    The memory tier is an LRU of at most `max_entries` answers. With
+    `disk_path` set, answers are also kept in a small SQLite file, which
+    survives restarts and is shared by worker processes; disk hits are copied
+    back into memory.
+    """
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        disk_path: Optional[str] = None,
+    ):
+        if enabled is None:
+            enabled = os.getenv("CHATBOT_CACHE_ENABLED", "true").lower() == "true"
+        self.enabled = enabled
+        self.max_entries = max(max_entries if max_entries is not None else _env_number("CHATBOT_CACHE_MAX_ENTRIES", 500), 1)
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else _env_number("CHATBOT_CACHE_TTL_SECONDS", 86400.0, float)
+        self.disk_path = disk_path if disk_path is not None else os.getenv("CHATBOT_CACHE_DB", "")
+
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk: Optional[sqlite3.Connection] = None
+        self._disk_lock = threading.Lock()
+        if self.enabled and self.disk_path:
+            self._open_disk()
+
+        # Counters
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.stores = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def _open_disk(self) -> None:
+        try:
+            conn = sqlite3.connect(self.disk_path, check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS chat_answers (key TEXT PRIMARY KEY, answer TEXT NOT NULL, created_at REAL NOT NULL)")
+            conn.execute("DELETE FROM chat_answers WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+            conn.commit()
+            self._disk = conn
+            print(f"Chatbot answer cache: disk tier at {self.disk_path}")
+        except sqlite3.Error as e:
+            print(f"Warning: chatbot answer cache disk tier disabled ({str(e)})")
+
+    @staticmethod
+    def make_key(message: str, system_prompt: str, model: str) -> Optional[str]:
+        """Cache key for a first-turn question, or None if nothing is left after normalizing"""
+        normalized = normalize_message(message)
+        if not normalized:
+            return None
+        prompt_hash = hashlib.sha256(f"{model}\n{system_prompt}".encode("utf-8")).hexdigest()
+        return hashlib.sha256(f"{prompt_hash}\n{normalized}".encode("utf-8")).hexdigest()
+
+    def note_bypass(self) -> None:
+        """Count a request that skipped the cache (it carried conversation history)"""
+        with self._lock:
+            self.bypassed += 1
+
+    def _get_memory(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            answer, created_at = entry
+            if time.time() - created_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expired += 1
+                return None
+            self._entries.move_to_end(key)
+            self.memory_hits += 1
+            return answer
+
+    def _put_memory(self, key: str, answer: str, created_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (answer, created_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _get_disk(self, key: str) -> Optional[str]:
+        try:
+            with self._disk_lock:
+                row = self._disk.execute("SELECT answer, created_at FROM chat_answers WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            print(f"Chatbot answer cache disk read failed: {str(e)}")
+            return None
+        if row is None or time.time() - row[1] > self.ttl_seconds:
+            return None
+        with self._lock:
+            self.disk_hits += 1
+        self._put_memory(key, row[0], row[1])
+        return row[0]
+
+    def _put_disk(self, key: str, answer: str, created_at: float) -> None:
+        try:
+            with self._disk_lock:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO chat_answers (key, answer, created_at) VALUES (?, ?, ?)",
+                    (key, answer, created_at),
+                )
+                self._disk.commit()
+        except sqlite3.Error as e:
+            print(f"Chatbot answer cache disk write failed: {str(e)}")
+
+    async def get(self, key: str) -> Optional[str]:
+        """Cached answer for `key`; memory first, then the disk tier (off the event loop)"""
+        if not self.enabled:
+            return None
+        answer = self._get_memory(key)
+        if answer is None and self._disk is not None:
+            answer = await asyncio.to_thread(self._get_disk, key)
+        if answer is None:
+            with self._lock:
+                self.misses += 1
+        return answer
+
+    async def put(self, key: str, answer: str) -> None:
+        """Remember a model answer (fallback replies should not be cached)"""
+        if not self.enabled or not answer:
+            return
+        created_at = time.time()
+        self._put_memory(key, answer, created_at)
+        with self._lock:
+            self.stores += 1
+        if self._disk is not None:
+            await asyncio.to_thread(self._put_disk, key, answer, created_at)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self._disk is not None:
+            with self._disk_lock:
+                self._disk.execute("DELETE FROM chat_answers")
+                self._disk.commit()
+
+    def close(self) -> None:
+        if self._disk is not None:
+            with self._disk_lock:
+                self._disk.close()
+            self._disk = None
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_tier": self._disk is not None,
+                "hits": hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else None,
+                "bypassed": self.bypassed,
+                "stores": self.stores,
+                "expired": self.expired,
+                "evictions": self.evictions,
+            }
+
+
+# Lazy initialization - one cache per process
+_chatbot_cache = None
+
+def get_chatbot_cache() -> ChatAnswerCache:
+    """Get or create chatbot answer cache instance"""
+    global _chatbot_cache
+    if _chatbot_cache is None:
+        _chatbot_cache = ChatAnswerCache()
+    return _chatbot_cache
+
+def close_chatbot_cache() -> None:
+    """Close the disk tier, if it was ever opened (app shutdown)"""
+    global _chatbot_cache
+    if _chatbot_cache is not None:
+        _chatbot_cache.close()
+        _chatbot_cache = None
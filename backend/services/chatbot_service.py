@@ -1,15 +1,109 @@
 import os
-from openai import OpenAI
-from typing import List, Dict, Optional
+import httpx
+from openai import AsyncOpenAI
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+
+from services.chatbot_cache import get_chatbot_cache
+from services.knowledge_base import get_knowledge_base
+from services.chat_history import get_chat_history_budget
+
+
+def _env_number(name: str, default, cast=int):
+    try:
+        return cast(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+CHAT_MODEL = "gpt-4.1-mini"
+CHAT_MAX_TOKENS = 300
+CHAT_TEMPERATURE = 0.7
+
 
 class ChatbotService:
     def __init__(self):
         self.api_key = os.getenv("OPENAI_API_KEY")
         if self.api_key:
-            self.client = OpenAI(api_key=self.api_key)
+            self.client = AsyncOpenAI(
+                api_key=self.api_key,
+                max_retries=_env_number("OPENAI_MAX_RETRIES", 2),
+                http_client=self._create_http_client(),
+            )
         else:
             self.client = None
             print("Warning: OPENAI_API_KEY not set. Chatbot will use fallback responses.")
+        self.cache = get_chatbot_cache()
+        self.knowledge_base = get_knowledge_base()
+        self.history_budget = get_chat_history_budget()
+
+    @staticmethod
+    def _create_http_client() -> httpx.AsyncClient:
+        """Keep-alive connection pool shared by every chatbot request.
+
+        Requests await the API without blocking the event loop, so concurrent
+        chats overlap; up to OPENAI_MAX_CONNECTIONS of them at once, the rest
+        wait for a connection (OPENAI_POOL_TIMEOUT_SECONDS).
+        """
+        max_connections = max(_env_number("OPENAI_MAX_CONNECTIONS", 20), 1)
+        return httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max(_env_number("OPENAI_MAX_KEEPALIVE_CONNECTIONS", max_connections), 0),
+                keepalive_expiry=_env_number("OPENAI_KEEPALIVE_EXPIRY_SECONDS", 60.0, float),
+            ),
+            timeout=httpx.Timeout(
+                _env_number("OPENAI_TIMEOUT_SECONDS", 30.0, float),
+                connect=_env_number("OPENAI_CONNECT_TIMEOUT_SECONDS", 5.0, float),
+                pool=_env_number("OPENAI_POOL_TIMEOUT_SECONDS", 10.0, float),
+            ),
+        )
+
+    async def close(self) -> None:
+        """Close pooled API connections (app shutdown)"""
+        if self.client is not None:
+            await self.client.close()
+
+    def _system_prompt(
+        self,
+        message: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ) -> str:
+        """Core persona plus the knowledge base sections relevant to the question.
+
+        The last user turn is searched too, so a follow-up like "does it
+        integrate with FedEx?" keeps the context of the question before it.
+        """
+        query = message
+        for turn in reversed(conversation_history or []):
+            if turn.get("role") == "user":
+                query = f"{turn.get('content', '')} {message}"
+                break
+        return self.knowledge_base.build_prompt(query)
+
+    def _cache_key(
+        self,
+        message: str,
+        system_prompt: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ) -> Optional[str]:
+        """Answer cache key for a first-turn question; follow-ups depend on the conversation and skip the cache"""
+        if conversation_history:
+            self.cache.note_bypass()
+            return None
+        return self.cache.make_key(message, system_prompt, CHAT_MODEL)
+
+    def _build_messages(
+        self,
+        message: str,
+        system_prompt: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ) -> List[Dict[str, str]]:
+        """System prompt, as much recent history as fits the token budget, and the new user message"""
+        return self.history_budget.build_messages(system_prompt, message, conversation_history, CHAT_MAX_TOKENS)
+
+    def check_message(self, message: str) -> None:
+        """Raise ValueError if the message is too long to send (CHATBOT_MAX_MESSAGE_TOKENS)"""
+        self.history_budget.check_message(message)
 
     async def get_response(
         self,
@@ -26,306 +120,84 @@ class ChatbotService:
             if not self.client:
                 return self._get_fallback_response(message)
             
-            # System prompt for SPARS assistant
-            system_prompt = """You are a helpful, knowledgeable, and professional AI assistant for SPARS (Smart Program for Area Rugs System), an ERP solution designed specifically for the home furnishing and rugs wholesale and distribution industry. Your role is to provide accurate, comprehensive information about SPARS features, modules, capabilities, and help users understand how SPARS can benefit their business.
-
-## COMPANY OVERVIEW
-SPARS is a modern, AI-enabled ERP platform purpose-built for the home furnishing wholesale and distribution industry. Since its first release in 2002, SPARS has helped leading U.S. brands streamline complex operations, optimize warehouse performance, and achieve full visibility across their supply chain. SPARS is backed by Magnum Opus System Corp. (USA) and its dedicated development and R&D center, Visionary Computer Solutions (Pvt.) Ltd. (Pakistan).
-
-## WHAT IS SPARS?
-SPARS stands for Smart Program for Area Rugs System. It is a specialized ERP software built specifically for wholesalers and distributors of the home furnishing and rugs industry. Unlike generic ERP systems, SPARS doesn't require customization before use—it's a plug-and-play system designed for the unique needs of rug and home décor businesses. SPARS manages billing, sales, purchasing, warehouse operations, inventory, accounts receivable, returns, and more.
-
-## CORE MODULES
-
-### 1. Inventory Management Module
-- Real-time tracking of inventory levels, movements, and statuses across multiple warehouses
-- Support for serialized and batch-controlled items
-- Various inventory types: collective, warehouse-wise, and differential inventory feeds
-- Unique stock identification (OAK items), stock adjustments, and detailed transaction histories
-- Efficient physical stock counts, reconciliation, and loss declarations
-- Automated alerts and comprehensive reporting to reduce stockouts and excess inventory
-
-### 2. Warehouse Automation Module
-- Automated processes for receiving, storing, picking, packing, and shipping goods
-- Barcode scanning, RFID tagging, and real-time inventory updates
-- Multi-warehouse management with seamless coordination between storage locations
-- Integration with Voodoo Robotics devices for efficient and flawless shipping
-- Extended item properties, labeling and barcoding, picker monitoring dashboards
-- Structured multi-bin warehouses, virtual warehouses, and SET items
-- Mobile SCANNER App and SPOOLER App for warehouse operations
-- Warehouse user access control and GTIN-14 barcoding options
-- Performance-tested to process over 70,000 orders per day for enterprise edition
-
-### 3. Broadloom Module
-- Handles unique inventory and transaction complexities of home furnishing products like broadloom rugs
-- Detailed inventory tracking including roll-wise and cut piece-wise management
-- Integrated sales, purchase, and return processes
-- Prevents stock discrepancies and supports quick resolution of returns
-
-### 4. Sales Management Module
-- Automates entire sales cycle from sales orders to order fulfillment
-- Quotation management, order processing, packages, discounts, and commissions
-- Integration with inventory and finance for accurate stock availability and billing
-- Real-time sales analytics and performance tracking
-- Intelligent baling, automated backorder management, and freight quoting via API
-- Multiple price tiers, one-step price changes, pre-packaged orders
-- Blanket orders with auto-release, special packages options (white label, exclusive items)
-- Consignment sales management, bulk return processing, one-step returns
-- Custom shipping charges and customized selling price rules
-
-### 5. Purchase Management Module
-- Streamlines procurement from requisition to supplier payment
-- Purchase order creation, approval workflows, supplier management, and contract tracking
-- Integration with inventory to maintain optimal stock levels
-- Real-time visibility into purchase order status, delivery schedules, and supplier performance
-- Vendor packing slip management, container management, incoming shipment planning
-- Support for pre-packaged item orders (SET feature), shipment receiving dashboard
-- Consignment purchase handling, extended properties for vendors
-
-### 6. Accounts Payables Module
-- Manages vendor invoices, payments, and credit memos efficiently
-- Automated invoice entry, matching with purchase orders and receipts
-- Approval workflows to ensure accuracy and prevent duplicate payments
-- Multiple payment methods, schedules, and currency handling
-- Detailed aging reports, cash flow forecasting, and vendor performance analysis
-
-### 7. Accounts Receivable Module
-- Handles customer invoicing, payment processing, and credit management
-- Automated invoice generation, payment tracking, and collections management
-- Multiple payment terms, currencies, and customer credit limits
-- Aging reports, cash forecasting, and customer account analysis
-- Integration with sales and finance modules for accurate revenue recognition
-
-### 8. Accounts and Finance Module
-- Comprehensive financial management including general ledger, budgeting, and reporting
-- Multi-currency transactions, cost centers, and project accounting
-- Automated journal entries, reconciliations, and period closings
-- Customizable financial reports, dashboards, and analytics
-- Support for multiple divisions, master and sub-accounts for customers
-- Bank reconciliation, future date transactions, and true-to-terms aging
-- Automated invoicing and customized bulk invoicing
-
-### 9. Commission & Royalty Module
-- Automates calculation and management of commissions and royalties
-- Complex commission structures based on sales volume, product categories, territories, and performance targets
-- Tracks sales transactions, calculates payable commissions, generates detailed reports
-- Manages royalty payments for licensed products or intellectual property
-- Integration with sales and finance modules for seamless data flow
-
-### 10. EDI Module
-- Comprehensive solution for automated Electronic Data Interchange with trading partners
-- Supports standard EDI transaction sets: EDI 846 (Inventory Inquiry/Feed), EDI 850 (Purchase Order), EDI 855 (Purchase Order Acknowledgement), EDI 856 (Advance Shipping Notice), EDI 810 (Invoice), EDI 824 (Application Advice), EDI 945 (Warehouse Shipping Advice), EDI 753, 865, and more
-- Customer-specific EDI configuration with Customer EDI Setup interface
-- Multiple inventory feed types: collective, warehouse-wise, differential, and differential warehouse-wise
-- Real-time processing and monitoring with EDI Traffic Analyzer
-- Comprehensive error handling and audit trails
-- Automated document generation and processing
-- Supports both managed and unmanaged EDI options
-
-### 11. Reports Module
-- Wide range of customizable reports covering inventory, sales, purchasing, finance, and operations
-- Real-time data visualization, export options, and scheduled report generation
-- Detailed analytical reports, summaries, and dashboards
-- Key performance indicators (KPIs) tracking and monitoring
-- Drill-down capabilities for in-depth analysis
-- Integration with Power BI for business analytics
-
-### 12. Administration Module
-- System configuration, user roles, security, and maintenance tasks
-- Access controls, user profiles, and system parameters management
-- Audit logging, data backup, and system updates
-- Master data, workflows, and integrations with external systems management
-
-## KEY FEATURES
-
-### B2B Portals
-- Dedicated portals for customers, salespersons, and vendors
-- Customers can place orders and check stock availability anytime
-- Salespersons can monitor sales performance and approve orders on the go
-- Vendors benefit from streamlined purchase order management, vendor packing slips, and shipment updates
-- Self-service and role-specific access reduces communication delays
-
-### Warehouse Management Features
-- Voodoo Robotics integration for automated shipping
-- Transfer between warehouses and virtual warehouses
-- Mobile SCANNER App for real-time warehouse transactions (Android-based)
-- SPOOLER App for fast, accurate, and automated shipment processing
-- Put-to-light picking systems
-- Intelligent baling and auto-baling features
-- Container management for tracking incoming shipments
-- Paperless picking capabilities
-
-### SPOOLER Application
-- Fast, accurate, and automated shipment processing
-- Direct integration with major carriers (UPS, FedEx) for automatic label generation
-- Zero-error shipment validation through scanning
-- Multi-batch support (Managed Shipments, Regular Batches, LTL, Put-to-Light)
-- Automated printing of Packing Slips, Package Labels, and Carrier Labels
-- Built-in Shipment Log with real-time error handling
-- Seamless integration with SCANNER App for container loading and confirmation
-
-
-### SPARS Executive Mobile App:
-"Real-time business intelligence at your fingertips—access critical sales, customer, vendor, and inventory insights anytime, anywhere with enterprise-grade security."
-
-
-### SCANNER Application (Mobile)
-- Android-based mobile scanning for real-time warehouse transactions
-- Supports shipment receiving, picking, cyclic counts, and customer returns
-- Integrates physical scanning with SPARS transactions instantly
-- Reduces errors and accelerates warehouse operations
-
-### Baling and Auto-Baling Features
-- Intelligent baling that automatically groups items for efficient shipping
-- Auto-baling feature automates the process of grouping items into bales or packaging units
-- Rule-based packaging logic based on item attributes
-- Supports multiple packaging types (bales, rolls, cartons, pallets, slips)
-- Detailed bale information with unique bale numbers, dimensions, and weight
-- Integration with shipment documents (packing slips, bill of lading)
-- Smart auto packaging algorithm that determines best box combinations
-
-### Auto-Rating Feature
-- Automates calculation of shipping rates within Sales Order and Bill of Lading interfaces
-- Real-time freight rate retrieval via carrier APIs (FedEx, UPS, and others)
-- Dynamic rate updates and manual override capability
-- Supports multiple shipping methods and complex shipments (LTL, parcel, multi-package)
-
-### Value-Added Features
-- Data Export Manager for easy data extraction
-- Paperless document management
-- API integrations with shipping companies and major e-commerce platforms
-- Electronic data processing through secure FTP
-- Two-layer authentication for external users
-
-### Pre-Packaged Item Orders (SET Feature)
-- Efficient management of bundled products and pre-packaged sets
-- Simplifies order processing and inventory management for sets or kits
-- Treats sets as single units while maintaining detailed component tracking
-
-## INTEGRATIONS
-
-### E-Commerce Platforms
-- Amazon
-- Wayfair
-- Shopify
-- CommerceHub
-- Overstock
-- Walmart
-- SPS Commerce
-
-### Shipping Carriers
-- FedEx (API integration for label generation, tracking, freight quotes)
-- UPS (API integration for label generation, tracking, freight quotes)
-- EST
-- SEFL
-- Various national and regional LTL carriers
-
-### Other Integrations
-- API-based custom integrations supported
-- Secure FTP for electronic data processing
-- EDI integration with trading partners
-
-## PERFORMANCE & SCALABILITY
-- Warehouse Management System (WMS) performance-tested to process over 70,000 orders per day (enterprise edition)
-- Handles high-volume operations with precision, accuracy, and speed
-- Scalable architecture supporting businesses from mid-market distributors to multi-warehouse enterprises
-- Supports unlimited warehouses with multi-bin layouts, virtual warehouses, and transfer capabilities
-
-## DEPLOYMENT OPTIONS
-- Cloud deployment
-- Hybrid deployment
-- On-premise deployment
-- Flexible architecture to meet specific security and infrastructure requirements
-
-## INDUSTRY-SPECIFIC CAPABILITIES
-- Purpose-built for home furnishing wholesale and distribution industry
-- Industry-specific functionality eliminates heavy customizations typically required in generic ERP systems
-- Specialized features for:
-  - Broadloom & rug handling
-  - Showroom inventory
-  - Royalty tracking
-  - Multi-bin warehousing
-  - Automated freight rating
-  - Bale tracking and batch control
-  - End-to-end area rug management
-  - Special order and weaving processes
-  - Virtual set SKUs
-  - Physical set assembly workflows
-
-## ROI & BENEFITS
-- Faster order and billing cycles
-- Reduced labor and manual workload
-- Better inventory control leading to fewer costly mistakes
-- Real-time analytics for smarter decisions
-- Scalability without increasing overhead
-- Significant time savings and improved cash flow
-- Faster implementation compared to large global ERP vendors (typically 8-12 weeks for standard implementations)
-
-## SUPPORT & TRAINING
-- Comprehensive training for all users covering system navigation, role-specific functions, and best practices
-- Training provided during implementation with ongoing support available
-- Support levels vary by package:
-  - Standard: Email support
-  - Enterprise: 24/7 premium support with dedicated account managers
-- All packages include regular system updates and access to support resources
-
-## CONTACT INFORMATION
-- Email: sales@sparsus.com
-- Phone: +1 (212) 685-2127 (Note: Some materials mention +1 (646) 775-2716 - use the most current number)
-- Address: 112 West 34 Street, 18th Floor, New York, NY 10120
-- Website: www.sparsus.com
-- Business Hours: Monday-Friday, 9:00 AM - 6:00 PM EST
-
-## YOUR RESPONSE GUIDELINES
-1. Be friendly, professional, and helpful
-2. Provide accurate, detailed information based on the knowledge above
-3. Keep responses concise but comprehensive when needed
-4. If asked about pricing, direct users to contact the sales team
-5. If you don't know something specific or need clarification, direct users to contact the sales team at sales@sparsus.com or call +1 (212) 685-2127
-6. Highlight SPARS's industry-specific advantages over generic ERP systems
-7. Emphasize the plug-and-play nature and faster implementation timeline
-8. Mention relevant modules and features when answering questions
-9. Use specific numbers and capabilities (e.g., "70,000+ orders per day") when relevant
-10. Always maintain a professional and enthusiastic tone about SPARS capabilities
-
-## COMMON QUESTIONS TO HANDLE
-- Pricing: Direct to sales team (sales@sparsus.com or +1 (212) 685-2127)
-- Demo requests: Direct to contact form or sales team
-- Implementation timeline: Typically 8-12 weeks for standard implementations
-- Deployment options: Cloud, hybrid, or on-premise available
-- Integration capabilities: Extensive pre-built integrations plus API support for custom integrations
-- Industry focus: Purpose-built for home furnishing and rugs wholesale/distribution industry
-- Performance: WMS tested to process 70,000+ orders per day
-- Training: Comprehensive training provided during implementation with ongoing support
-
-Remember: You are representing SPARS, a trusted ERP solution that has been helping home furnishing businesses since 2002. Be knowledgeable, helpful, and always guide users toward the appropriate resources when needed.
-Dont always say - "How can i assist you?" 
-
-Always Return result markdown format- only return markdown data without ``` or markdown keyword. 
-"""
+            system_prompt = self._system_prompt(message, conversation_history)
+            cache_key = self._cache_key(message, system_prompt, conversation_history)
+            if cache_key:
+                cached = await self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
             
-            messages = [{"role": "system", "content": system_prompt}]
-            
-            # Add conversation history if provided
-            if conversation_history:
-                messages.extend(conversation_history[-10:])  # Keep last 10 messages for context
-            
-            # Add current user message
-            messages.append({"role": "user", "content": message})
-            
-            # Call OpenAI API
-            response = self.client.chat.completions.create(
-                model="gpt-4.1-mini",
-                messages=messages,
-                max_tokens=300,
-                temperature=0.7
+            # Call OpenAI API (awaited - other requests keep running meanwhile)
+            response = await self.client.chat.completions.create(
+                model=CHAT_MODEL,
+                messages=self._build_messages(message, system_prompt, conversation_history),
+                max_tokens=CHAT_MAX_TOKENS,
+                temperature=CHAT_TEMPERATURE
             )
             
-            return response.choices[0].message.content.strip()
+            answer = response.choices[0].message.content.strip()
+            if cache_key:
+                await self.cache.put(cache_key, answer)
+            return answer
             
         except Exception as e:
             print(f"Error calling OpenAI API: {str(e)}")
             return self._get_fallback_response(message)
+
+    async def stream_response(
+        self,
+        message: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """Stream the reply as ("token", text) pieces while the model generates it.
+
+        Without an API key, or if the call fails before the first token, the
+        fallback response is yielded as a single ("fallback", text) piece. If
+        the stream breaks part-way, an ("error", text) piece ends it. A cached
+        answer comes back as one ("token", text) piece, and a reply that
+        streamed to the end is added to the cache. Closing
+        the generator (e.g. the client disconnected) closes the upstream
+        response, so the model stops generating.
+        """
+        if not self.client:
+            yield "fallback", self._get_fallback_response(message)
+            return
+        
+        started = False
+        try:
+            system_prompt = self._system_prompt(message, conversation_history)
+            cache_key = self._cache_key(message, system_prompt, conversation_history)
+            if cache_key:
+                cached = await self.cache.get(cache_key)
+                if cached is not None:
+                    yield "token", cached
+                    return
+            
+            pieces = []
+            stream = await self.client.chat.completions.create(
+                model=CHAT_MODEL,
+                messages=self._build_messages(message, system_prompt, conversation_history),
+                max_tokens=CHAT_MAX_TOKENS,
+                temperature=CHAT_TEMPERATURE,
+                stream=True
+            )
+            async with stream:
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    text = chunk.choices[0].delta.content
+                    if text:
+                        started = True
+                        pieces.append(text)
+                        yield "token", text
+            if cache_key:
+                await self.cache.put(cache_key, "".join(pieces).strip())
+        except Exception as e:
+            print(f"Error streaming from OpenAI API: {str(e)}")
+            if started:
+                yield "error", "The response was interrupted. Please try again."
+            else:
+                yield "fallback", self._get_fallback_response(message)
     
     def _get_fallback_response(self, message: str) -> str:
         """Fallback responses when GPT is not available"""
@@ -1,3 +1,4 @@
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 from database import (
     NewsletterSubscription,
@@ -6,19 +7,33 @@ from database import (
     ProductProfileForm,
     TalkToSalesForm
 )
+from services.excel_service import mark_sheets_dirty
+
+
+def _mark_dirty_on_commit(db: Session, *sheet_keys: str) -> None:
+    """Mark Excel sheets dirty once the row is actually committed"""
+    event.listen(db, "after_commit", lambda session: mark_sheets_dirty(*sheet_keys), once=True)
+
+def _save(db: Session, row, commit: bool):
+    """Add a row; commit now, or only flush so the caller can commit it with related rows (the email outbox)"""
+    db.add(row)
+    if commit:
+        db.commit()
+        db.refresh(row)
+    else:
+        db.flush()
+    return row
 
 class DatabaseService:
     @staticmethod
-    def save_newsletter(db: Session, email: str):
+    def save_newsletter(db: Session, email: str, commit: bool = True):
         """Save newsletter subscription to database"""
         subscription = NewsletterSubscription(email=email)
-        db.add(subscription)
-        db.commit()
-        db.refresh(subscription)
-        return subscription
+        _mark_dirty_on_commit(db, "newsletter")
+        return _save(db, subscription, commit)
 
     @staticmethod
-    def save_contact_form(db: Session, form_data: dict):
+    def save_contact_form(db: Session, form_data: dict, commit: bool = True):
         """Save contact form to database"""
         contact = ContactForm(
             first_name=form_data.get("first_name"),
@@ -29,13 +44,12 @@ class DatabaseService:
             message=form_data.get("message"),
             demo_date=form_data.get("demo_date")
         )
-        db.add(contact)
-        db.commit()
-        db.refresh(contact)
-        return contact
+        # Contact and Demo Requests sheets are split on demo_date
+        _mark_dirty_on_commit(db, "demo_requests" if contact.demo_date is not None else "contact_forms")
+        return _save(db, contact, commit)
 
     @staticmethod
-    def save_brochure_form(db: Session, form_data: dict):
+    def save_brochure_form(db: Session, form_data: dict, commit: bool = True):
         """Save brochure form to database"""
         brochure = BrochureForm(
             full_name=form_data.get("full_name"),
@@ -45,13 +59,11 @@ class DatabaseService:
             job_role=form_data.get("job_role"),
             agreed_to_marketing=form_data.get("agreed_to_marketing", False)
         )
-        db.add(brochure)
-        db.commit()
-        db.refresh(brochure)
-        return brochure
+        _mark_dirty_on_commit(db, "brochure_forms")
+        return _save(db, brochure, commit)
 
     @staticmethod
-    def save_product_profile_form(db: Session, form_data: dict):
+    def save_product_profile_form(db: Session, form_data: dict, commit: bool = True):
         """Save product profile form to database"""
         profile = ProductProfileForm(
             first_name=form_data.get("first_name"),
@@ -70,13 +82,11 @@ class DatabaseService:
             requirements=form_data.get("requirements"),
             timeline=form_data.get("timeline")
         )
-        db.add(profile)
-        db.commit()
-        db.refresh(profile)
-        return profile
+        _mark_dirty_on_commit(db, "product_profile_forms")
+        return _save(db, profile, commit)
 
     @staticmethod
-    def save_talk_to_sales_form(db: Session, form_data: dict):
+    def save_talk_to_sales_form(db: Session, form_data: dict, commit: bool = True):
         """Save talk to sales form to database"""
         sales = TalkToSalesForm(
             name=form_data.get("name"),
@@ -90,8 +100,6 @@ class DatabaseService:
             requirements=form_data.get("requirements"),
             timeline=form_data.get("timeline")
         )
-        db.add(sales)
-        db.commit()
-        db.refresh(sales)
-        return sales
+        _mark_dirty_on_commit(db, "talk_to_sales_forms")
+        return _save(db, sales, commit)
 
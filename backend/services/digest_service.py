@@ -0,0 +1,254 @@
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Dict, NamedTuple, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from database import AdminDigestEntry, SessionLocal, get_local_time
+from services.email_service import EmailService
+from services.outbox_service import enqueue_email, get_email_outbox
+
+# Digest headings per form slug (the slugs used in ADMIN_DIGEST_FORMS)
+DIGEST_TITLES = {
+    "newsletter": "Newsletter Subscription",
+    "contact": "Contact Inquiry",
+    "brochure": "Brochure Request",
+    "product-profile": "Product Profile Request",
+    "demo": "Demo Request",
+    "talk-to-sales": "Talk to Sales",
+}
+
+
+def _env_number(name: str, default, cast=int):
+    try:
+        return cast(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+class DigestRule(NamedTuple):
+    interval_minutes: float
+    max_items: int
+
+
+def parse_digest_rules(spec: str, interval_minutes: float, max_items: int, immediate: str) -> Dict[str, DigestRule]:
+    """Digest rules from ADMIN_DIGEST_FORMS, e.g. "newsletter:60:500,brochure" or "all".
+
+    Each entry is slug[:minutes[:items]]; missing values fall back to the
+    defaults. Slugs listed in `immediate` are never digested.
+    """
+    rules = {}
+    for item in spec.split(","):
+        parts = [part.strip() for part in item.strip().split(":")]
+        if not parts[0]:
+            continue
+        try:
+            minutes = float(parts[1]) if len(parts) > 1 and parts[1] else interval_minutes
+            items = int(parts[2]) if len(parts) > 2 and parts[2] else max_items
+        except ValueError:
+            print(f"Warning: ignoring invalid ADMIN_DIGEST_FORMS entry '{item.strip()}'")
+            continue
+        slugs = DIGEST_TITLES.keys() if parts[0].lower() == "all" else [parts[0].lower()]
+        for slug in slugs:
+            if slug not in DIGEST_TITLES:
+                print(f"Warning: unknown form '{slug}' in ADMIN_DIGEST_FORMS")
+                continue
+            rules[slug] = DigestRule(max(minutes, 0.0), max(items, 1))
+    for slug in immediate.split(","):
+        rules.pop(slug.strip().lower(), None)
+    return rules
+
+
+class AdminDigestWorker:
+    """Buffers admin form notifications and sends them as periodic digests.
+
+    Form types listed in ADMIN_DIGEST_FORMS are written to admin_digest_entries
+    (in the submission's transaction, so nothing is lost on restart) instead of
+    the outbox. A digest is flushed into the outbox once the oldest buffered
+    entry is `interval_minutes` old or `max_items` entries are waiting; each
+    digest email carries at most `max_items` entries. Forms in
+    ADMIN_DIGEST_IMMEDIATE (default talk-to-sales) always notify right away.
+    """
+
+    def __init__(
+        self,
+        email_service: Optional[EmailService] = None,
+        rules: Optional[Dict[str, DigestRule]] = None,
+        check_seconds: Optional[float] = None,
+    ):
+        self.email_service = email_service or EmailService()
+        if rules is None:
+            rules = parse_digest_rules(
+                os.getenv("ADMIN_DIGEST_FORMS", ""),
+                _env_number("ADMIN_DIGEST_INTERVAL_MINUTES", 15.0, float),
+                _env_number("ADMIN_DIGEST_MAX_ITEMS", 100),
+                os.getenv("ADMIN_DIGEST_IMMEDIATE", "talk-to-sales"),
+            )
+        self.rules = rules
+        self.check_seconds = check_seconds if check_seconds is not None else _env_number("ADMIN_DIGEST_CHECK_SECONDS", 30.0, float)
+
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._stopping = False
+
+        # Counters (this process)
+        self.buffered = 0
+        self.digests_sent = 0
+        self.entries_flushed = 0
+        self.last_flush_at: Optional[str] = None
+        self.last_error: Optional[str] = None
+
+    def queue_notification(self, db: Session, digest_key: str, form_type: str, form_data: dict) -> None:
+        """Buffer the admin notification if this form is digested, otherwise queue it in the outbox.
+
+        Does not commit - like enqueue_email, it is part of the submission's transaction.
+        """
+        if digest_key not in self.rules:
+            enqueue_email(db, self.email_service.compose_form_notification(form_type, form_data))
+            return
+        db.add(AdminDigestEntry(
+            digest_key=digest_key,
+            form_type=form_type,
+            form_data=json.dumps(form_data, default=str),
+            status="pending",
+            created_at=get_local_time(),
+        ))
+        self.buffered += 1
+
+    def start(self) -> None:
+        """Start the flush loop; must be called from the running event loop (app startup)"""
+        if self._task is not None or not self.rules:
+            return
+        self._stopping = False
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        print(f"Admin digest enabled for: {', '.join(f'{slug} ({rule.interval_minutes:g} min / {rule.max_items} items)' for slug, rule in self.rules.items())}")
+
+    def notify(self) -> None:
+        """Check the item thresholds right away (call after committing a buffered entry)"""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            self._wake.clear()
+            try:
+                flushed = await asyncio.to_thread(self.flush_due)
+                if flushed:
+                    get_email_outbox().notify()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Admin digest error: {str(e)}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.check_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def flush_due(self, force: bool = False) -> int:
+        """Queue a digest email for every form whose buffer is due; returns the number of digests"""
+        digests = 0
+        for digest_key, rule in self.rules.items():
+            while self._flush_one(digest_key, rule, force):
+                digests += 1
+        return digests
+
+    def _flush_one(self, digest_key: str, rule: DigestRule, force: bool) -> bool:
+        db = SessionLocal()
+        try:
+            entries = db.execute(
+                select(AdminDigestEntry)
+                .where(AdminDigestEntry.digest_key == digest_key)
+                .where(AdminDigestEntry.status == "pending")
+                .order_by(AdminDigestEntry.id)
+                .limit(rule.max_items)
+            ).scalars().all()
+            if not entries:
+                return False
+            now = get_local_time()
+            due = (
+                force
+                or len(entries) >= rule.max_items
+                or entries[0].created_at <= now - timedelta(minutes=rule.interval_minutes)
+            )
+            if not due:
+                return False
+
+            ids = [entry.id for entry in entries]
+            # Another worker process may be flushing the same entries
+            claimed = db.execute(
+                update(AdminDigestEntry)
+                .where(AdminDigestEntry.id.in_(ids))
+                .where(AdminDigestEntry.status == "pending")
+                .values(status="flushed", flushed_at=now)
+            ).rowcount
+            if claimed != len(ids):
+                db.rollback()
+                return False
+
+            message = self.email_service.compose_admin_digest(
+                DIGEST_TITLES[digest_key],
+                [
+                    {"form_type": entry.form_type, "form_data": json.loads(entry.form_data), "received_at": entry.created_at}
+                    for entry in entries
+                ],
+            )
+            outbox_row = enqueue_email(db, message)
+            db.flush()
+            db.execute(update(AdminDigestEntry).where(AdminDigestEntry.id.in_(ids)).values(outbox_id=outbox_row.id))
+            db.commit()
+        finally:
+            db.close()
+
+        self.digests_sent += 1
+        self.entries_flushed += len(ids)
+        self.last_flush_at = datetime.now().isoformat()
+        print(f"Admin digest: queued {digest_key} digest with {len(ids)} notification(s)")
+        return True
+
+    async def stop(self) -> None:
+        """Stop the flush loop; buffered entries stay in the table for the next start"""
+        if self._task is None:
+            return
+        self._stopping = True
+        self.notify()
+        try:
+            await asyncio.wait_for(self._task, timeout=self.check_seconds)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+        self._task = None
+
+    def get_stats(self) -> dict:
+        """Digest counters and buffered entries per form"""
+        db = SessionLocal()
+        try:
+            pending = dict(db.execute(
+                select(AdminDigestEntry.digest_key, func.count())
+                .where(AdminDigestEntry.status == "pending")
+                .group_by(AdminDigestEntry.digest_key)
+            ).all())
+        finally:
+            db.close()
+        return {
+            "running": self._task is not None,
+            "rules": {slug: rule._asdict() for slug, rule in self.rules.items()},
+            "buffered": self.buffered,
+            "digests_sent": self.digests_sent,
+            "entries_flushed": self.entries_flushed,
+            "pending": pending,
+            "last_flush_at": self.last_flush_at,
+            "last_error": self.last_error,
+        }
+
+
+# Lazy initialization - one worker per process
+_admin_digest = None
+
+def get_admin_digest() -> AdminDigestWorker:
+    """Get or create admin digest worker instance"""
+    global _admin_digest
+    if _admin_digest is None:
+        _admin_digest = AdminDigestWorker()
+    return _admin_digest
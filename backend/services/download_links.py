@@ -0,0 +1,88 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+from typing import Optional
+
+# Documents that can be linked, keyed by the name used in the token and URL
+LINK_DOCUMENTS = ("brochure", "product-profile")
+
+
+class InvalidDownloadLink(ValueError):
+    """Token is malformed, tampered with, or for an unknown document"""
+
+
+class ExpiredDownloadLink(InvalidDownloadLink):
+    """Token signature is valid but it is past its expiry"""
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+def _secret() -> Optional[bytes]:
+    secret = os.getenv("DOWNLOAD_LINK_SECRET")
+    return secret.encode() if secret else None
+
+def _sign(payload: str, secret: bytes) -> str:
+    return _b64encode(hmac.new(secret, payload.encode("ascii"), hashlib.sha256).digest())
+
+def download_links_enabled() -> bool:
+    """Links replace PDF attachments when EMAIL_PDF_DELIVERY=link and the secret and public URL are set"""
+    return (
+        os.getenv("EMAIL_PDF_DELIVERY", "attachment").strip().lower() == "link"
+        and _secret() is not None
+        and bool(os.getenv("PUBLIC_BASE_URL"))
+    )
+
+def create_download_token(document: str, ref: Optional[str] = None, ttl_seconds: Optional[int] = None) -> str:
+    """Signed, self-contained token: base64url(JSON payload) + "." + base64url(HMAC-SHA256)"""
+    if document not in LINK_DOCUMENTS:
+        raise ValueError(f"Unknown document '{document}'")
+    secret = _secret()
+    if secret is None:
+        raise RuntimeError("DOWNLOAD_LINK_SECRET is not set")
+    if ttl_seconds is None:
+        try:
+            ttl_seconds = int(float(os.getenv("DOWNLOAD_LINK_TTL_HOURS", "72")) * 3600)
+        except (ValueError, TypeError):
+            ttl_seconds = 72 * 3600
+    claims = {
+        "doc": document,
+        "exp": int(time.time()) + ttl_seconds,
+        "jti": secrets.token_urlsafe(9),  # identifies this link for download tracking
+    }
+    if ref:
+        claims["ref"] = ref
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    return f"{payload}.{_sign(payload, secret)}"
+
+def create_download_url(document: str, ref: Optional[str] = None) -> str:
+    """Absolute link to GET /api/download/link/{token}"""
+    base_url = os.getenv("PUBLIC_BASE_URL", "").rstrip("/")
+    return f"{base_url}/api/download/link/{create_download_token(document, ref)}"
+
+def verify_download_token(token: str) -> dict:
+    """Check signature and expiry without touching the database; returns the claims"""
+    secret = _secret()
+    if secret is None:
+        raise InvalidDownloadLink("Download links are not configured")
+    if not token.isascii():
+        raise InvalidDownloadLink("Invalid download link")
+    payload, _, signature = token.partition(".")
+    if not payload or not signature or not hmac.compare_digest(signature, _sign(payload, secret)):
+        raise InvalidDownloadLink("Invalid download link")
+    try:
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        raise InvalidDownloadLink("Invalid download link")
+    if claims.get("doc") not in LINK_DOCUMENTS or not isinstance(claims.get("exp"), int):
+        raise InvalidDownloadLink("Invalid download link")
+    if claims["exp"] < time.time():
+        raise ExpiredDownloadLink("Download link has expired")
+    return claims
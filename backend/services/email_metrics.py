@@ -0,0 +1,159 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+# Histogram bucket upper bounds in milliseconds (last bucket is everything above)
+BUCKET_BOUNDS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+# Stages that make up one message's delivery time; dns/connect/greeting/tls/auth are
+# the parts of "acquire" spent opening a new SMTP session
+TOTAL_STAGES = ("mime", "acquire", "data", "api", "write")
+
+
+class StageHistogram:
+    """Fixed-bucket latency histogram"""
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float) -> None:
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given percentile (max for the overflow bucket)"""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= rank:
+                return float(BUCKET_BOUNDS_MS[index]) if index < len(BUCKET_BOUNDS_MS) else round(self.max_ms, 2)
+        return round(self.max_ms, 2)
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else None,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 2),
+            "buckets": {
+                (f"le_{bound}" if index < len(BUCKET_BOUNDS_MS) else "inf"): count
+                for index, (bound, count) in enumerate(zip(BUCKET_BOUNDS_MS + [None], self.buckets))
+            },
+        }
+
+
+class DeliveryTrace:
+    """Stage timings of one message, collected on the thread that delivers it"""
+
+    def __init__(self, kind: str, transport: str):
+        self.kind = kind
+        self.transport = transport
+        self.stages: Dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds * 1000
+
+
+class EmailStageMetrics:
+    """Per-stage delivery latency histograms, tagged by email kind.
+
+    Stages: mime (building the MIME message), acquire (getting a pooled SMTP
+    session; includes dns, connect, greeting, tls and auth when a new session
+    is opened), data (MAIL/RCPT/DATA), api (SendGrid HTTP call), write (file
+    sink) and total.
+    With EMAIL_STAGE_LOG=true each delivery is also printed as one JSON line.
+    """
+
+    def __init__(self, log_enabled: Optional[bool] = None):
+        if log_enabled is None:
+            log_enabled = os.getenv("EMAIL_STAGE_LOG", "false").lower() == "true"
+        self.log_enabled = log_enabled
+        self._histograms: Dict[str, Dict[str, StageHistogram]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def current(self) -> Optional[DeliveryTrace]:
+        return getattr(self._local, "trace", None)
+
+    def activate(self, trace: Optional[DeliveryTrace]) -> None:
+        """Attribute stages recorded on this thread to `trace` from now on"""
+        self._local.trace = trace
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Add a stage timing to the active trace (ignored when nothing is being traced)"""
+        trace = self.current
+        if trace is not None:
+            trace.add(stage, seconds)
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def finish(self, trace: DeliveryTrace, error: Optional[Exception] = None) -> None:
+        """Fold a finished trace into the histograms (and the JSON log)"""
+        if self.current is trace:
+            self.activate(None)
+        stages = dict(trace.stages)
+        stages["total"] = sum(ms for stage, ms in stages.items() if stage in TOTAL_STAGES)
+        with self._lock:
+            by_stage = self._histograms.setdefault(trace.kind, {})
+            for stage, ms in stages.items():
+                by_stage.setdefault(stage, StageHistogram()).add(ms)
+        if self.log_enabled:
+            print(json.dumps({
+                "event": "email_delivery",
+                "at": datetime.now().isoformat(),
+                "kind": trace.kind,
+                "transport": trace.transport,
+                "ok": error is None,
+                "error": str(error) if error is not None else None,
+                "stages_ms": {stage: round(ms, 2) for stage, ms in stages.items()},
+            }))
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "bucket_bounds_ms": BUCKET_BOUNDS_MS,
+                "kinds": {
+                    kind: {stage: histogram.to_dict() for stage, histogram in by_stage.items()}
+                    for kind, by_stage in self._histograms.items()
+                },
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+# Lazy initialization - one set of histograms per process
+_email_stage_metrics = None
+_email_stage_metrics_lock = threading.Lock()
+
+def get_email_stage_metrics() -> EmailStageMetrics:
+    """Get or create email stage metrics instance (first use may be on several email threads at once)"""
+    global _email_stage_metrics
+    if _email_stage_metrics is None:
+        with _email_stage_metrics_lock:
+            if _email_stage_metrics is None:
+                _email_stage_metrics = EmailStageMetrics()
+    return _email_stage_metrics
@@ -1,18 +1,57 @@
-import smtplib
 import os
-import base64
 import uuid
 import asyncio
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email.mime.image import MIMEImage
-from email import encoders
-from typing import Optional, List, Callable
+from typing import Optional, List
 from pathlib import Path
 from datetime import datetime
 
+from services.smtp_pool import SMTPConnectionPool, get_smtp_pool
+from services.attachment_cache import get_attachment_cache
+from services.email_templates import email_templates
+from services.email_transports import EmailTransport, create_email_transport
+
+# Dedicated threads for blocking SMTP work, shared by every EmailService in this process
+_email_executor = None
+
+def get_email_executor() -> ThreadPoolExecutor:
+    """Get or create the email executor (EMAIL_SEND_WORKERS threads, defaults to EMAIL_POOL_SIZE)"""
+    global _email_executor
+    if _email_executor is None:
+        try:
+            workers = int(os.getenv("EMAIL_SEND_WORKERS", os.getenv("EMAIL_POOL_SIZE", "3")))
+        except (ValueError, TypeError):
+            workers = 3
+        _email_executor = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="email-send")
+    return _email_executor
+
+# Process-wide cap on sends in flight on the event loop (outbox and fan-out sends share it)
+_send_semaphore = None
+_send_semaphore_loop = None
+
+def get_email_send_semaphore() -> asyncio.Semaphore:
+    """Get or create the send semaphore (EMAIL_SEND_CONCURRENCY, defaults to EMAIL_SEND_WORKERS)"""
+    global _send_semaphore, _send_semaphore_loop
+    loop = asyncio.get_running_loop()
+    # A semaphore belongs to one loop - recreate it if the app is started on a new one
+    if _send_semaphore is None or _send_semaphore_loop is not loop:
+        try:
+            limit = int(os.getenv("EMAIL_SEND_CONCURRENCY", os.getenv("EMAIL_SEND_WORKERS", os.getenv("EMAIL_POOL_SIZE", "3"))))
+        except (ValueError, TypeError):
+            limit = 3
+        _send_semaphore = asyncio.Semaphore(max(limit, 1))
+        _send_semaphore_loop = loop
+    return _send_semaphore
+
+def shutdown_email_executor() -> None:
+    """Wait for in-flight sends to finish and stop the email threads"""
+    global _email_executor
+    if _email_executor is not None:
+        _email_executor.shutdown(wait=True)
+        _email_executor = None
+
 class EmailService:
     def __init__(self):
         self.smtp_host = os.getenv("EMAIL_HOST", "sparserp@gmail.com")
@@ -29,10 +68,39 @@ class EmailService:
         self.password = password.replace(" ", "") if password else ""
         self.from_email = os.getenv("DEFAULT_FROM_EMAIL")
         self.admin_email = os.getenv("ADMIN_EMAIL")
+        # Hosted logo URL - when set, the signature links to it instead of embedding the ~100 KB PNG
+        self.logo_url = os.getenv("EMAIL_LOGO_URL") or None
+        self._logo_path: Optional[str] = None
+        self._transport: Optional[EmailTransport] = None
         
         # Debug: Print configuration (without sensitive data)
         print(f"Email Service Config: Host={self.smtp_host}, Port={self.smtp_port}, TLS={self.use_tls}, User={self.username}, From={self.from_email}")
 
+    @staticmethod
+    def _message(
+        kind: str,
+        to_email: str,
+        subject: str,
+        body: str,
+        html_body: Optional[str] = None,
+        attachments: Optional[List[str]] = None,
+        embedded_images: Optional[dict] = None
+    ) -> dict:
+        """Composed message, as keyword arguments for send_email"""
+        return {
+            "to_email": to_email,
+            "subject": subject,
+            "body": body,
+            "html_body": html_body,
+            "attachments": attachments,
+            "embedded_images": embedded_images,
+            "kind": kind,
+        }
+
+    def _get_smtp_pool(self) -> SMTPConnectionPool:
+        """Shared connection pool for this SMTP server and account"""
+        return get_smtp_pool(self.smtp_host, self.smtp_port, self.username, self.password, self.use_tls)
+
     async def send_email(
         self,
         to_email: str,
@@ -40,177 +108,282 @@ class EmailService:
         body: str,
         html_body: Optional[str] = None,
         attachments: Optional[List[str]] = None,
-        embedded_images: Optional[dict] = None
+        embedded_images: Optional[dict] = None,
+        kind: str = "generic"
     ) -> bool:
-        """Send an email asynchronously"""
-        try:
-            msg = MIMEMultipart("related")  # Use "related" to support embedded images
-            msg["From"] = self.from_email
-            msg["To"] = to_email
-            msg["Subject"] = subject
-
-            # Create alternative part for text/html
-            msg_alternative = MIMEMultipart("alternative")
-            msg.attach(msg_alternative)
-
-            # Add text and HTML parts
-            if html_body:
-                text_part = MIMEText(body, "plain")
-                html_part = MIMEText(html_body, "html")
-                msg_alternative.attach(text_part)
-                msg_alternative.attach(html_part)
-            else:
-                msg_alternative.attach(MIMEText(body, "plain"))
-            
-            # Add embedded images (like logo)
-            if embedded_images:
-                for cid, image_path in embedded_images.items():
-                    if os.path.exists(image_path):
-                        try:
-                            with open(image_path, "rb") as img_file:
-                                img = MIMEImage(img_file.read())
-                                img.add_header("Content-ID", f"<{cid}>")
-                                img.add_header("Content-Disposition", "inline", filename=os.path.basename(image_path))
-                                msg.attach(img)
-                                print(f"Embedded image: {image_path} as {cid}")
-                        except Exception as e:
-                            print(f"Error embedding image {image_path}: {e}")
-
-            # Add attachments if provided
-            if attachments:
-                for file_path in attachments:
-                    if os.path.exists(file_path):
-                        try:
-                            with open(file_path, "rb") as attachment:
-                                part = MIMEBase("application", "octet-stream")
-                                part.set_payload(attachment.read())
-                                encoders.encode_base64(part)
-                                # Clean filename (remove double extensions)
-                                filename = os.path.basename(file_path)
-                                if filename.endswith('.pdf.pdf'):
-                                    filename = filename.replace('.pdf.pdf', '.pdf')
-                                part.add_header(
-                                    "Content-Disposition",
-                                    f"attachment; filename={filename}"
-                                )
-                                part.add_header("Content-Type", "application/pdf")
-                                msg.attach(part)
-                                print(f"Attached PDF: {filename}")
-                        except Exception as e:
-                            print(f"Error attaching file {file_path}: {e}")
-                    else:
-                        print(f"Attachment file not found: {file_path}")
-
-            # Validate configuration before attempting connection
-            if not self.smtp_host:
-                raise ValueError("EMAIL_HOST is not set in environment variables")
-            if not self.username:
-                raise ValueError("EMAIL_HOST_USER is not set in environment variables")
-            if not self.password:
-                raise ValueError("EMAIL_HOST_PASSWORD is not set in environment variables")
-            
-            # Send email
-            # Use SSL for port 465, or STARTTLS for port 587
-            print(f"Attempting to connect to {self.smtp_host}:{self.smtp_port} (SSL: {self.smtp_port == 465})")
-            
-            if self.smtp_port == 465:
-                # Use SSL connection for port 465 (required for Render and other cloud platforms)
-                print("Using SMTP_SSL for port 465")
-                try:
-                    server = smtplib.SMTP_SSL(self.smtp_host, self.smtp_port, timeout=30)
-                    print("Connected successfully, attempting login...")
-                    server.login(self.username, self.password)
-                    print("Login successful, sending message...")
-                    server.send_message(msg)
-                    server.quit()
-                    print("Email sent successfully via SMTP_SSL")
-                except Exception as ssl_error:
-                    print(f"SMTP_SSL error: {str(ssl_error)}")
-                    try:
-                        server.quit()
-                    except:
-                        pass
-                    raise
-            else:
-                # Use STARTTLS for port 587 (for local development)
-                print(f"Using SMTP with STARTTLS for port {self.smtp_port}")
-                try:
-                    server = smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=30)
-                    print("Connected successfully, starting TLS...")
-                    if self.use_tls:
-                        server.starttls()
-                    print("TLS started, attempting login...")
-                    server.login(self.username, self.password)
-                    print("Login successful, sending message...")
-                    server.send_message(msg)
-                    server.quit()
-                    print("Email sent successfully via SMTP STARTTLS")
-                except Exception as tls_error:
-                    print(f"SMTP STARTTLS error: {str(tls_error)}")
-                    try:
-                        server.quit()
-                    except:
-                        pass
-                    raise
+        """Send an email without blocking the event loop. Returns False if it could not be sent.
 
+        Building the message (which reads attachments from disk) and the whole SMTP
+        exchange - connect, TLS, login, DATA - run on the dedicated email executor;
+        the event loop only awaits the result.
+        """
+        try:
+            await self.deliver_email(to_email, subject, body, html_body, attachments, embedded_images, kind)
             return True
         except Exception as e:
             print(f"Error sending email: {str(e)}")
             return False
 
-    async def send_form_notification(
+    async def deliver_email(
+        self,
+        to_email: str,
+        subject: str,
+        body: str,
+        html_body: Optional[str] = None,
+        attachments: Optional[List[str]] = None,
+        embedded_images: Optional[dict] = None,
+        kind: str = "generic"
+    ) -> None:
+        """Same as send_email, but raises on failure so callers (the outbox) can record why"""
+        loop = asyncio.get_running_loop()
+        async with get_email_send_semaphore():
+            await loop.run_in_executor(
+                get_email_executor(),
+                self._deliver_sync,
+                to_email, subject, body, html_body, attachments, embedded_images, kind
+            )
+
+    async def send_emails(self, messages: List[dict]) -> List[dict]:
+        """Send several composed messages (compose_* results) concurrently on the running loop.
+
+        Concurrency is bounded by the process-wide send semaphore, so fanning out
+        never opens more SMTP sessions than the pool allows. One result per
+        message, in the same order: {"to_email", "kind", "sent", "error"}.
+        """
+        async def deliver(message: dict) -> dict:
+            try:
+                await self.deliver_email(**message)
+            except Exception as e:
+                return self._send_result(message, e)
+            return self._send_result(message, None)
+
+        return list(await asyncio.gather(*(deliver(message) for message in messages)))
+
+    async def deliver_email_batch(self, messages: List[dict]) -> List[Optional[Exception]]:
+        """Send composed messages together: over a single SMTP session, or
+        grouped into as few SendGrid API calls as possible.
+
+        Takes one send slot and one executor thread for the whole batch; over
+        SMTP each message's commands are pipelined when the server supports it. Returns
+        None for each delivered message, otherwise the exception; a configuration
+        error fails the whole batch.
+        """
+        if not messages:
+            return []
+        loop = asyncio.get_running_loop()
+        async with get_email_send_semaphore():
+            return await loop.run_in_executor(get_email_executor(), self._deliver_batch_sync, messages)
+
+    async def send_email_batch(self, messages: List[dict]) -> List[dict]:
+        """deliver_email_batch with per-message results like send_emails"""
+        try:
+            errors = await self.deliver_email_batch(messages)
+        except Exception as e:
+            errors = [e] * len(messages)
+        return [self._send_result(message, error) for message, error in zip(messages, errors)]
+
+    @staticmethod
+    def _send_result(message: dict, error: Optional[Exception]) -> dict:
+        result = {"to_email": message["to_email"], "kind": message.get("kind", "generic"), "sent": error is None, "error": None}
+        if error is not None:
+            print(f"Error sending {result['kind']} email to {result['to_email']}: {str(error)}")
+            result["error"] = str(error)
+        return result
+
+    def _deliver_sync(
+        self,
+        to_email: str,
+        subject: str,
+        body: str,
+        html_body: Optional[str] = None,
+        attachments: Optional[List[str]] = None,
+        embedded_images: Optional[dict] = None,
+        kind: str = "generic"
+    ) -> None:
+        """Blocking send, run on the email executor"""
+        error = self._deliver_batch_sync([
+            self._message(kind, to_email, subject, body, html_body, attachments, embedded_images)
+        ])[0]
+        if error is not None:
+            raise error
+        print("Email sent successfully")
+
+    def _check_config(self) -> None:
+        """Validate configuration before attempting connection"""
+        if not self.smtp_host:
+            raise ValueError("EMAIL_HOST is not set in environment variables")
+        if not self.username:
+            raise ValueError("EMAIL_HOST_USER is not set in environment variables")
+        if not self.password:
+            raise ValueError("EMAIL_HOST_PASSWORD is not set in environment variables")
+
+    def _get_transport(self) -> EmailTransport:
+        """Delivery backend named by EMAIL_TRANSPORT (see services/email_transports.py)"""
+        if self._transport is None:
+            self._transport = create_email_transport(self)
+        return self._transport
+
+    def _deliver_batch_sync(self, messages: List[dict]) -> List[Optional[Exception]]:
+        """Blocking send of several messages through the transport, run on the email executor.
+
+        SMTP sends them over one pooled session (SMTP_SSL for port 465,
+        STARTTLS otherwise - see services/smtp_pool.py).
+        """
+        errors = self._get_transport().send_messages(messages)
+        if len(messages) > 1:
+            print(f"Batch sent: {errors.count(None)}/{len(messages)} delivered")
+        return errors
+
+    def _build_mime(self, message: dict) -> MIMEMultipart:
+        """MIME message for a composed message dict"""
+        return self._build_message(
+            message["to_email"], message["subject"], message["body"], message.get("html_body"),
+            message.get("attachments"), message.get("embedded_images")
+        )
+
+    def _build_message(
+        self,
+        to_email: str,
+        subject: str,
+        body: str,
+        html_body: Optional[str] = None,
+        attachments: Optional[List[str]] = None,
+        embedded_images: Optional[dict] = None
+    ) -> MIMEMultipart:
+        """Assemble the MIME message with text/HTML alternatives, inline images and attachments"""
+        msg = MIMEMultipart("related")  # Use "related" to support embedded images
+        msg["From"] = self.from_email
+        msg["To"] = to_email
+        msg["Subject"] = subject
+
+        # Create alternative part for text/html
+        msg_alternative = MIMEMultipart("alternative")
+        msg.attach(msg_alternative)
+
+        # Add text and HTML parts
+        if html_body:
+            text_part = MIMEText(body, "plain")
+            html_part = MIMEText(html_body, "html")
+            msg_alternative.attach(text_part)
+            msg_alternative.attach(html_part)
+        else:
+            msg_alternative.attach(MIMEText(body, "plain"))
+
+        # Add embedded images (like logo) - base64 payload encoded once and cached
+        if embedded_images:
+            for cid, image_path in embedded_images.items():
+                if os.path.exists(image_path):
+                    try:
+                        img, filename = get_attachment_cache().mime_part(image_path)
+                        img.add_header("Content-ID", f"<{cid}>")
+                        img.add_header("Content-Disposition", "inline", filename=filename)
+                        msg.attach(img)
+                        print(f"Embedded image: {image_path} as {cid}")
+                    except Exception as e:
+                        print(f"Error embedding image {image_path}: {e}")
+
+        # Add attachments if provided (cached the same way)
+        if attachments:
+            for file_path in attachments:
+                if os.path.exists(file_path):
+                    try:
+                        part, filename = get_attachment_cache().mime_part(file_path)
+                        # Clean filename (remove double extensions)
+                        if filename.endswith('.pdf.pdf'):
+                            filename = filename.replace('.pdf.pdf', '.pdf')
+                        part.add_header(
+                            "Content-Disposition",
+                            f"attachment; filename={filename}"
+                        )
+                        msg.attach(part)
+                        print(f"Attached file: {filename}")
+                    except Exception as e:
+                        print(f"Error attaching file {file_path}: {e}")
+                else:
+                    print(f"Attachment file not found: {file_path}")
+
+        return msg
+
+    def compose_form_notification(
         self,
         form_type: str,
         form_data: dict,
         recipient_email: Optional[str] = None
-    ) -> bool:
-        """Send notification email to admin about form submission"""
+    ) -> dict:
+        """Build the admin notification about a form submission"""
         recipient = recipient_email or self.admin_email
         
         subject = f"New {form_type} Form Submission - SPARS"
         
-        # Create HTML email body
-        html_body = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                <h2 style="color: #2563eb;">New {form_type} Form Submission</h2>
-                <div style="background-color: #f9fafb; padding: 20px; border-radius: 8px; margin-top: 20px;">
-                    <h3 style="color: #1f2937; margin-top: 0;">Form Details:</h3>
-                    <table style="width: 100%; border-collapse: collapse;">
-        """
+        html_rows, text_rows = self._notification_rows(form_data)
         
-        for key, value in form_data.items():
-            if value:  # Only include non-empty fields
-                formatted_key = key.replace("_", " ").title()
-                html_body += f"""
-                        <tr style="border-bottom: 1px solid #e5e7eb;">
-                            <td style="padding: 8px 0; font-weight: bold; width: 40%;">{formatted_key}:</td>
-                            <td style="padding: 8px 0;">{value}</td>
-                        </tr>
-                """
-        
-        html_body += """
-                    </table>
-                </div>
-                <p style="margin-top: 20px; color: #6b7280; font-size: 14px;">
-                    This is an automated notification from the SPARS website.
-                </p>
-            </div>
-        </body>
-        </html>
-        """
+        html_body = email_templates.render("admin_notification_html", form_type=form_type, rows=html_rows)
+        text_body = email_templates.render("admin_notification_text", form_type=form_type, rows=text_rows)
         
-        text_body = f"New {form_type} Form Submission\n\n"
-        for key, value in form_data.items():
-            if value:
-                formatted_key = key.replace("_", " ").title()
-                text_body += f"{formatted_key}: {value}\n"
+        return self._message("admin_notification", recipient, subject, text_body, html_body, None, {})
+
+    async def send_form_notification(
+        self,
+        form_type: str,
+        form_data: dict,
+        recipient_email: Optional[str] = None
+    ) -> bool:
+        """Send notification email to admin about form submission"""
+        return await self.send_email(**self.compose_form_notification(form_type, form_data, recipient_email))
+
+    @staticmethod
+    def _notification_rows(form_data: dict):
+        """HTML table rows and text lines, one per non-empty field"""
+        fields = [
+            {"formatted_key": key.replace("_", " ").title(), "value": value}
+            for key, value in form_data.items()
+            if value
+        ]
+        html_rows = "".join(email_templates.render("admin_notification_row_html", field) for field in fields)
+        text_rows = "".join(email_templates.render("admin_notification_row_text", field) for field in fields)
+        return html_rows, text_rows
+
+    def compose_admin_digest(
+        self,
+        title: str,
+        entries: List[dict],
+        recipient_email: Optional[str] = None
+    ) -> dict:
+        """Build one admin email summarising several buffered form notifications.
+
+        Each entry is {"form_type", "form_data", "received_at"} (a datetime), oldest first.
+        """
+        recipient = recipient_email or self.admin_email
         
-        return await self.send_email(recipient, subject, text_body, html_body, None, {})
+        count = len(entries)
+        subject = f"{count} New {title} Submission{'s' if count != 1 else ''} - SPARS"
+        
+        html_entries = []
+        text_entries = []
+        for entry in entries:
+            html_rows, text_rows = self._notification_rows(entry["form_data"])
+            values = {
+                "form_type": entry["form_type"],
+                "received_at": entry["received_at"].strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            html_entries.append(email_templates.render("admin_digest_entry_html", values, rows=html_rows))
+            text_entries.append(email_templates.render("admin_digest_entry_text", values, rows=text_rows))
+        
+        values = {
+            "title": title,
+            "count": count,
+            "first_at": entries[0]["received_at"].strftime("%Y-%m-%d %H:%M:%S"),
+            "last_at": entries[-1]["received_at"].strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        html_body = email_templates.render("admin_digest_html", values, entries="".join(html_entries))
+        text_body = email_templates.render("admin_digest_text", values, entries="".join(text_entries))
+        
+        return self._message("admin_digest", recipient, subject, text_body, html_body, None, {})
 
     def _get_logo_path(self) -> Optional[str]:
-        """Get logo file path"""
+        """Get logo file path (looked up once per service)"""
+        if self._logo_path is not None:
+            return self._logo_path or None
         
         # Try multiple possible paths (checking both old src/assets and new public/assets locations)
         possible_paths = [
@@ -223,69 +396,42 @@ class EmailService:
         
         for logo_path in possible_paths:
             if logo_path.exists():
-                return str(logo_path)
+                self._logo_path = str(logo_path)
+                return self._logo_path
         
         # If logo not found, return None
         print("Warning: SPARS logo not found. Email will be sent without logo.")
         print(f"Checked paths: {[str(p) for p in possible_paths]}")
+        self._logo_path = ""
         return None
 
+    def _get_logo(self):
+        """Signature block and inline images for user-facing emails"""
+        logo_path = self._get_logo_path() if not self.logo_url else None
+        embedded_images = {}
+        logo_cid = None
+        
+        if logo_path:
+            logo_cid = "spars_logo"
+            embedded_images[logo_cid] = logo_path
+        
+        return self._get_signature_block(logo_cid), embedded_images
+
     def _get_signature_block(self, logo_cid: Optional[str] = None) -> str:
-        """Get responsive signature block"""
-        dot = '<span style="color:#337AB7;font-size:17px;line-height:0;">•</span>'
-        
-        # Logo HTML - use CID reference if logo exists
-        logo_html = ""
-        if logo_cid:
-            logo_html = f"""
-    <td style="padding-right:10px;">
-      <img src="cid:{logo_cid}" alt="SPARS"
-           height="32" style="height:32px;width:auto;display:block;max-width:100%;">
-    </td>
-"""
-        else:
-            # If no logo, add a text placeholder
-            logo_html = '<td style="padding-right:10px;"><strong style="color:#337AB7;font-size:18px;">SPARS</strong></td>'
-        
-        return f"""
-<table role="presentation" cellpadding="0" cellspacing="0"
-       style="margin-top:12px;font-size:14px;max-width:480px;width:100%;">
-  <tr style="vertical-align:top;">
-{logo_html}
-
-    <td style="border-left:1px solid #ccc;width:1px;"></td>
-    <td style="width:10px;"></td>
-
-    <td style="font-family:Arial,sans-serif;color:#000;line-height:1.35;">
-      <div>{dot}&nbsp;Magnum&nbsp;Opus&nbsp;System&nbsp;Corp.&nbsp;–&nbsp;USA</div>
-      <div>{dot}&nbsp;+1&nbsp;(646)&nbsp;775-2716</div>
-      <div>{dot}&nbsp;<a href="https://www.sparsus.com"
-            style="color:#337AB7;text-decoration:none;">www.sparsus.com</a></div>
-      <div>{dot}&nbsp;112&nbsp;West&nbsp;34&nbsp;St.&nbsp;18<sup>th</sup>&nbsp;Floor,&nbsp;New&nbsp;York,&nbsp;NY&nbsp;10120</div>
-      <div>{dot}&nbsp;<a href="mailto:sales@sparsus.com"
-            style="color:#337AB7;text-decoration:none;">sales@sparsus.com</a></div>
-    </td>
-  </tr>
-</table>
-"""
+        """Get responsive signature block (rendered once per logo source, then cached)"""
+        # Logo - hosted URL if configured, else CID reference if logo exists
+        logo_src = self.logo_url or (f"cid:{logo_cid}" if logo_cid else None)
+        return email_templates.signature(logo_src)
 
-    async def send_confirmation_email(
+    def compose_confirmation_email(
         self,
         to_email: str,
         form_type: str,
         attachments: Optional[List[str]] = None,
         name: Optional[str] = None
-    ) -> bool:
-        """Send confirmation email to user"""
-        logo_path = self._get_logo_path()
-        logo_cid = None
-        embedded_images = {}
-        
-        if logo_path:
-            logo_cid = "spars_logo"
-            embedded_images[logo_cid] = logo_path
-        
-        signature = self._get_signature_block(logo_cid)
+    ) -> dict:
+        """Build the confirmation email to the user"""
+        signature, embedded_images = self._get_logo()
         
         # Capitalize first letter of name (and each word for full names)
         user_name = name or "Valued Customer"
@@ -299,317 +445,102 @@ class EmailService:
         if "newsletter" in form_type_lower:
             # Newsletter Subscription
             subject = "Thank you for subscribing to SPARS Newsletter"
-            html_body = f"""\
-<!DOCTYPE html>
-<html>
-  <head>
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  </head>
-  <body style="font-family:Arial,sans-serif;line-height:1.6;color:#333;margin:0;padding:20px;max-width:600px;margin:0 auto;">
-    <p>Dear <strong>{user_name}</strong>,</p>
-
-    <p>
-      Thank you for your interest in <strong>SPARS – the Ultimate ERP Solution for the Home Furnishing Industry</strong>.
-    </p>
-
-    <p>
-      You have been successfully subscribed to our newsletter. You'll now receive updates, insights, and product news from SPARS.
-    </p>
-
-    <p>
-      If you'd like a <strong>personalized demo</strong> or have any questions, feel free to reply to this email—we'd be happy to assist you.
-    </p>
-
-    <p style="margin-top:18px;margin-bottom:0;">
-      Best regards,<br><br><strong>Team&nbsp;SPARS</strong><br>
-    </p>
-
-    {signature}
-  </body>
-</html>
-"""
-            text_body = f"""Dear {user_name},
-
-Thank you for your interest in SPARS – the Ultimate ERP Solution for the Home Furnishing Industry.
-
-You have been successfully subscribed to our newsletter. You'll now receive updates, insights, and product news from SPARS.
-
-If you'd like a personalized demo or have any questions, feel free to reply to this email—we'd be happy to assist you.
-
-Best regards,
-
-Team SPARS
-
-Magnum Opus System Corp. – USA
-+1 (646) 775-2716
-www.sparsus.com
-112 West 34 St. 18th Floor, New York, NY 10120
-sales@sparsus.com
-"""
-        
+            variant = "newsletter"
         elif "sales" in form_type_lower:
             # Talk to Sales - Check this BEFORE "contact" or "inquiry" to avoid matching "Sales Inquiry"
             subject = "Thank You for Contacting SPARS Sales Team"
-            html_body = f"""\
-<!DOCTYPE html>
-<html>
-  <head>
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  </head>
-  <body style="font-family:Arial,sans-serif;line-height:1.6;color:#333;margin:0;padding:20px;max-width:600px;margin:0 auto;">
-    <p>Dear <strong>{user_name}</strong>,</p>
-
-    <p>
-      Thank you for your interest in <strong>SPARS – the Ultimate ERP Solution for the Home Furnishing Industry</strong>.
-    </p>
-
-    <p>
-      We have received your request to connect with our sales team. One of our representatives will get in touch with you shortly to discuss your requirements.
-    </p>
-
-    <p>
-      If you'd like a <strong>personalized demo</strong> or have any questions in the meantime, feel free to reply to this email.
-    </p>
-
-    <p style="margin-top:18px;margin-bottom:0;">
-      Best regards,<br><br><strong>Team&nbsp;SPARS</strong><br>
-    </p>
-
-    {signature}
-  </body>
-</html>
-"""
-            text_body = f"""Dear {user_name},
-
-Thank you for your interest in SPARS – the Ultimate ERP Solution for the Home Furnishing Industry.
-
-We have received your request to connect with our sales team. One of our representatives will get in touch with you shortly to discuss your requirements.
-
-If you'd like a personalized demo or have any questions in the meantime, feel free to reply to this email.
-
-Best regards,
-
-Team SPARS
-
-Magnum Opus System Corp. – USA
-+1 (646) 775-2716
-www.sparsus.com
-112 West 34 St. 18th Floor, New York, NY 10120
-sales@sparsus.com
-"""
-        
+            variant = "sales"
         elif "demo" in form_type_lower:
             # Demo Request
             subject = "Thank You for Requesting a Demo – SPARS"
-            html_body = f"""\
-<!DOCTYPE html>
-<html>
-  <head>
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  </head>
-  <body style="font-family:Arial,sans-serif;line-height:1.6;color:#333;margin:0;padding:20px;max-width:600px;margin:0 auto;">
-    <p>Dear <strong>{user_name}</strong>,</p>
-
-    <p>
-      Thank you for your interest in <strong>SPARS – the Ultimate ERP Solution for the Home Furnishing Industry</strong>.
-    </p>
-
-    <p>
-      We have received your demo request. Our team will contact you shortly to schedule the demo and share further details.
-    </p>
-
-    <p style="margin-top:18px;margin-bottom:0;">
-      Best regards,<br><br><strong>Team&nbsp;SPARS</strong><br>
-    </p>
-
-    {signature}
-  </body>
-</html>
-"""
-            text_body = f"""Dear {user_name},
-
-Thank you for your interest in SPARS – the Ultimate ERP Solution for the Home Furnishing Industry.
-
-We have received your demo request. Our team will contact you shortly to schedule the demo and share further details.
-
-Best regards,
-
-Team SPARS
-
-Magnum Opus System Corp. – USA
-+1 (646) 775-2716
-www.sparsus.com
-112 West 34 St. 18th Floor, New York, NY 10120
-sales@sparsus.com
-"""
-        
+            variant = "demo"
         elif "contact" in form_type_lower or ("inquiry" in form_type_lower and "sales" not in form_type_lower):
             # Contact Us
             subject = "Thank You for Contacting SPARS - We've Received Your Inquiry"
-            html_body = f"""\
-<!DOCTYPE html>
-<html>
-  <head>
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  </head>
-  <body style="font-family:Arial,sans-serif;line-height:1.6;color:#333;margin:0;padding:20px;max-width:600px;margin:0 auto;">
-    <p>Dear <strong>{user_name}</strong>,</p>
-
-    <p>
-      Thank you for your interest in <strong>SPARS – the Ultimate ERP Solution for the Home Furnishing Industry</strong>.
-    </p>
-
-    <p>
-      We have received your inquiry submitted through our website. Our team will review it and get back to you shortly.
-    </p>
-
-    <p>
-      If you'd like a <strong>personalized demo</strong> or have any additional questions, feel free to reply to this email.
-    </p>
-
-    <p style="margin-top:18px;margin-bottom:0;">
-      Best regards,<br><br><strong>Team&nbsp;SPARS</strong><br>
-    </p>
-
-    {signature}
-  </body>
-</html>
-"""
-            text_body = f"""Dear {user_name},
-
-Thank you for your interest in SPARS – the Ultimate ERP Solution for the Home Furnishing Industry.
-
-We have received your inquiry submitted through our website. Our team will review it and get back to you shortly.
-
-If you'd like a personalized demo or have any additional questions, feel free to reply to this email.
-
-Best regards,
-Team SPARS
-
-Magnum Opus System Corp. – USA
-+1 (646) 775-2716
-www.sparsus.com
-112 West 34 St. 18th Floor, New York, NY 10120
-sales@sparsus.com
-"""
-        
+            variant = "contact"
         else:
             # Default/fallback (shouldn't happen, but keeping for safety)
             subject = f"Thank you for your {form_type} request - SPARS"
-            html_body = f"""\
-<!DOCTYPE html>
-<html>
-  <head>
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  </head>
-  <body style="font-family:Arial,sans-serif;line-height:1.6;color:#333;margin:0;padding:20px;max-width:600px;margin:0 auto;">
-    <p>Dear <strong>{user_name}</strong>,</p>
-
-    <p>
-      Thank you for your interest in <strong>SPARS – the Ultimate ERP Solution for the Home Furnishing Industry</strong>.
-    </p>
-
-    <p>
-      We have received your {form_type} request and will get back to you shortly.
-    </p>
-
-    <p style="margin-top:18px;margin-bottom:0;">
-      Best regards,<br><br><strong>Team&nbsp;SPARS</strong><br>
-    </p>
-
-    {signature}
-  </body>
-</html>
-"""
-            text_body = f"""Dear {user_name},
-
-Thank you for your interest in SPARS – the Ultimate ERP Solution for the Home Furnishing Industry.
-
-We have received your {form_type} request and will get back to you shortly.
-
-Best regards,
-
-Team SPARS
-
-Magnum Opus System Corp. – USA
-+1 (646) 775-2716
-www.sparsus.com
-112 West 34 St. 18th Floor, New York, NY 10120
-sales@sparsus.com
-"""
+            variant = "default"
+        
+        values = {"user_name": user_name, "form_type": form_type, "signature": signature}
+        html_body = email_templates.render(f"confirmation_{variant}_html", values)
+        text_body = email_templates.render(f"confirmation_{variant}_text", values)
         
-        return await self.send_email(to_email, subject, text_body, html_body, attachments, embedded_images)
+        return self._message("confirmation", to_email, subject, text_body, html_body, attachments, embedded_images)
 
-    async def send_brochure_email(
+    async def send_confirmation_email(
         self,
         to_email: str,
-        name: str,
-        attachments: Optional[List[str]] = None
+        form_type: str,
+        attachments: Optional[List[str]] = None,
+        name: Optional[str] = None
     ) -> bool:
-        """Send brochure email with PDF attachment"""
+        """Send confirmation email to user"""
+        return await self.send_email(**self.compose_confirmation_email(to_email, form_type, attachments, name))
+
+    def compose_brochure_email(
+        self,
+        to_email: str,
+        name: str,
+        attachments: Optional[List[str]] = None,
+        pdf_url: Optional[str] = None
+    ) -> dict:
+        """Build the brochure email with PDF attachment, or with a download link instead when pdf_url is given"""
         subject = "SPARS Product Brochure - Thank You for Your Interest"
-        logo_path = self._get_logo_path()
-        logo_cid = None
-        embedded_images = {}
+        signature, embedded_images = self._get_logo()
         
-        if logo_path:
-            logo_cid = "spars_logo"
-            embedded_images[logo_cid] = logo_path
+        if pdf_url:
+            # Link instead of a ~600 KB base64 attachment
+            attachments = None
+            pdf_section = email_templates.render("brochure_link_section_html", pdf_url=pdf_url)
+            pdf_text = email_templates.render("brochure_link_section_text", pdf_url=pdf_url)
+        else:
+            pdf_section = email_templates.render("brochure_attached_section_html")
+            pdf_text = email_templates.render("brochure_attached_section_text")
         
-        signature = self._get_signature_block(logo_cid)
+        values = {"name": name, "pdf_section": pdf_section, "pdf_text": pdf_text, "signature": signature}
+        html_body = email_templates.render("brochure_html", values)
+        text_body = email_templates.render("brochure_text", values)
         
-        html_body = f"""\
-<!DOCTYPE html>
-<html>
-  <head>
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  </head>
-  <body style="font-family:Arial,sans-serif;line-height:1.6;color:#333;margin:0;padding:20px;max-width:600px;margin:0 auto;">
-    <p>Dear {name},</p>
+        return self._message("brochure", to_email, subject, text_body, html_body, attachments, embedded_images)
 
-    <p>
-      Thank you for your interest in <strong>SPARS – Ultimate ERP Solution
-      for the Home Furnishing Industry</strong>.
-    </p>
-
-    <p>
-      Please find attached the <strong>product brochure</strong> with detailed
-      information about our modules, capabilities, and integration options.
-    </p>
-
-    <p>
-      If you'd like a <strong>personalized demo</strong> or have any questions,
-      simply reply to this e-mail.
-    </p>
-
-    <p style="margin-top:18px;margin-bottom:0;">
-      Best regards,<br><br><strong>Team&nbsp;SPARS</strong><br>
-    </p>
+    async def send_brochure_email(
+        self,
+        to_email: str,
+        name: str,
+        attachments: Optional[List[str]] = None,
+        pdf_url: Optional[str] = None
+    ) -> bool:
+        """Send brochure email with PDF attachment (or download link)"""
+        return await self.send_email(**self.compose_brochure_email(to_email, name, attachments, pdf_url))
 
-    {signature}
-  </body>
-</html>
-"""
+    def compose_product_profile_email(
+        self,
+        to_email: str,
+        name: str,
+        pdf_url: Optional[str] = None,
+        attachments: Optional[List[str]] = None
+    ) -> dict:
+        """Build the product profile email with PDF"""
+        subject = "SPARS Product Profile - Thank You for Your Interest"
+        signature, embedded_images = self._get_logo()
         
-        text_body = f"""Dear {name},
-
-Thank you for your interest in SPARS – Ultimate ERP Solution for the Home Furnishing Industry.
-
-Please find attached the product brochure with detailed information about our modules, capabilities, and integration options.
-
-If you'd like a personalized demo or have any questions, simply reply to this e-mail.
-
-Best regards,
-Team SPARS
-
-Magnum Opus System Corp. – USA
-+1 (646) 775-2716
-www.sparsus.com
-112 West 34 St. 18th Floor, New York, NY 10120
-sales@sparsus.com
-"""
+        pdf_section = ""
+        pdf_text = email_templates.render("product_profile_attached_section_text")
+        if pdf_url:
+            # Link instead of a base64 attachment
+            attachments = None
+            pdf_section = email_templates.render("product_profile_link_section_html", pdf_url=pdf_url)
+            pdf_text = email_templates.render("product_profile_link_section_text", pdf_url=pdf_url)
+        elif attachments:
+            pdf_section = email_templates.render("product_profile_attached_section_html")
         
-        return await self.send_email(to_email, subject, text_body, html_body, attachments, embedded_images)
+        values = {"name": name, "pdf_section": pdf_section, "pdf_text": pdf_text, "signature": signature}
+        html_body = email_templates.render("product_profile_html", values)
+        text_body = email_templates.render("product_profile_text", values)
+        
+        return self._message("product_profile", to_email, subject, text_body, html_body, attachments, embedded_images)
 
     async def send_product_profile_email(
         self,
@@ -619,82 +550,7 @@ sales@sparsus.com
         attachments: Optional[List[str]] = None
     ) -> bool:
         """Send product profile email with PDF"""
-        subject = "SPARS Product Profile - Thank You for Your Interest"
-        logo_path = self._get_logo_path()
-        logo_cid = None
-        embedded_images = {}
-        
-        if logo_path:
-            logo_cid = "spars_logo"
-            embedded_images[logo_cid] = logo_path
-        
-        signature = self._get_signature_block(logo_cid)
-        
-        download_section = ""
-        if pdf_url:
-            download_section = f"""
-    <p>
-      You can download the full&nbsp;PDF product profile here:<br>
-      <a href="{pdf_url}" style="color:#337AB7;text-decoration:none;">
-        Download SPARS Product Profile&nbsp;(PDF)
-      </a>
-    </p>
-"""
-        elif attachments:
-            download_section = """
-    <p>
-      Please find attached the <strong>product profile</strong> with detailed
-      information about our modules, capabilities, and integration options.
-    </p>
-"""
-        
-        html_body = f"""\
-<!DOCTYPE html>
-<html>
-  <head>
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  </head>
-  <body style="font-family:Arial,sans-serif;line-height:1.6;color:#333;margin:0;padding:20px;max-width:600px;margin:0 auto;">
-    <p>Dear {name},</p>
-
-    <p>
-      Thank you for your interest in <strong>SPARS – Ultimate ERP Solution
-      for the Home Furnishing Industry</strong>.
-    </p>
-{download_section}
-    <p>
-      If you'd like a <strong>personalized demo</strong> or have any questions,
-      simply reply to this e-mail.
-    </p>
-
-    <p style="margin-top:18px;margin-bottom:0;">
-      Best regards,<br><br><strong>Team&nbsp;SPARS</strong><br>
-    </p>
-
-    {signature}
-  </body>
-</html>
-"""
-        
-        text_body = f"""Dear {name},
-
-Thank you for your interest in SPARS – Ultimate ERP Solution for the Home Furnishing Industry.
-
-Please find attached the product profile with detailed information about our modules, capabilities, and integration options.
-
-If you'd like a personalized demo or have any questions, simply reply to this e-mail.
-
-Best regards,
-Team SPARS
-
-Magnum Opus System Corp. – USA
-+1 (646) 775-2716
-www.sparsus.com
-112 West 34 St. 18th Floor, New York, NY 10120
-sales@sparsus.com
-"""
-        
-        return await self.send_email(to_email, subject, text_body, html_body, attachments, embedded_images)
+        return await self.send_email(**self.compose_product_profile_email(to_email, name, pdf_url, attachments))
 
     def _format_datetime(self, dt_string: str) -> str:
         """Format ISO datetime string to readable format"""
@@ -704,301 +560,58 @@ sales@sparsus.com
         except:
             return dt_string
 
-    async def send_demo_request_sales_notification(self, form_data: dict) -> bool:
-        """Send demo request notification to sales team"""
-        sales_email = "sales@sparsus.com"
-        subject = "New Demo Request Received – SPARS Website Form Submission"
+    def _sales_notification_values(self, template: str, form_data: dict) -> dict:
+        """Template slots filled from the form data (missing fields blank), with a readable submission time"""
+        values = {slot: form_data.get(slot, "") for slot in email_templates.templates[template].slots}
         
         # Format submission date/time
         submitted_at = form_data.get("submitted_at", "")
         if submitted_at:
             submitted_at = self._format_datetime(submitted_at)
+        values["submitted_at"] = submitted_at
+        return values
+
+    def compose_demo_request_sales_notification(self, form_data: dict) -> dict:
+        """Build the demo request notification to the sales team"""
+        sales_email = "sales@sparsus.com"
+        subject = "New Demo Request Received – SPARS Website Form Submission"
+        
+        values = self._sales_notification_values("demo_request_sales_html", form_data)
+        body = email_templates.render("demo_request_sales_text", values)
+        html_body = email_templates.render("demo_request_sales_html", values)
         
-        # Build plain text email body with proper indentation
-        body = f"""Hello SPARS Sales Team,
-
-A new Demo Request has been submitted through the SPARS website.
-Please review the prospect's details below and arrange the demo accordingly.
-
-⏰ Demo Request Details
-    First Name: {form_data.get("first_name", "")}
-    Last Name: {form_data.get("last_name", "")}
-    Email Address: {form_data.get("email", "")}
-    Phone Number: {form_data.get("phone", "")}
-
-    Company Name: {form_data.get("company_name", "")}
-    Company Size: {form_data.get("company_size", "")}
-
-📅 Preferred Demo Schedule
-    Preferred Demo Date: {form_data.get("preferred_demo_date", "")}
-    Preferred Demo Time: {form_data.get("preferred_demo_time", "")}
-
-📄 Additional Information
-    {form_data.get("additional_information", "")}
-
-🕐 Submission Information
-    Date & Time: {submitted_at}
-    Source: Website - Request a Demo Form
-
-Please contact the prospect to confirm availability, align expectations, and schedule
-the demo session.
-If the demo is scheduled, kindly update the sales/demo tracker accordingly.
-
-Best regards,
-SPARS Website Notification System"""
-        
-        # Build HTML email body with proper formatting matching user email style
-        html_body = f"""\
-<!DOCTYPE html>
-<html>
-  <head>
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  </head>
-  <body style="font-family:Arial,sans-serif;line-height:1.6;color:#333;margin:0;padding:20px;max-width:600px;margin:0 auto;">
-    <p><strong>Hello SPARS Sales Team,</strong></p>
-
-    <p>
-      A new <strong>Demo Request</strong> has been submitted through the SPARS website.<br>
-      Please review the prospect's details below and arrange the demo accordingly.
-    </p>
-
-    <p>
-      <strong>⏰ Demo Request Details</strong><br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>First Name:</strong> {form_data.get("first_name", "")}<br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Last Name:</strong> {form_data.get("last_name", "")}<br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Email Address:</strong> {form_data.get("email", "")}<br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Phone Number:</strong> {form_data.get("phone", "")}<br>
-      <br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Company Name:</strong> {form_data.get("company_name", "")}<br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Company Size:</strong> {form_data.get("company_size", "")}
-    </p>
-
-    <p>
-      <strong>📅 Preferred Demo Schedule</strong><br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Preferred Demo Date:</strong> {form_data.get("preferred_demo_date", "")}<br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Preferred Demo Time:</strong> {form_data.get("preferred_demo_time", "")}
-    </p>
-
-    <p>
-      <strong>📄 Additional Information</strong><br>
-      &nbsp;&nbsp;&nbsp;&nbsp;{form_data.get("additional_information", "")}
-    </p>
-
-    <p>
-      <strong>🕐 Submission Information</strong><br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Date & Time:</strong> {submitted_at}<br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Source:</strong> Website - Request a Demo Form
-    </p>
-
-    <p>
-      Please contact the prospect to confirm availability, align expectations, and schedule<br>
-      the demo session.<br>
-      If the demo is scheduled, kindly update the sales/demo tracker accordingly.
-    </p>
-
-    <p style="margin-top:18px;margin-bottom:0;">
-      Best regards,<br><br><strong>SPARS Website Notification System</strong><br>
-    </p>
-  </body>
-</html>"""
-        
-        return await self.send_email(sales_email, subject, body, html_body, None, {})
+        return self._message("sales_notification", sales_email, subject, body, html_body, None, {})
 
-    async def send_contact_inquiry_sales_notification(self, form_data: dict) -> bool:
-        """Send contact inquiry notification to sales team"""
+    async def send_demo_request_sales_notification(self, form_data: dict) -> bool:
+        """Send demo request notification to sales team"""
+        return await self.send_email(**self.compose_demo_request_sales_notification(form_data))
+
+    def compose_contact_inquiry_sales_notification(self, form_data: dict) -> dict:
+        """Build the contact inquiry notification to the sales team"""
         sales_email = "sales@sparsus.com"
         subject = "New General Inquiry Received – SPARS Website Form Submission"
         
-        # Format submission date/time
-        submitted_at = form_data.get("submitted_at", "")
-        if submitted_at:
-            submitted_at = self._format_datetime(submitted_at)
+        values = self._sales_notification_values("contact_inquiry_sales_html", form_data)
+        body = email_templates.render("contact_inquiry_sales_text", values)
+        html_body = email_templates.render("contact_inquiry_sales_html", values)
         
-        # Build plain text email body with proper indentation
-        body = f"""Hello SPARS Sales Team,
-
-A new inquiry has been submitted through the 'General Inquiry Form' on the SPARS website.
-Please review the details below and take the necessary action.
-
-📄 Inquiry Details
-    Full Name: {form_data.get("name", "")}
-    Email: {form_data.get("email", "")}
-    Phone: {form_data.get("phone", "")}
-    Company Name: {form_data.get("company", "")}
-    Inquiry Type: {form_data.get("inquiry_type", "")}
-    Message / Details Provided by User: {form_data.get("message", "")}
-
-⏰ Submission Information
-    Date & Time: {submitted_at}
-    Source: Website – General Inquiry Form
-
-Please assess the inquiry and route it to the relevant team (Sales, Support, Operations, or Management) for appropriate follow-up.
-If this inquiry is already being handled, kindly update the internal tracker accordingly.
-
-Best regards,
-SPARS Website Notification System"""
-        
-        # Build HTML email body with proper formatting matching user email style
-        html_body = f"""\
-<!DOCTYPE html>
-<html>
-  <head>
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  </head>
-  <body style="font-family:Arial,sans-serif;line-height:1.6;color:#333;margin:0;padding:20px;max-width:600px;margin:0 auto;">
-    <p><strong>Hello SPARS Sales Team,</strong></p>
-
-    <p>
-      A new inquiry has been submitted through the '<strong>General Inquiry Form</strong>' on the SPARS website.<br>
-      Please review the details below and take the necessary action.
-    </p>
-
-    <p>
-      <strong>📄 Inquiry Details</strong><br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Full Name:</strong> {form_data.get("name", "")}<br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Email:</strong> {form_data.get("email", "")}<br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Phone:</strong> {form_data.get("phone", "")}<br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Company Name:</strong> {form_data.get("company", "")}<br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Inquiry Type:</strong> {form_data.get("inquiry_type", "")}<br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Message / Details Provided by User:</strong> {form_data.get("message", "")}
-    </p>
-
-    <p>
-      <strong>⏰ Submission Information</strong><br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Date & Time:</strong> {submitted_at}<br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Source:</strong> Website – General Inquiry Form
-    </p>
-
-    <p>
-      Please assess the inquiry and route it to the relevant team (Sales, Support, Operations, or Management) for appropriate follow-up.<br>
-      If this inquiry is already being handled, kindly update the internal tracker accordingly.
-    </p>
-
-    <p style="margin-top:18px;margin-bottom:0;">
-      Best regards,<br><br><strong>SPARS Website Notification System</strong><br>
-    </p>
-  </body>
-</html>"""
-        
-        return await self.send_email(sales_email, subject, body, html_body, None, {})
+        return self._message("sales_notification", sales_email, subject, body, html_body, None, {})
 
-    async def send_talk_to_sales_notification(self, form_data: dict) -> bool:
-        """Send talk to sales notification to sales team"""
+    async def send_contact_inquiry_sales_notification(self, form_data: dict) -> bool:
+        """Send contact inquiry notification to sales team"""
+        return await self.send_email(**self.compose_contact_inquiry_sales_notification(form_data))
+
+    def compose_talk_to_sales_notification(self, form_data: dict) -> dict:
+        """Build the talk to sales notification to the sales team"""
         sales_email = "sales@sparsus.com"
         subject = "New Lead Received – Talk To Sales Form Submission"
         
-        # Format submission date/time
-        submitted_at = form_data.get("submitted_at", "")
-        if submitted_at:
-            submitted_at = self._format_datetime(submitted_at)
+        values = self._sales_notification_values("talk_to_sales_html", form_data)
+        body = email_templates.render("talk_to_sales_text", values)
+        html_body = email_templates.render("talk_to_sales_html", values)
         
-        # Build plain text email body with proper indentation
-        body = f"""Hello Sales Team,
-
-A new inquiry has been submitted through the 'Talk To Sales' form on the SPARS website. Please find the lead details below and follow up at the earliest.
-
-▲ Lead Details
-    Contact Information:
-    Name: {form_data.get("name", "")}
-    Email Address: {form_data.get("email", "")}
-    Contact Number: {form_data.get("phone", "")}
-    Company Name: {form_data.get("company", "")}
-    Message: {form_data.get("message", "")}
-
-    Requirements:
-    Current ERP System (if any): {form_data.get("current_system", "")}
-    Number of Warehouses: {form_data.get("warehouses", "")}
-    Expected Number of Users: {form_data.get("users", "")}
-    Specific Requirements or Challenges: {form_data.get("requirements", "")}
-    Implementation Time Line: {form_data.get("timeline", "")}
-
-ⓘ Submission Details
-    Date & Time: {submitted_at}
-    Source: Website - Talk To Sales Form
-
-Please review the information and reach out to the prospect for further discussion, demo scheduling, or requirement analysis.
-If this lead is already in progress, kindly update the sales tracker accordingly.
-
-Best regards,
-SPARS Website Notification System"""
-        
-        # Build HTML email body with proper formatting matching user email style
-        html_body = f"""\
-<!DOCTYPE html>
-<html>
-  <head>
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  </head>
-  <body style="font-family:Arial,sans-serif;line-height:1.6;color:#333;margin:0;padding:20px;max-width:600px;margin:0 auto;">
-    <p><strong>Hello Sales Team,</strong></p>
-
-    <p>
-      A new inquiry has been submitted through the '<strong>Talk To Sales</strong>' form on the SPARS website. Please find the lead details below and follow up at the earliest.
-    </p>
-
-    <p>
-      <strong>▲ Lead Details</strong><br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Contact Information:</strong><br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Name:</strong> {form_data.get("name", "")}<br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Email Address:</strong> {form_data.get("email", "")}<br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Contact Number:</strong> {form_data.get("phone", "")}<br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Company Name:</strong> {form_data.get("company", "")}<br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Message:</strong> {form_data.get("message", "")}<br>
-      <br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Requirements:</strong><br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Current ERP System (if any):</strong> {form_data.get("current_system", "")}<br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Number of Warehouses:</strong> {form_data.get("warehouses", "")}<br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Expected Number of Users:</strong> {form_data.get("users", "")}<br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Specific Requirements or Challenges:</strong> {form_data.get("requirements", "")}<br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Implementation Time Line:</strong> {form_data.get("timeline", "")}
-    </p>
-
-    <p>
-      <strong>ⓘ Submission Details</strong><br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Date & Time:</strong> {submitted_at}<br>
-      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Source:</strong> Website - Talk To Sales Form
-    </p>
-
-    <p>
-      Please review the information and reach out to the prospect for further discussion, demo scheduling, or requirement analysis.<br>
-      If this lead is already in progress, kindly update the sales tracker accordingly.
-    </p>
-
-    <p style="margin-top:18px;margin-bottom:0;">
-      Best regards,<br><br><strong>SPARS Website Notification System</strong><br>
-    </p>
-  </body>
-</html>"""
-        
-        return await self.send_email(sales_email, subject, body, html_body, None, {})
-
-    def send_emails_concurrent(self, email_tasks: List[Callable]) -> List[bool]:
-        """Send multiple emails concurrently using ThreadPoolExecutor"""
-        def run_async_email(email_func):
-            """Helper to run async email function in thread"""
-            try:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                result = loop.run_until_complete(email_func())
-                loop.close()
-                return result
-            except Exception as e:
-                print(f"Error in concurrent email sending: {str(e)}")
-                return False
-        
-        results = []
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            # Submit all email tasks
-            future_to_task = {executor.submit(run_async_email, task): task for task in email_tasks}
-            
-            # Collect results as they complete
-            for future in as_completed(future_to_task):
-                try:
-                    result = future.result()
-                    results.append(result)
-                except Exception as e:
-                    print(f"Email task failed: {str(e)}")
-                    results.append(False)
-        
-        return results
+        return self._message("sales_notification", sales_email, subject, body, html_body, None, {})
 
+    async def send_talk_to_sales_notification(self, form_data: dict) -> bool:
+        """Send talk to sales notification to sales team"""
+        return await self.send_email(**self.compose_talk_to_sales_notification(form_data))
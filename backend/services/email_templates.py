@@ -0,0 +1,799 @@
+import re
+import threading
+import time
+from typing import Dict, Mapping, Optional
+
+# {{ name }} marks a value filled in per send
+_SLOT = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class EmailTemplate:
+    """Email body split once into literal chunks and slot names.
+
+    Rendering only interleaves the per-send values with the precomputed
+    chunks - nothing is parsed or formatted again. Slots named in `static`
+    are inlined at compile time.
+    """
+
+    def __init__(self, name: str, source: str, static: Optional[Mapping[str, str]] = None):
+        self.name = name
+        static = static or {}
+        self._literals = []
+        self._slots = []
+        literal = ""
+        pos = 0
+        for match in _SLOT.finditer(source):
+            literal += source[pos:match.start()]
+            slot = match.group(1)
+            if slot in static:
+                literal += static[slot]
+            else:
+                self._literals.append(literal)
+                self._slots.append(slot)
+                literal = ""
+            pos = match.end()
+        self._literals.append(literal + source[pos:])
+        self.slots = frozenset(self._slots)
+
+    def render(self, values: Mapping[str, object]) -> str:
+        """Fill the slots; a missing value raises KeyError"""
+        literals = self._literals
+        parts = [literals[0]]
+        for index, slot in enumerate(self._slots, 1):
+            parts.append(str(values[slot]))
+            parts.append(literals[index])
+        return "".join(parts)
+
+
+SIGNATURE_DOT = '<span style="color:#337AB7;font-size:17px;line-height:0;">•</span>'
+SIGNATURE_LOGO_TEXT = '<td style="padding-right:10px;"><strong style="color:#337AB7;font-size:18px;">SPARS</strong></td>'
+
+TEMPLATE_SOURCES = {
+    # Signature block (rendered once per logo source and cached)
+    "signature_html": """\
+
+<table role="presentation" cellpadding="0" cellspacing="0"
+       style="margin-top:12px;font-size:14px;max-width:480px;width:100%;">
+  <tr style="vertical-align:top;">
+{{logo_html}}
+
+    <td style="border-left:1px solid #ccc;width:1px;"></td>
+    <td style="width:10px;"></td>
+
+    <td style="font-family:Arial,sans-serif;color:#000;line-height:1.35;">
+      <div>{{dot}}&nbsp;Magnum&nbsp;Opus&nbsp;System&nbsp;Corp.&nbsp;–&nbsp;USA</div>
+      <div>{{dot}}&nbsp;+1&nbsp;(646)&nbsp;775-2716</div>
+      <div>{{dot}}&nbsp;<a href="https://www.sparsus.com"
+            style="color:#337AB7;text-decoration:none;">www.sparsus.com</a></div>
+      <div>{{dot}}&nbsp;112&nbsp;West&nbsp;34&nbsp;St.&nbsp;18<sup>th</sup>&nbsp;Floor,&nbsp;New&nbsp;York,&nbsp;NY&nbsp;10120</div>
+      <div>{{dot}}&nbsp;<a href="mailto:sales@sparsus.com"
+            style="color:#337AB7;text-decoration:none;">sales@sparsus.com</a></div>
+    </td>
+  </tr>
+</table>
+""",
+    "signature_logo_html": """\
+
+    <td style="padding-right:10px;">
+      <img src="{{logo_src}}" alt="SPARS"
+           height="32" style="height:32px;width:auto;display:block;max-width:100%;">
+    </td>
+""",
+    # Admin notification
+    "admin_notification_html": """\
+
+        <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                <h2 style="color: #2563eb;">New {{form_type}} Form Submission</h2>
+                <div style="background-color: #f9fafb; padding: 20px; border-radius: 8px; margin-top: 20px;">
+                    <h3 style="color: #1f2937; margin-top: 0;">Form Details:</h3>
+                    <table style="width: 100%; border-collapse: collapse;">
+        {{rows}}
+                    </table>
+                </div>
+                <p style="margin-top: 20px; color: #6b7280; font-size: 14px;">
+                    This is an automated notification from the SPARS website.
+                </p>
+            </div>
+        </body>
+        </html>
+        """,
+    "admin_notification_row_html": """\
+
+                        <tr style="border-bottom: 1px solid #e5e7eb;">
+                            <td style="padding: 8px 0; font-weight: bold; width: 40%;">{{formatted_key}}:</td>
+                            <td style="padding: 8px 0;">{{value}}</td>
+                        </tr>
+                """,
+    "admin_notification_text": """\
+New {{form_type}} Form Submission
+
+{{rows}}""",
+    "admin_notification_row_text": """\
+{{formatted_key}}: {{value}}
+""",
+    # Admin digest (several buffered notifications in one email)
+    "admin_digest_html": """\
+
+        <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                <h2 style="color: #2563eb;">{{count}} New {{title}} Submissions</h2>
+                <p style="color: #6b7280; font-size: 14px;">Received between {{first_at}} and {{last_at}}</p>
+        {{entries}}
+                <p style="margin-top: 20px; color: #6b7280; font-size: 14px;">
+                    This is an automated digest from the SPARS website.
+                </p>
+            </div>
+        </body>
+        </html>
+        """,
+    "admin_digest_entry_html": """\
+
+                <div style="background-color: #f9fafb; padding: 20px; border-radius: 8px; margin-top: 20px;">
+                    <h3 style="color: #1f2937; margin-top: 0;">{{form_type}} <span style="color: #6b7280; font-weight: normal; font-size: 14px;">({{received_at}})</span></h3>
+                    <table style="width: 100%; border-collapse: collapse;">
+        {{rows}}
+                    </table>
+                </div>
+        """,
+    "admin_digest_text": """\
+{{count}} New {{title}} Submissions
+Received between {{first_at}} and {{last_at}}
+{{entries}}""",
+    "admin_digest_entry_text": """\
+
+{{form_type}} ({{received_at}})
+{{rows}}""",
+    # User confirmations
+    "confirmation_newsletter_html": """\
+<!DOCTYPE html>
+<html>
+  <head>
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  </head>
+  <body style="font-family:Arial,sans-serif;line-height:1.6;color:#333;margin:0;padding:20px;max-width:600px;margin:0 auto;">
+    <p>Dear <strong>{{user_name}}</strong>,</p>
+
+    <p>
+      Thank you for your interest in <strong>SPARS – the Ultimate ERP Solution for the Home Furnishing Industry</strong>.
+    </p>
+
+    <p>
+      You have been successfully subscribed to our newsletter. You'll now receive updates, insights, and product news from SPARS.
+    </p>
+
+    <p>
+      If you'd like a <strong>personalized demo</strong> or have any questions, feel free to reply to this email—we'd be happy to assist you.
+    </p>
+
+    <p style="margin-top:18px;margin-bottom:0;">
+      Best regards,<br><br><strong>Team&nbsp;SPARS</strong><br>
+    </p>
+
+    {{signature}}
+  </body>
+</html>
+""",
+    "confirmation_newsletter_text": """\
+Dear {{user_name}},
+
+Thank you for your interest in SPARS – the Ultimate ERP Solution for the Home Furnishing Industry.
+
+You have been successfully subscribed to our newsletter. You'll now receive updates, insights, and product news from SPARS.
+
+If you'd like a personalized demo or have any questions, feel free to reply to this email—we'd be happy to assist you.
+
+Best regards,
+
+Team SPARS
+
+Magnum Opus System Corp. – USA
++1 (646) 775-2716
+www.sparsus.com
+112 West 34 St. 18th Floor, New York, NY 10120
+sales@sparsus.com
+""",
+    "confirmation_sales_html": """\
+<!DOCTYPE html>
+<html>
+  <head>
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  </head>
+  <body style="font-family:Arial,sans-serif;line-height:1.6;color:#333;margin:0;padding:20px;max-width:600px;margin:0 auto;">
+    <p>Dear <strong>{{user_name}}</strong>,</p>
+
+    <p>
+      Thank you for your interest in <strong>SPARS – the Ultimate ERP Solution for the Home Furnishing Industry</strong>.
+    </p>
+
+    <p>
+      We have received your request to connect with our sales team. One of our representatives will get in touch with you shortly to discuss your requirements.
+    </p>
+
+    <p>
+      If you'd like a <strong>personalized demo</strong> or have any questions in the meantime, feel free to reply to this email.
+    </p>
+
+    <p style="margin-top:18px;margin-bottom:0;">
+      Best regards,<br><br><strong>Team&nbsp;SPARS</strong><br>
+    </p>
+
+    {{signature}}
+  </body>
+</html>
+""",
+    "confirmation_sales_text": """\
+Dear {{user_name}},
+
+Thank you for your interest in SPARS – the Ultimate ERP Solution for the Home Furnishing Industry.
+
+We have received your request to connect with our sales team. One of our representatives will get in touch with you shortly to discuss your requirements.
+
+If you'd like a personalized demo or have any questions in the meantime, feel free to reply to this email.
+
+Best regards,
+
+Team SPARS
+
+Magnum Opus System Corp. – USA
++1 (646) 775-2716
+www.sparsus.com
+112 West 34 St. 18th Floor, New York, NY 10120
+sales@sparsus.com
+""",
+    "confirmation_demo_html": """\
+<!DOCTYPE html>
+<html>
+  <head>
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  </head>
+  <body style="font-family:Arial,sans-serif;line-height:1.6;color:#333;margin:0;padding:20px;max-width:600px;margin:0 auto;">
+    <p>Dear <strong>{{user_name}}</strong>,</p>
+
+    <p>
+      Thank you for your interest in <strong>SPARS – the Ultimate ERP Solution for the Home Furnishing Industry</strong>.
+    </p>
+
+    <p>
+      We have received your demo request. Our team will contact you shortly to schedule the demo and share further details.
+    </p>
+
+    <p style="margin-top:18px;margin-bottom:0;">
+      Best regards,<br><br><strong>Team&nbsp;SPARS</strong><br>
+    </p>
+
+    {{signature}}
+  </body>
+</html>
+""",
+    "confirmation_demo_text": """\
+Dear {{user_name}},
+
+Thank you for your interest in SPARS – the Ultimate ERP Solution for the Home Furnishing Industry.
+
+We have received your demo request. Our team will contact you shortly to schedule the demo and share further details.
+
+Best regards,
+
+Team SPARS
+
+Magnum Opus System Corp. – USA
++1 (646) 775-2716
+www.sparsus.com
+112 West 34 St. 18th Floor, New York, NY 10120
+sales@sparsus.com
+""",
+    "confirmation_contact_html": """\
+<!DOCTYPE html>
+<html>
+  <head>
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  </head>
+  <body style="font-family:Arial,sans-serif;line-height:1.6;color:#333;margin:0;padding:20px;max-width:600px;margin:0 auto;">
+    <p>Dear <strong>{{user_name}}</strong>,</p>
+
+    <p>
+      Thank you for your interest in <strong>SPARS – the Ultimate ERP Solution for the Home Furnishing Industry</strong>.
+    </p>
+
+    <p>
+      We have received your inquiry submitted through our website. Our team will review it and get back to you shortly.
+    </p>
+
+    <p>
+      If you'd like a <strong>personalized demo</strong> or have any additional questions, feel free to reply to this email.
+    </p>
+
+    <p style="margin-top:18px;margin-bottom:0;">
+      Best regards,<br><br><strong>Team&nbsp;SPARS</strong><br>
+    </p>
+
+    {{signature}}
+  </body>
+</html>
+""",
+    "confirmation_contact_text": """\
+Dear {{user_name}},
+
+Thank you for your interest in SPARS – the Ultimate ERP Solution for the Home Furnishing Industry.
+
+We have received your inquiry submitted through our website. Our team will review it and get back to you shortly.
+
+If you'd like a personalized demo or have any additional questions, feel free to reply to this email.
+
+Best regards,
+Team SPARS
+
+Magnum Opus System Corp. – USA
++1 (646) 775-2716
+www.sparsus.com
+112 West 34 St. 18th Floor, New York, NY 10120
+sales@sparsus.com
+""",
+    "confirmation_default_html": """\
+<!DOCTYPE html>
+<html>
+  <head>
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  </head>
+  <body style="font-family:Arial,sans-serif;line-height:1.6;color:#333;margin:0;padding:20px;max-width:600px;margin:0 auto;">
+    <p>Dear <strong>{{user_name}}</strong>,</p>
+
+    <p>
+      Thank you for your interest in <strong>SPARS – the Ultimate ERP Solution for the Home Furnishing Industry</strong>.
+    </p>
+
+    <p>
+      We have received your {{form_type}} request and will get back to you shortly.
+    </p>
+
+    <p style="margin-top:18px;margin-bottom:0;">
+      Best regards,<br><br><strong>Team&nbsp;SPARS</strong><br>
+    </p>
+
+    {{signature}}
+  </body>
+</html>
+""",
+    "confirmation_default_text": """\
+Dear {{user_name}},
+
+Thank you for your interest in SPARS – the Ultimate ERP Solution for the Home Furnishing Industry.
+
+We have received your {{form_type}} request and will get back to you shortly.
+
+Best regards,
+
+Team SPARS
+
+Magnum Opus System Corp. – USA
++1 (646) 775-2716
+www.sparsus.com
+112 West 34 St. 18th Floor, New York, NY 10120
+sales@sparsus.com
+""",
+    # Brochure
+    "brochure_html": """\
+<!DOCTYPE html>
+<html>
+  <head>
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  </head>
+  <body style="font-family:Arial,sans-serif;line-height:1.6;color:#333;margin:0;padding:20px;max-width:600px;margin:0 auto;">
+    <p>Dear {{name}},</p>
+
+    <p>
+      Thank you for your interest in <strong>SPARS – Ultimate ERP Solution
+      for the Home Furnishing Industry</strong>.
+    </p>
+{{pdf_section}}
+    <p>
+      If you'd like a <strong>personalized demo</strong> or have any questions,
+      simply reply to this e-mail.
+    </p>
+
+    <p style="margin-top:18px;margin-bottom:0;">
+      Best regards,<br><br><strong>Team&nbsp;SPARS</strong><br>
+    </p>
+
+    {{signature}}
+  </body>
+</html>
+""",
+    "brochure_text": """\
+Dear {{name}},
+
+Thank you for your interest in SPARS – Ultimate ERP Solution for the Home Furnishing Industry.
+
+{{pdf_text}}
+
+If you'd like a personalized demo or have any questions, simply reply to this e-mail.
+
+Best regards,
+Team SPARS
+
+Magnum Opus System Corp. – USA
++1 (646) 775-2716
+www.sparsus.com
+112 West 34 St. 18th Floor, New York, NY 10120
+sales@sparsus.com
+""",
+    "brochure_link_section_html": """\
+
+    <p>
+      You can download the <strong>product brochure</strong> with detailed
+      information about our modules, capabilities, and integration options here:<br>
+      <a href="{{pdf_url}}" style="color:#337AB7;text-decoration:none;">
+        Download SPARS Brochure&nbsp;(PDF)
+      </a>
+    </p>
+""",
+    "brochure_link_section_text": """\
+You can download the product brochure with detailed information about our modules, capabilities, and integration options here:
+{{pdf_url}}""",
+    "brochure_attached_section_html": """\
+
+    <p>
+      Please find attached the <strong>product brochure</strong> with detailed
+      information about our modules, capabilities, and integration options.
+    </p>
+""",
+    "brochure_attached_section_text": """\
+Please find attached the product brochure with detailed information about our modules, capabilities, and integration options.""",
+    # Product profile
+    "product_profile_html": """\
+<!DOCTYPE html>
+<html>
+  <head>
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  </head>
+  <body style="font-family:Arial,sans-serif;line-height:1.6;color:#333;margin:0;padding:20px;max-width:600px;margin:0 auto;">
+    <p>Dear {{name}},</p>
+
+    <p>
+      Thank you for your interest in <strong>SPARS – Ultimate ERP Solution
+      for the Home Furnishing Industry</strong>.
+    </p>
+{{pdf_section}}
+    <p>
+      If you'd like a <strong>personalized demo</strong> or have any questions,
+      simply reply to this e-mail.
+    </p>
+
+    <p style="margin-top:18px;margin-bottom:0;">
+      Best regards,<br><br><strong>Team&nbsp;SPARS</strong><br>
+    </p>
+
+    {{signature}}
+  </body>
+</html>
+""",
+    "product_profile_text": """\
+Dear {{name}},
+
+Thank you for your interest in SPARS – Ultimate ERP Solution for the Home Furnishing Industry.
+
+{{pdf_text}}
+
+If you'd like a personalized demo or have any questions, simply reply to this e-mail.
+
+Best regards,
+Team SPARS
+
+Magnum Opus System Corp. – USA
++1 (646) 775-2716
+www.sparsus.com
+112 West 34 St. 18th Floor, New York, NY 10120
+sales@sparsus.com
+""",
+    "product_profile_link_section_html": """\
+
+    <p>
+      You can download the full&nbsp;PDF product profile here:<br>
+      <a href="{{pdf_url}}" style="color:#337AB7;text-decoration:none;">
+        Download SPARS Product Profile&nbsp;(PDF)
+      </a>
+    </p>
+""",
+    "product_profile_link_section_text": """\
+You can download the full PDF product profile here:
+{{pdf_url}}""",
+    "product_profile_attached_section_html": """\
+
+    <p>
+      Please find attached the <strong>product profile</strong> with detailed
+      information about our modules, capabilities, and integration options.
+    </p>
+""",
+    "product_profile_attached_section_text": """\
+Please find attached the product profile with detailed information about our modules, capabilities, and integration options.""",
+    # Sales team notifications
+    "demo_request_sales_text": """\
+Hello SPARS Sales Team,
+
+A new Demo Request has been submitted through the SPARS website.
+Please review the prospect's details below and arrange the demo accordingly.
+
+⏰ Demo Request Details
+    First Name: {{first_name}}
+    Last Name: {{last_name}}
+    Email Address: {{email}}
+    Phone Number: {{phone}}
+
+    Company Name: {{company_name}}
+    Company Size: {{company_size}}
+
+📅 Preferred Demo Schedule
+    Preferred Demo Date: {{preferred_demo_date}}
+    Preferred Demo Time: {{preferred_demo_time}}
+
+📄 Additional Information
+    {{additional_information}}
+
+🕐 Submission Information
+    Date & Time: {{submitted_at}}
+    Source: Website - Request a Demo Form
+
+Please contact the prospect to confirm availability, align expectations, and schedule
+the demo session.
+If the demo is scheduled, kindly update the sales/demo tracker accordingly.
+
+Best regards,
+SPARS Website Notification System""",
+    "demo_request_sales_html": """\
+<!DOCTYPE html>
+<html>
+  <head>
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  </head>
+  <body style="font-family:Arial,sans-serif;line-height:1.6;color:#333;margin:0;padding:20px;max-width:600px;margin:0 auto;">
+    <p><strong>Hello SPARS Sales Team,</strong></p>
+
+    <p>
+      A new <strong>Demo Request</strong> has been submitted through the SPARS website.<br>
+      Please review the prospect's details below and arrange the demo accordingly.
+    </p>
+
+    <p>
+      <strong>⏰ Demo Request Details</strong><br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>First Name:</strong> {{first_name}}<br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Last Name:</strong> {{last_name}}<br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Email Address:</strong> {{email}}<br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Phone Number:</strong> {{phone}}<br>
+      <br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Company Name:</strong> {{company_name}}<br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Company Size:</strong> {{company_size}}
+    </p>
+
+    <p>
+      <strong>📅 Preferred Demo Schedule</strong><br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Preferred Demo Date:</strong> {{preferred_demo_date}}<br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Preferred Demo Time:</strong> {{preferred_demo_time}}
+    </p>
+
+    <p>
+      <strong>📄 Additional Information</strong><br>
+      &nbsp;&nbsp;&nbsp;&nbsp;{{additional_information}}
+    </p>
+
+    <p>
+      <strong>🕐 Submission Information</strong><br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Date & Time:</strong> {{submitted_at}}<br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Source:</strong> Website - Request a Demo Form
+    </p>
+
+    <p>
+      Please contact the prospect to confirm availability, align expectations, and schedule<br>
+      the demo session.<br>
+      If the demo is scheduled, kindly update the sales/demo tracker accordingly.
+    </p>
+
+    <p style="margin-top:18px;margin-bottom:0;">
+      Best regards,<br><br><strong>SPARS Website Notification System</strong><br>
+    </p>
+  </body>
+</html>""",
+    "contact_inquiry_sales_text": """\
+Hello SPARS Sales Team,
+
+A new inquiry has been submitted through the 'General Inquiry Form' on the SPARS website.
+Please review the details below and take the necessary action.
+
+📄 Inquiry Details
+    Full Name: {{name}}
+    Email: {{email}}
+    Phone: {{phone}}
+    Company Name: {{company}}
+    Inquiry Type: {{inquiry_type}}
+    Message / Details Provided by User: {{message}}
+
+⏰ Submission Information
+    Date & Time: {{submitted_at}}
+    Source: Website – General Inquiry Form
+
+Please assess the inquiry and route it to the relevant team (Sales, Support, Operations, or Management) for appropriate follow-up.
+If this inquiry is already being handled, kindly update the internal tracker accordingly.
+
+Best regards,
+SPARS Website Notification System""",
+    "contact_inquiry_sales_html": """\
+<!DOCTYPE html>
+<html>
+  <head>
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  </head>
+  <body style="font-family:Arial,sans-serif;line-height:1.6;color:#333;margin:0;padding:20px;max-width:600px;margin:0 auto;">
+    <p><strong>Hello SPARS Sales Team,</strong></p>
+
+    <p>
+      A new inquiry has been submitted through the '<strong>General Inquiry Form</strong>' on the SPARS website.<br>
+      Please review the details below and take the necessary action.
+    </p>
+
+    <p>
+      <strong>📄 Inquiry Details</strong><br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Full Name:</strong> {{name}}<br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Email:</strong> {{email}}<br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Phone:</strong> {{phone}}<br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Company Name:</strong> {{company}}<br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Inquiry Type:</strong> {{inquiry_type}}<br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Message / Details Provided by User:</strong> {{message}}
+    </p>
+
+    <p>
+      <strong>⏰ Submission Information</strong><br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Date & Time:</strong> {{submitted_at}}<br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Source:</strong> Website – General Inquiry Form
+    </p>
+
+    <p>
+      Please assess the inquiry and route it to the relevant team (Sales, Support, Operations, or Management) for appropriate follow-up.<br>
+      If this inquiry is already being handled, kindly update the internal tracker accordingly.
+    </p>
+
+    <p style="margin-top:18px;margin-bottom:0;">
+      Best regards,<br><br><strong>SPARS Website Notification System</strong><br>
+    </p>
+  </body>
+</html>""",
+    "talk_to_sales_text": """\
+Hello Sales Team,
+
+A new inquiry has been submitted through the 'Talk To Sales' form on the SPARS website. Please find the lead details below and follow up at the earliest.
+
+▲ Lead Details
+    Contact Information:
+    Name: {{name}}
+    Email Address: {{email}}
+    Contact Number: {{phone}}
+    Company Name: {{company}}
+    Message: {{message}}
+
+    Requirements:
+    Current ERP System (if any): {{current_system}}
+    Number of Warehouses: {{warehouses}}
+    Expected Number of Users: {{users}}
+    Specific Requirements or Challenges: {{requirements}}
+    Implementation Time Line: {{timeline}}
+
+ⓘ Submission Details
+    Date & Time: {{submitted_at}}
+    Source: Website - Talk To Sales Form
+
+Please review the information and reach out to the prospect for further discussion, demo scheduling, or requirement analysis.
+If this lead is already in progress, kindly update the sales tracker accordingly.
+
+Best regards,
+SPARS Website Notification System""",
+    "talk_to_sales_html": """\
+<!DOCTYPE html>
+<html>
+  <head>
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  </head>
+  <body style="font-family:Arial,sans-serif;line-height:1.6;color:#333;margin:0;padding:20px;max-width:600px;margin:0 auto;">
+    <p><strong>Hello Sales Team,</strong></p>
+
+    <p>
+      A new inquiry has been submitted through the '<strong>Talk To Sales</strong>' form on the SPARS website. Please find the lead details below and follow up at the earliest.
+    </p>
+
+    <p>
+      <strong>▲ Lead Details</strong><br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Contact Information:</strong><br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Name:</strong> {{name}}<br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Email Address:</strong> {{email}}<br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Contact Number:</strong> {{phone}}<br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Company Name:</strong> {{company}}<br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Message:</strong> {{message}}<br>
+      <br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Requirements:</strong><br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Current ERP System (if any):</strong> {{current_system}}<br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Number of Warehouses:</strong> {{warehouses}}<br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Expected Number of Users:</strong> {{users}}<br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Specific Requirements or Challenges:</strong> {{requirements}}<br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Implementation Time Line:</strong> {{timeline}}
+    </p>
+
+    <p>
+      <strong>ⓘ Submission Details</strong><br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Date & Time:</strong> {{submitted_at}}<br>
+      &nbsp;&nbsp;&nbsp;&nbsp;<strong>Source:</strong> Website - Talk To Sales Form
+    </p>
+
+    <p>
+      Please review the information and reach out to the prospect for further discussion, demo scheduling, or requirement analysis.<br>
+      If this lead is already in progress, kindly update the sales tracker accordingly.
+    </p>
+
+    <p style="margin-top:18px;margin-bottom:0;">
+      Best regards,<br><br><strong>SPARS Website Notification System</strong><br>
+    </p>
+  </body>
+</html>""",
+}
+
+
+class EmailTemplateRegistry:
+    """Every email template, compiled once, with render timings per template"""
+
+    def __init__(self, sources: Mapping[str, str] = TEMPLATE_SOURCES):
+        started = time.perf_counter()
+        self.templates: Dict[str, EmailTemplate] = {
+            name: EmailTemplate(name, source, static={"dot": SIGNATURE_DOT})
+            for name, source in sources.items()
+        }
+        self.compile_seconds = time.perf_counter() - started
+        self._signatures: Dict[Optional[str], str] = {}
+        self._lock = threading.Lock()
+        self._timings: Dict[str, list] = {name: [0, 0.0, 0.0] for name in self.templates}  # count, total, max
+
+    def render(self, name: str, values: Optional[Mapping[str, object]] = None, **kwargs) -> str:
+        """Render template `name` from a mapping and/or keyword values"""
+        template = self.templates[name]
+        if kwargs:
+            values = {**values, **kwargs} if values else kwargs
+        started = time.perf_counter()
+        result = template.render(values or {})
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            timing = self._timings[name]
+            timing[0] += 1
+            timing[1] += elapsed
+            timing[2] = max(timing[2], elapsed)
+        return result
+
+    def signature(self, logo_src: Optional[str]) -> str:
+        """Signature block for a logo source (cid: reference, hosted URL or None), rendered once"""
+        signature = self._signatures.get(logo_src)
+        if signature is None:
+            logo_html = self.render("signature_logo_html", logo_src=logo_src) if logo_src else SIGNATURE_LOGO_TEXT
+            signature = self.render("signature_html", logo_html=logo_html)
+            self._signatures[logo_src] = signature
+        return signature
+
+    def get_stats(self) -> dict:
+        """Render count and time per template"""
+        with self._lock:
+            timings = {name: list(values) for name, values in self._timings.items()}
+        return {
+            "templates": len(self.templates),
+            "compile_ms": round(self.compile_seconds * 1000, 3),
+            "cached_signatures": len(self._signatures),
+            "renders": {
+                name: {
+                    "count": count,
+                    "avg_ms": round(total / count * 1000, 4),
+                    "max_ms": round(longest * 1000, 4),
+                    "total_ms": round(total * 1000, 3),
+                }
+                for name, (count, total, longest) in timings.items()
+                if count
+            },
+        }
+
+
+# Compiled at import, i.e. once when the app starts
+email_templates = EmailTemplateRegistry()
@@ -0,0 +1,340 @@
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from services.attachment_cache import get_attachment_cache
+from services.email_metrics import DeliveryTrace, get_email_stage_metrics
+from services.send_quota import ProviderThrottleError
+
+# Optional dependency - only needed for EMAIL_TRANSPORT=sendgrid
+try:
+    from sendgrid import SendGridAPIClient
+    from python_http_client.exceptions import HTTPError as SendGridHTTPError
+except ImportError:
+    SendGridAPIClient = None
+    SendGridHTTPError = None
+
+EMAIL_SINK_DIR = Path(__file__).parent.parent / "email_sink"
+
+
+class EmailTransport(ABC):
+    """Delivers composed messages (EmailService.compose_* dicts).
+
+    `send_messages` is blocking (it runs on the email executor) and returns
+    one entry per message, in order: None if it was handed over, otherwise the
+    exception. A failure that affects the whole batch, such as missing
+    configuration, is raised instead.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.failed = 0
+
+    @abstractmethod
+    def send_messages(self, messages: List[dict]) -> List[Optional[Exception]]:
+        ...
+
+    def _start_traces(self, messages: List[dict]) -> List[DeliveryTrace]:
+        """One stage-timing trace per message, tagged with its kind"""
+        return [DeliveryTrace(message.get("kind", "generic"), self.name) for message in messages]
+
+    def _finish_traces(self, traces: List[DeliveryTrace], results: List[Optional[Exception]]) -> None:
+        metrics = get_email_stage_metrics()
+        metrics.activate(None)
+        for trace, error in zip(traces, results):
+            metrics.finish(trace, error)
+
+    def _count(self, results: List[Optional[Exception]]) -> List[Optional[Exception]]:
+        ok = results.count(None)
+        with self._lock:
+            self.sent += ok
+            self.failed += len(results) - ok
+        return results
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {"transport": self.name, "sent": self.sent, "failed": self.failed}
+
+
+class SMTPTransport(EmailTransport):
+    """MIME messages over the pooled, authenticated SMTP sessions (services/smtp_pool.py)"""
+
+    name = "smtp"
+
+    def __init__(self, service):
+        super().__init__()
+        self.service = service
+
+    def send_messages(self, messages: List[dict]) -> List[Optional[Exception]]:
+        service = self.service
+        service._check_config()
+        metrics = get_email_stage_metrics()
+        traces = self._start_traces(messages)
+
+        errors: List[Optional[Exception]] = [None] * len(messages)
+        built = []
+        for index, message in enumerate(messages):
+            metrics.activate(traces[index])
+            try:
+                with metrics.stage("mime"):
+                    built.append((index, service._build_mime(message)))
+            except Exception as e:
+                errors[index] = e
+
+        if len(messages) == 1:
+            message = messages[0]
+            print(f"Sending {message.get('kind', 'generic')} email to {message['to_email']} via {service.smtp_host}:{service.smtp_port} (SSL: {service.smtp_port == 465})")
+        else:
+            print(f"Sending {len(built)} emails in one session via {service.smtp_host}:{service.smtp_port} (SSL: {service.smtp_port == 465})")
+        try:
+            results = service._get_smtp_pool().send_messages(
+                [msg for _, msg in built],
+                before_send=lambda position: metrics.activate(traces[built[position][0]]),
+            )
+        finally:
+            metrics.activate(None)
+        for (index, _), error in zip(built, results):
+            errors[index] = error
+        self._finish_traces(traces, errors)
+        return self._count(errors)
+
+
+class SendGridTransport(EmailTransport):
+    """SendGrid v3 Mail Send API over HTTPS - no SMTP handshake, TLS session or login per message.
+
+    Messages with identical content (subject, bodies, attachments) are sent in
+    one API call with one personalization per recipient, up to
+    `max_personalizations` per call.
+    """
+
+    name = "sendgrid"
+
+    def __init__(self, service, api_key: Optional[str] = None, max_personalizations: int = 1000):
+        super().__init__()
+        if SendGridAPIClient is None:
+            raise RuntimeError("EMAIL_TRANSPORT=sendgrid needs the sendgrid package (pip install sendgrid)")
+        api_key = api_key or os.getenv("SENDGRID_API_KEY")
+        if not api_key:
+            raise ValueError("SENDGRID_API_KEY is not set in environment variables")
+        self.service = service
+        self.client = SendGridAPIClient(api_key)
+        self.max_personalizations = max_personalizations
+        self.api_calls = 0
+
+    @staticmethod
+    def _attachment(path: str, disposition: str, content_id: Optional[str] = None) -> dict:
+        # The cached payload is MIME base64 (76-char lines); the API wants it unwrapped
+        asset = get_attachment_cache().get(path)
+        filename = asset.filename
+        if filename.endswith('.pdf.pdf'):
+            filename = filename.replace('.pdf.pdf', '.pdf')
+        attachment = {
+            "content": asset.payload.replace("\n", ""),
+            "filename": filename,
+            "type": f"{asset.maintype}/{asset.subtype}",
+            "disposition": disposition,
+        }
+        if content_id:
+            attachment["content_id"] = content_id
+        return attachment
+
+    def _payload(self, message: dict, recipients: List[str]) -> dict:
+        content = [{"type": "text/plain", "value": message["body"]}]
+        if message.get("html_body"):
+            content.append({"type": "text/html", "value": message["html_body"]})
+        attachments = []
+        for cid, image_path in (message.get("embedded_images") or {}).items():
+            if os.path.exists(image_path):
+                attachments.append(self._attachment(image_path, "inline", cid))
+        for file_path in message.get("attachments") or []:
+            if os.path.exists(file_path):
+                attachments.append(self._attachment(file_path, "attachment"))
+            else:
+                print(f"Attachment file not found: {file_path}")
+        payload = {
+            "personalizations": [{"to": [{"email": recipient}]} for recipient in recipients],
+            "from": {"email": self.service.from_email},
+            "subject": message["subject"],
+            "content": content,
+        }
+        if attachments:
+            payload["attachments"] = attachments
+        return payload
+
+    @staticmethod
+    def _content_key(message: dict):
+        return (
+            message["subject"],
+            message["body"],
+            message.get("html_body"),
+            tuple(message.get("attachments") or ()),
+            tuple(sorted((message.get("embedded_images") or {}).items())),
+        )
+
+    def send_messages(self, messages: List[dict]) -> List[Optional[Exception]]:
+        if not self.service.from_email:
+            raise ValueError("DEFAULT_FROM_EMAIL is not set in environment variables")
+
+        # Group identical content so each group is one API call
+        groups: Dict[tuple, List[int]] = {}
+        for index, message in enumerate(messages):
+            groups.setdefault(self._content_key(message), []).append(index)
+
+        metrics = get_email_stage_metrics()
+        traces = self._start_traces(messages)
+        errors: List[Optional[Exception]] = [None] * len(messages)
+        for indexes in groups.values():
+            for start in range(0, len(indexes), self.max_personalizations):
+                chunk = indexes[start:start + self.max_personalizations]
+                message = messages[chunk[0]]
+                try:
+                    started = time.perf_counter()
+                    payload = self._payload(message, [messages[index]["to_email"] for index in chunk])
+                    built = time.perf_counter()
+                    print(f"Sending {message.get('kind', 'generic')} email to {len(chunk)} recipient(s) via SendGrid API")
+                    with self._lock:
+                        self.api_calls += 1
+                    self.client.client.mail.send.post(request_body=payload)
+                    # Every recipient in the call waited for the whole of it
+                    for index in chunk:
+                        traces[index].add("mime", built - started)
+                        traces[index].add("api", time.perf_counter() - built)
+                except Exception as e:
+                    if SendGridHTTPError is not None and isinstance(e, SendGridHTTPError):
+                        status = getattr(e, "status_code", None)
+                        if status == 429:
+                            e = ProviderThrottleError("SendGrid API error 429: rate limit exceeded")
+                        else:
+                            e = RuntimeError(f"SendGrid API error {status}: {getattr(e, 'body', '')}")
+                    for index in chunk:
+                        errors[index] = e
+        self._finish_traces(traces, errors)
+        return self._count(errors)
+
+    def get_stats(self) -> dict:
+        stats = super().get_stats()
+        with self._lock:
+            stats["api_calls"] = self.api_calls
+        return stats
+
+
+class FileTransport(EmailTransport):
+    """Writes each message as an .eml file instead of sending it (local testing, load tests)"""
+
+    name = "file"
+
+    def __init__(self, service, directory: Optional[str] = None):
+        super().__init__()
+        self.service = service
+        self.directory = Path(directory or os.getenv("EMAIL_SINK_DIR") or EMAIL_SINK_DIR)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def send_messages(self, messages: List[dict]) -> List[Optional[Exception]]:
+        metrics = get_email_stage_metrics()
+        traces = self._start_traces(messages)
+        errors: List[Optional[Exception]] = []
+        for trace, message in zip(traces, messages):
+            metrics.activate(trace)
+            try:
+                with metrics.stage("mime"):
+                    msg = self.service._build_mime(message)
+                name = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{message.get('kind', 'generic')}-{uuid.uuid4().hex[:8]}.eml"
+                with metrics.stage("write"):
+                    (self.directory / name).write_bytes(msg.as_bytes())
+                errors.append(None)
+            except Exception as e:
+                errors.append(e)
+        self._finish_traces(traces, errors)
+        return self._count(errors)
+
+
+class MemorySink:
+    """The last `max_messages` sent messages, kept in memory (benchmarks, load tests)"""
+
+    def __init__(self, max_messages: Optional[int] = None):
+        if max_messages is None:
+            try:
+                max_messages = int(os.getenv("EMAIL_MEMORY_SINK_MAX", "1000"))
+            except (ValueError, TypeError):
+                max_messages = 1000
+        self.messages: deque = deque(maxlen=max(max_messages, 1))
+        self._lock = threading.Lock()
+        self.received = 0
+
+    def append(self, message: dict, mime) -> None:
+        with self._lock:
+            self.messages.append((message, mime))
+            self.received += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.messages.clear()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {"received": self.received, "kept": len(self.messages), "max_messages": self.messages.maxlen}
+
+
+class MemoryTransport(EmailTransport):
+    """Builds each MIME message like a real send (so benchmarks include that cost) and keeps it in the process-wide sink"""
+
+    name = "memory"
+
+    def __init__(self, service, sink: Optional[MemorySink] = None):
+        super().__init__()
+        self.service = service
+        self.sink = sink or get_memory_sink()
+
+    def send_messages(self, messages: List[dict]) -> List[Optional[Exception]]:
+        metrics = get_email_stage_metrics()
+        traces = self._start_traces(messages)
+        errors: List[Optional[Exception]] = []
+        for trace, message in zip(traces, messages):
+            metrics.activate(trace)
+            try:
+                with metrics.stage("mime"):
+                    msg = self.service._build_mime(message)
+                self.sink.append(message, msg)
+                errors.append(None)
+            except Exception as e:
+                errors.append(e)
+        self._finish_traces(traces, errors)
+        return self._count(errors)
+
+    def get_stats(self) -> dict:
+        stats = super().get_stats()
+        stats["sink"] = self.sink.get_stats()
+        return stats
+
+
+# Lazy initialization - one memory sink per process, shared by every EmailService
+_memory_sink = None
+
+def get_memory_sink() -> MemorySink:
+    """Get or create the in-memory sink (EMAIL_TRANSPORT=memory)"""
+    global _memory_sink
+    if _memory_sink is None:
+        _memory_sink = MemorySink()
+    return _memory_sink
+
+def create_email_transport(service, name: Optional[str] = None) -> EmailTransport:
+    """Transport named by EMAIL_TRANSPORT: smtp (default), sendgrid, file or memory"""
+    name = (name or os.getenv("EMAIL_TRANSPORT", "smtp")).strip().lower()
+    if name == "smtp":
+        return SMTPTransport(service)
+    if name == "sendgrid":
+        return SendGridTransport(service)
+    if name == "file":
+        return FileTransport(service)
+    if name == "memory":
+        return MemoryTransport(service)
+    raise ValueError(f"Unknown EMAIL_TRANSPORT '{name}' (expected smtp, sendgrid, file or memory)")
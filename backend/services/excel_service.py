@@ -1,8 +1,18 @@
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
 from openpyxl.styles import Font, PatternFill, Alignment
+from openpyxl.utils import get_column_letter
 from datetime import datetime
+import json
 import os
+import shutil
+import tempfile
+import zipfile
 from pathlib import Path
+from typing import List, Optional
+from xml.sax.saxutils import escape
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from database import (
     NewsletterSubscription,
@@ -12,286 +22,656 @@ from database import (
     TalkToSalesForm
 )
 
+# Bump when sheet layout or row formatting changes so incremental mode rebuilds once
+EXPORT_LAYOUT_VERSION = 1
+
+# Row orderings. Full exports list newest submissions first; incremental exports
+# append in id order so new rows can simply be added at the bottom of each sheet
+ORDER_NEWEST_FIRST = "newest_first"
+ORDER_ID_ASC = "id_asc"
+
+# Rows fetched per round-trip while streaming a sheet
+EXPORT_BATCH_SIZE = 1000
+
+EXPORTS_DIR = Path(__file__).parent.parent / "exports"
+# Worksheet XML of each sheet's data rows plus dirty markers, so untouched sheets
+# are neither re-queried nor re-rendered
+SHEET_CACHE_DIRNAME = ".sheet_cache"
+
+# Bytes copied at a time when splicing cached rows into the workbook
+SPLICE_CHUNK_SIZE = 1024 * 1024
+
+def _format_datetime(value) -> str:
+    return value.strftime("%Y-%m-%d %H:%M:%S") if value else ""
+
+def _row_xml(row_number: int, values: list, columns: List[str]) -> str:
+    """One <row> of SpreadsheetML with inline strings, as openpyxl writes it.
+
+    Strings are always written as text; unlike ws.append, a value starting
+    with "=" does not become a formula.
+    """
+    cells = []
+    for column, value in zip(columns, values):
+        if value is None or value == "":
+            continue
+        ref = f"{column}{row_number}"
+        if isinstance(value, bool):
+            cells.append(f'<c r="{ref}" t="b"><v>{int(value)}</v></c>')
+        elif isinstance(value, (int, float)):
+            cells.append(f'<c r="{ref}" t="n"><v>{value}</v></c>')
+        else:
+            text = escape(ILLEGAL_CHARACTERS_RE.sub("", str(value)))
+            space = ' xml:space="preserve"' if text != text.strip() else ""
+            cells.append(f'<c r="{ref}" t="inlineStr"><is><t{space}>{text}</t></is></c>')
+    return f'<row r="{row_number}">{"".join(cells)}</row>'
+
+# Sheet definitions - one entry per sheet, in workbook order (6 forms total).
+# "columns" is the projection queried from the database; "row" formats one
+# result row (accessed by column name) into the values written to the sheet
+SHEETS = {
+    "newsletter": {
+        "title": "Newsletter Subscriptions",
+        "model": NewsletterSubscription,
+        "timestamp": NewsletterSubscription.subscribed_at,
+        "columns": [NewsletterSubscription.id, NewsletterSubscription.email, NewsletterSubscription.subscribed_at],
+        "headers": ["ID", "Email", "Subscribed At"],
+        "row": lambda sub: [
+            sub.id,
+            sub.email,
+            _format_datetime(sub.subscribed_at)
+        ],
+    },
+    "contact_forms": {
+        "title": "Contact Forms",
+        "model": ContactForm,
+        "timestamp": ContactForm.submitted_at,
+        "columns": [
+            ContactForm.id, ContactForm.first_name, ContactForm.last_name, ContactForm.email,
+            ContactForm.phone, ContactForm.company, ContactForm.message, ContactForm.submitted_at
+        ],
+        # Contact forms where demo_date is None (not demo requests)
+        "filter": lambda: ContactForm.demo_date == None,
+        "headers": ["ID", "First Name", "Last Name", "Email", "Phone", "Company", "Message", "Submitted At"],
+        "row": lambda form: [
+            form.id,
+            form.first_name or "",
+            form.last_name or "",
+            form.email,
+            form.phone or "",
+            form.company or "",
+            form.message or "",
+            _format_datetime(form.submitted_at)
+        ],
+    },
+    "demo_requests": {
+        "title": "Demo Requests",
+        "model": ContactForm,
+        "timestamp": ContactForm.submitted_at,
+        "columns": [
+            ContactForm.id, ContactForm.first_name, ContactForm.last_name, ContactForm.email,
+            ContactForm.phone, ContactForm.company, ContactForm.demo_date, ContactForm.message,
+            ContactForm.submitted_at
+        ],
+        # Contact forms where demo_date is not None (demo requests)
+        "filter": lambda: ContactForm.demo_date != None,
+        "headers": ["ID", "First Name", "Last Name", "Email", "Phone", "Company", "Preferred Demo Date", "Message", "Submitted At"],
+        "row": lambda form: [
+            form.id,
+            form.first_name or "",
+            form.last_name or "",
+            form.email,
+            form.phone or "",
+            form.company or "",
+            form.demo_date or "",
+            form.message or "",
+            _format_datetime(form.submitted_at)
+        ],
+    },
+    "brochure_forms": {
+        "title": "Brochure Requests",
+        "model": BrochureForm,
+        "timestamp": BrochureForm.submitted_at,
+        "columns": [
+            BrochureForm.id, BrochureForm.full_name, BrochureForm.email, BrochureForm.company,
+            BrochureForm.phone, BrochureForm.job_role, BrochureForm.agreed_to_marketing,
+            BrochureForm.submitted_at
+        ],
+        "headers": ["ID", "Full Name", "Email", "Company", "Phone", "Job Role", "Agreed to Marketing", "Submitted At"],
+        "row": lambda form: [
+            form.id,
+            form.full_name,
+            form.email,
+            form.company,
+            form.phone or "",
+            form.job_role or "",
+            "Yes" if form.agreed_to_marketing else "No",
+            _format_datetime(form.submitted_at)
+        ],
+    },
+    "product_profile_forms": {
+        "title": "Product Profile Requests",
+        "model": ProductProfileForm,
+        "timestamp": ProductProfileForm.submitted_at,
+        "columns": [
+            ProductProfileForm.id, ProductProfileForm.first_name, ProductProfileForm.last_name,
+            ProductProfileForm.email, ProductProfileForm.phone, ProductProfileForm.job_title,
+            ProductProfileForm.company_name, ProductProfileForm.industry, ProductProfileForm.company_size,
+            ProductProfileForm.website, ProductProfileForm.address, ProductProfileForm.current_system,
+            ProductProfileForm.warehouses, ProductProfileForm.users, ProductProfileForm.requirements,
+            ProductProfileForm.timeline, ProductProfileForm.submitted_at
+        ],
+        "headers": [
+            "ID", "First Name", "Last Name", "Email", "Phone", "Job Title",
+            "Company Name", "Industry", "Company Size", "Website", "Address",
+            "Current System", "Warehouses", "Users", "Requirements", "Timeline", "Submitted At"
+        ],
+        "row": lambda form: [
+            form.id,
+            form.first_name,
+            form.last_name,
+            form.email,
+            form.phone,
+            form.job_title or "",
+            form.company_name,
+            form.industry or "",
+            form.company_size or "",
+            form.website or "",
+            form.address or "",
+            form.current_system or "",
+            form.warehouses or "",
+            form.users or "",
+            form.requirements or "",
+            form.timeline or "",
+            _format_datetime(form.submitted_at)
+        ],
+    },
+    "talk_to_sales_forms": {
+        "title": "Talk to Sales",
+        "model": TalkToSalesForm,
+        "timestamp": TalkToSalesForm.submitted_at,
+        "columns": [
+            TalkToSalesForm.id, TalkToSalesForm.name, TalkToSalesForm.email, TalkToSalesForm.phone,
+            TalkToSalesForm.company, TalkToSalesForm.message, TalkToSalesForm.current_system,
+            TalkToSalesForm.warehouses, TalkToSalesForm.users, TalkToSalesForm.requirements,
+            TalkToSalesForm.timeline, TalkToSalesForm.submitted_at
+        ],
+        "headers": [
+            "ID", "Name", "Email", "Phone", "Company", "Message",
+            "Current ERP System", "Number of Warehouses", "Expected Number of Users",
+            "Specific Requirements or Challenges", "Implementation Timeline", "Submitted At"
+        ],
+        "row": lambda form: [
+            form.id,
+            form.name,
+            form.email,
+            form.phone,
+            form.company or "",
+            form.message,
+            form.current_system or "",
+            form.warehouses or "",
+            form.users or "",
+            form.requirements or "",
+            form.timeline or "",
+            _format_datetime(form.submitted_at)
+        ],
+    },
+}
+
+# Tables behind the workbook and the sheets each one feeds
+FINGERPRINT_TABLES = {
+    model.__tablename__: model
+    for model in (NewsletterSubscription, ContactForm, BrochureForm, ProductProfileForm, TalkToSalesForm)
+}
+TABLE_SHEETS = {
+    table: [key for key, sheet in SHEETS.items() if sheet["model"].__tablename__ == table]
+    for table in FINGERPRINT_TABLES
+}
+
+def mark_sheets_dirty(*keys: str, excel_dir: Optional[Path] = None):
+    """Flag sheets whose underlying rows changed so the next export regenerates them.
+
+    Markers are plain files so every uvicorn worker and export process sees them.
+    """
+    cache_dir = Path(excel_dir or EXPORTS_DIR) / SHEET_CACHE_DIRNAME
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        for key in keys:
+            (cache_dir / f"{key}.dirty").touch()
+    except OSError as e:
+        print(f"Could not mark Excel sheets dirty {keys}: {e}")
+
 class ExcelService:
-    def __init__(self):
-        self.excel_dir = Path(__file__).parent.parent / "exports"
-        self.excel_dir.mkdir(exist_ok=True)
+    def __init__(self, excel_dir: Optional[Path] = None):
+        self.excel_dir = Path(excel_dir) if excel_dir else EXPORTS_DIR
+        self.excel_dir.mkdir(parents=True, exist_ok=True)
         self.filename = "SPARS_Excel_DB.xlsx"
+        # "full" rebuilds the workbook on every export, "incremental" appends only new rows
+        self.mode = os.getenv("EXCEL_EXPORT_MODE", "full").strip().lower()
+        if self.mode not in ("full", "incremental"):
+            print(f"Unknown EXCEL_EXPORT_MODE '{self.mode}', using full")
+            self.mode = "full"
+        self.order = ORDER_ID_ASC if self.mode == "incremental" else ORDER_NEWEST_FIRST
+
+    @property
+    def state_path(self) -> Path:
+        """Side-car file holding the per-sheet high-water marks"""
+        return self.excel_dir / f"{Path(self.filename).stem}.state.json"
+
+    @property
+    def cache_dir(self) -> Path:
+        """Directory holding serialized sheet rows and dirty markers"""
+        return self.excel_dir / SHEET_CACHE_DIRNAME
+
+    def export_all_forms(self, db: Session, full_rebuild: bool = False) -> str:
+        """Export all forms to Excel with separate sheets - overwrites existing file.
+
+        Only sheets marked dirty (or without a usable cache) are read from the
+        database; pass full_rebuild=True to ignore the sheet cache entirely.
+        """
+        # Taken before any sheet is read, so rows committed during the export
+        # make the recorded fingerprint stale rather than being silently missed
+        fingerprint = self.get_fingerprint(db)
+        if self.mode == "incremental" and not full_rebuild:
+            return self._export_incremental(db, fingerprint)
+        return self._export_full(db, fingerprint, use_cache=not full_rebuild)
+
+    def get_fingerprint(self, db: Session) -> dict:
+        """Cheap summary of the data behind the workbook: [row count, max id] per table"""
+        fingerprint = {}
+        for table, model in FINGERPRINT_TABLES.items():
+            count, max_id = db.execute(select(func.count(model.id), func.max(model.id))).one()
+            fingerprint[table] = [count, max_id or 0]
+        return fingerprint
+
+    def get_exported_fingerprint(self) -> Optional[dict]:
+        """Fingerprint recorded for the workbook currently on disk, if it is still valid"""
+        state = self._load_state(self.excel_dir / self.filename)
+        return state.get("fingerprint") if state else None
+
+    def mark_changed_sheets_dirty(self, old: Optional[dict], new: dict):
+        """Flag the sheets of every table whose fingerprint moved since the last export"""
+        keys = []
+        for table, sheet_keys in TABLE_SHEETS.items():
+            if old is None or old.get(table) != new.get(table):
+                keys.extend(sheet_keys)
+        if keys:
+            mark_sheets_dirty(*keys, excel_dir=self.excel_dir)
+
+    def _export_full(self, db: Session, fingerprint: dict, use_cache: bool = True) -> str:
+        """Rebuild the whole workbook, re-rendering only dirty sheets and splicing in the cached rows of the rest"""
+        wb = Workbook(write_only=True)
 
-    def export_all_forms(self, db: Session) -> str:
-        """Export all forms to Excel with separate sheets - overwrites existing file"""
-        wb = Workbook()
-        
-        # Remove default sheet
-        wb.remove(wb.active)
-        
-        # Export each form type to separate sheet (6 forms total)
-        self._export_newsletter(wb, db)
-        self._export_contact_forms(wb, db)
-        self._export_demo_requests(wb, db)
-        self._export_brochure_forms(wb, db)
-        self._export_product_profile_forms(wb, db)
-        self._export_talk_to_sales_forms(wb, db)
-        
-        # Save file (overwrites if exists)
+        # Export each form type to separate sheet, remembering the last id written
+        last_ids = {
+            "newsletter": self._export_newsletter(wb, db, use_cache),
+            "contact_forms": self._export_contact_forms(wb, db, use_cache),
+            "demo_requests": self._export_demo_requests(wb, db, use_cache),
+            "brochure_forms": self._export_brochure_forms(wb, db, use_cache),
+            "product_profile_forms": self._export_product_profile_forms(wb, db, use_cache),
+            "talk_to_sales_forms": self._export_talk_to_sales_forms(wb, db, use_cache),
+        }
+
+        # Save to a temp file in the same directory, then atomically replace the
+        # old workbook so readers never see a half-written file
         file_path = self.excel_dir / self.filename
-        wb.save(file_path)
+        self._save_atomic(wb, file_path, list(last_ids))
+        self._save_state(file_path, last_ids, fingerprint)
         return str(file_path)
 
-    def _export_newsletter(self, wb: Workbook, db: Session):
-        """Export newsletter subscriptions"""
-        ws = wb.create_sheet("Newsletter Subscriptions")
-        subscriptions = db.query(NewsletterSubscription).order_by(NewsletterSubscription.subscribed_at.desc()).all()
-        
+    def _export_incremental(self, db: Session, fingerprint: dict) -> str:
+        """Append rows added since the last export, falling back to a full rebuild
+        when there is no usable previous export (missing, edited, or different layout).
+
+        New rows are rendered onto the end of each dirty sheet's cached rows and
+        the workbook is reassembled from the cache, so the existing workbook is
+        never parsed and only new rows are queried and rendered.
+        """
+        file_path = self.excel_dir / self.filename
+        state = self._load_state(file_path)
+        if state is None:
+            print("Incremental Excel export: no compatible previous export, rebuilding")
+            return self._export_full(db, fingerprint)
+
+        metas = {}
+        for key, sheet in SHEETS.items():
+            meta = self._load_sheet_cache(key, ignore_dirty=True)
+            if meta is None or meta["last_id"] != state["sheets"][key]["last_id"]:
+                print(f"Incremental Excel export: sheet cache for '{sheet['title']}' is out of date, rebuilding")
+                return self._export_full(db, fingerprint)
+            metas[key] = meta
+
+        appended = 0
+        for key in SHEETS:
+            # Untouched form types have nothing to append
+            if self._clear_dirty(key):
+                appended += self._append_sheet_cache(db, key, metas[key])
+
+        if appended:
+            wb = Workbook(write_only=True)
+            for key, meta in metas.items():
+                self._add_sheet(wb, key, meta["widths"])
+            self._save_atomic(wb, file_path, list(metas))
+        if appended or state.get("fingerprint") != fingerprint:
+            last_ids = {key: meta["last_id"] for key, meta in metas.items()}
+            self._save_state(file_path, last_ids, fingerprint)
+        return str(file_path)
+
+    def _dirty_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.dirty"
+
+    def _clear_dirty(self, key: str) -> bool:
+        """Remove the dirty marker for a sheet, returning whether it was set.
+
+        Called before the sheet is queried, so a submission committed while the
+        export runs marks the sheet again and is picked up by the next export.
+        """
+        try:
+            self._dirty_path(key).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _rows_path(self, key: str) -> Path:
+        """Cached <row> elements of one sheet's data, in sheet order"""
+        return self.cache_dir / f"{key}.rows.xml"
+
+    def _load_sheet_cache(self, key: str, ignore_dirty: bool = False) -> Optional[dict]:
+        """Return cache metadata for a clean sheet, or None if it must be regenerated.
+
+        With ignore_dirty=True a dirty sheet's cache is still returned, for
+        incremental exports that append to it.
+        """
+        if not ignore_dirty and self._dirty_path(key).exists():
+            return None
+        meta_path = self.cache_dir / f"{key}.json"
+        rows_path = self._rows_path(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            stat = rows_path.stat()
+        except (OSError, ValueError):
+            return None
+        sheet = SHEETS[key]
+        if (
+            meta.get("layout_version") != EXPORT_LAYOUT_VERSION
+            or meta.get("order") != self.order
+            or meta.get("headers") != sheet["headers"]
+            or meta.get("rows_mtime_ns") != stat.st_mtime_ns
+            or meta.get("rows_size") != stat.st_size
+        ):
+            return None
+        return meta
+
+    def _build_sheet_cache(self, db: Session, key: str) -> dict:
+        """Query one sheet from the database into its cached worksheet rows.
+
+        Rows are rendered straight to SpreadsheetML (row 1 is the header, so
+        data starts at row 2) while column widths are measured. The workbook
+        is later written with headers only and these rows spliced in, so a
+        clean sheet costs a file copy instead of a pass through openpyxl.
+        """
+        sheet = SHEETS[key]
+        self._clear_dirty(key)
+        widths = [len(str(header)) for header in sheet["headers"]]
+        columns = [get_column_letter(index) for index in range(1, len(sheet["headers"]) + 1)]
+        last_id = 0
+        row_count = 0
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        rows_path = self._rows_path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.cache_dir), prefix=f".{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as spool:
+                for record in self._iter_rows(db, key):
+                    row = sheet["row"](record)
+                    for index, value in enumerate(row):
+                        length = len(str(value))
+                        if length > widths[index]:
+                            widths[index] = length
+                    row_count += 1
+                    spool.write(_row_xml(row_count + 1, row, columns))
+                    if record.id > last_id:
+                        last_id = record.id
+            os.replace(tmp_path, rows_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        stat = rows_path.stat()
+        meta = {
+            "layout_version": EXPORT_LAYOUT_VERSION,
+            "order": self.order,
+            "headers": sheet["headers"],
+            "widths": widths,
+            "last_id": last_id,
+            "row_count": row_count,
+            "rows_mtime_ns": stat.st_mtime_ns,
+            "rows_size": stat.st_size,
+        }
+        self._write_json_atomic(self.cache_dir / f"{key}.json", meta)
+        return meta
+
+    def _append_sheet_cache(self, db: Session, key: str, meta: dict) -> int:
+        """Render rows added after meta["last_id"] onto the end of a sheet's cached rows.
+
+        Updates `meta` in place (widths, last_id, row_count, rows file stat)
+        and returns the number of rows appended.
+        """
+        sheet = SHEETS[key]
+        widths = meta["widths"]
+        columns = [get_column_letter(index) for index in range(1, len(sheet["headers"]) + 1)]
+        last_id = meta["last_id"]
+        row_count = meta["row_count"]
+
+        with open(self._rows_path(key), "a", encoding="utf-8") as spool:
+            for record in self._iter_rows(db, key, after_id=last_id):
+                row = sheet["row"](record)
+                for index, value in enumerate(row):
+                    length = len(str(value))
+                    if length > widths[index]:
+                        widths[index] = length
+                row_count += 1
+                spool.write(_row_xml(row_count + 1, row, columns))
+                last_id = record.id
+
+        appended = row_count - meta["row_count"]
+        if appended:
+            stat = self._rows_path(key).stat()
+            meta.update(
+                last_id=last_id,
+                row_count=row_count,
+                rows_mtime_ns=stat.st_mtime_ns,
+                rows_size=stat.st_size,
+            )
+            self._write_json_atomic(self.cache_dir / f"{key}.json", meta)
+        return appended
+
+    def _iter_rows(self, db: Session, key: str, after_id: Optional[int] = None):
+        """Stream rows for one sheet in the configured order.
+
+        Only the exported columns are selected, and rows are fetched in batches
+        of EXPORT_BATCH_SIZE from the cursor instead of loading ORM objects.
+        """
+        sheet = SHEETS[key]
+        model = sheet["model"]
+        stmt = select(*sheet["columns"])
+        if "filter" in sheet:
+            stmt = stmt.where(sheet["filter"]())
+        if after_id is not None:
+            stmt = stmt.where(model.id > after_id)
+        if after_id is not None or self.order == ORDER_ID_ASC:
+            stmt = stmt.order_by(model.id.asc())
+        else:
+            stmt = stmt.order_by(sheet["timestamp"].desc())
+        return db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+
+    def _write_sheet(self, wb: Workbook, db: Session, key: str, use_cache: bool = True) -> int:
+        """Add one sheet (widths and header row) to a write-only workbook and return the highest id in it.
+
+        Dirty sheets are regenerated from the database into the sheet cache
+        first; the data rows themselves are spliced in from the cache when the
+        workbook is saved (_save_atomic). Memory use does not grow with row count.
+        """
+        sheet = SHEETS[key]
+        meta = self._load_sheet_cache(key) if use_cache else None
+        if meta is None:
+            meta = self._build_sheet_cache(db, key)
+            print(f"Excel export: regenerated '{sheet['title']}' ({meta['row_count']} rows)")
+        self._add_sheet(wb, key, meta["widths"])
+        return meta["last_id"]
+
+    def _add_sheet(self, wb: Workbook, key: str, widths: List[int]):
+        """Create a write-only sheet with its column widths and styled header row"""
+        sheet = SHEETS[key]
+        ws = wb.create_sheet(sheet["title"])
+
+        # Auto-adjust column widths
+        for index, width in enumerate(widths, start=1):
+            ws.column_dimensions[get_column_letter(index)].width = min(width + 2, 50)
+
         # Headers
-        headers = ["ID", "Email", "Subscribed At"]
-        ws.append(headers)
-        
-        # Style headers
         header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
         header_font = Font(bold=True, color="FFFFFF")
-        for cell in ws[1]:
+        header_cells = []
+        for header in sheet["headers"]:
+            cell = WriteOnlyCell(ws, value=header)
             cell.fill = header_fill
             cell.font = header_font
             cell.alignment = Alignment(horizontal="center")
-        
-        # Data
-        for sub in subscriptions:
-            ws.append([
-                sub.id,
-                sub.email,
-                sub.subscribed_at.strftime("%Y-%m-%d %H:%M:%S") if sub.subscribed_at else ""
-            ])
-        
-        # Auto-adjust column widths
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-
-    def _export_contact_forms(self, wb: Workbook, db: Session):
+            header_cells.append(cell)
+        ws.append(header_cells)
+        return ws
+
+    def _load_state(self, file_path: Path) -> Optional[dict]:
+        """Return the saved state if it still describes file_path, else None"""
+        if not file_path.exists() or not self.state_path.exists():
+            return None
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not read Excel export state: {e}")
+            return None
+
+        # The workbook must be exactly the file we wrote last time, in the same layout
+        stat = file_path.stat()
+        if (
+            state.get("layout_version") != EXPORT_LAYOUT_VERSION
+            or state.get("order") != self.order
+            or state.get("workbook_mtime_ns") != stat.st_mtime_ns
+            or state.get("workbook_size") != stat.st_size
+        ):
+            return None
+        sheets = state.get("sheets", {})
+        for key, sheet in SHEETS.items():
+            saved = sheets.get(key)
+            if not saved or saved.get("headers") != sheet["headers"] or saved.get("title") != sheet["title"]:
+                return None
+        return state
+
+    def _save_state(self, file_path: Path, last_ids: dict, fingerprint: dict):
+        """Record per-sheet high-water marks for the workbook just written"""
+        stat = file_path.stat()
+        state = {
+            "layout_version": EXPORT_LAYOUT_VERSION,
+            "order": self.order,
+            "workbook_mtime_ns": stat.st_mtime_ns,
+            "workbook_size": stat.st_size,
+            "exported_at": datetime.now().isoformat(),
+            "fingerprint": fingerprint,
+            "sheets": {
+                key: {
+                    "title": sheet["title"],
+                    "headers": sheet["headers"],
+                    "last_id": last_ids.get(key, 0),
+                }
+                for key, sheet in SHEETS.items()
+            },
+        }
+        self._write_json_atomic(self.state_path, state)
+
+    def _write_json_atomic(self, path: Path, data: dict):
+        """Write a JSON side-car file via temp file + rename"""
+        fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _save_atomic(self, wb: Workbook, file_path: Path, sheet_keys: Optional[List[str]] = None):
+        """Write workbook to a temp file and rename it over file_path.
+
+        With `sheet_keys` (one per worksheet, in order) each sheet's cached
+        data rows are spliced in after its header row.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=str(file_path.parent), prefix=f".{file_path.name}.", suffix=".tmp")
+        os.close(fd)
+        skeleton_path = None
+        try:
+            if sheet_keys:
+                fd, skeleton_path = tempfile.mkstemp(dir=str(file_path.parent), prefix=f".{file_path.name}.", suffix=".skeleton.tmp")
+                os.close(fd)
+                wb.save(skeleton_path)
+                self._splice_rows(skeleton_path, tmp_path, sheet_keys)
+            else:
+                wb.save(tmp_path)
+            os.replace(tmp_path, file_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            if skeleton_path and os.path.exists(skeleton_path):
+                os.remove(skeleton_path)
+
+    def _splice_rows(self, skeleton_path: str, target_path: str, sheet_keys: List[str]):
+        """Copy the skeleton workbook, inserting each sheet's cached rows before </sheetData>"""
+        sheet_rows = {f"xl/worksheets/sheet{index}.xml": key for index, key in enumerate(sheet_keys, start=1)}
+        with zipfile.ZipFile(skeleton_path) as source, \
+                zipfile.ZipFile(target_path, "w", compression=zipfile.ZIP_DEFLATED) as target:
+            for source_info in source.infolist():
+                data = source.read(source_info)
+                info = zipfile.ZipInfo(source_info.filename, date_time=source_info.date_time)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                key = sheet_rows.pop(info.filename, None)
+                if key is None:
+                    target.writestr(info, data)
+                    continue
+                head, marker, tail = data.decode("utf-8").partition("</sheetData>")
+                if not marker:
+                    raise ValueError(f"Unexpected worksheet layout in {info.filename}")
+                with target.open(info, "w", force_zip64=True) as out, open(self._rows_path(key), "rb") as rows:
+                    out.write(head.encode("utf-8"))
+                    shutil.copyfileobj(rows, out, SPLICE_CHUNK_SIZE)
+                    out.write((marker + tail).encode("utf-8"))
+        if sheet_rows:
+            raise ValueError(f"Worksheets missing from workbook: {', '.join(sheet_rows)}")
+
+    def _export_newsletter(self, wb: Workbook, db: Session, use_cache: bool = True) -> int:
+        """Export newsletter subscriptions"""
+        return self._write_sheet(wb, db, "newsletter", use_cache)
+
+    def _export_contact_forms(self, wb: Workbook, db: Session, use_cache: bool = True) -> int:
         """Export contact forms (excluding demo requests)"""
-        ws = wb.create_sheet("Contact Forms")
-        # Get contact forms where demo_date is None (not demo requests)
-        forms = db.query(ContactForm).filter(ContactForm.demo_date == None).order_by(ContactForm.submitted_at.desc()).all()
-        
-        headers = ["ID", "First Name", "Last Name", "Email", "Phone", "Company", "Message", "Submitted At"]
-        ws.append(headers)
-        
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF")
-        for cell in ws[1]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center")
-        
-        for form in forms:
-            ws.append([
-                form.id,
-                form.first_name or "",
-                form.last_name or "",
-                form.email,
-                form.phone or "",
-                form.company or "",
-                form.message or "",
-                form.submitted_at.strftime("%Y-%m-%d %H:%M:%S") if form.submitted_at else ""
-            ])
-        
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-
-    def _export_demo_requests(self, wb: Workbook, db: Session):
+        return self._write_sheet(wb, db, "contact_forms", use_cache)
+
+    def _export_demo_requests(self, wb: Workbook, db: Session, use_cache: bool = True) -> int:
         """Export demo request forms"""
-        ws = wb.create_sheet("Demo Requests")
-        # Get contact forms where demo_date is not None (demo requests)
-        forms = db.query(ContactForm).filter(ContactForm.demo_date != None).order_by(ContactForm.submitted_at.desc()).all()
-        
-        headers = ["ID", "First Name", "Last Name", "Email", "Phone", "Company", "Preferred Demo Date", "Message", "Submitted At"]
-        ws.append(headers)
-        
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF")
-        for cell in ws[1]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center")
-        
-        for form in forms:
-            ws.append([
-                form.id,
-                form.first_name or "",
-                form.last_name or "",
-                form.email,
-                form.phone or "",
-                form.company or "",
-                form.demo_date or "",
-                form.message or "",
-                form.submitted_at.strftime("%Y-%m-%d %H:%M:%S") if form.submitted_at else ""
-            ])
-        
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-
-    def _export_brochure_forms(self, wb: Workbook, db: Session):
+        return self._write_sheet(wb, db, "demo_requests", use_cache)
+
+    def _export_brochure_forms(self, wb: Workbook, db: Session, use_cache: bool = True) -> int:
         """Export brochure forms"""
-        ws = wb.create_sheet("Brochure Requests")
-        forms = db.query(BrochureForm).order_by(BrochureForm.submitted_at.desc()).all()
-        
-        headers = ["ID", "Full Name", "Email", "Company", "Phone", "Job Role", "Agreed to Marketing", "Submitted At"]
-        ws.append(headers)
-        
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF")
-        for cell in ws[1]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center")
-        
-        for form in forms:
-            ws.append([
-                form.id,
-                form.full_name,
-                form.email,
-                form.company,
-                form.phone or "",
-                form.job_role or "",
-                "Yes" if form.agreed_to_marketing else "No",
-                form.submitted_at.strftime("%Y-%m-%d %H:%M:%S") if form.submitted_at else ""
-            ])
-        
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-
-    def _export_product_profile_forms(self, wb: Workbook, db: Session):
+        return self._write_sheet(wb, db, "brochure_forms", use_cache)
+
+    def _export_product_profile_forms(self, wb: Workbook, db: Session, use_cache: bool = True) -> int:
         """Export product profile forms"""
-        ws = wb.create_sheet("Product Profile Requests")
-        forms = db.query(ProductProfileForm).order_by(ProductProfileForm.submitted_at.desc()).all()
-        
-        headers = [
-            "ID", "First Name", "Last Name", "Email", "Phone", "Job Title",
-            "Company Name", "Industry", "Company Size", "Website", "Address",
-            "Current System", "Warehouses", "Users", "Requirements", "Timeline", "Submitted At"
-        ]
-        ws.append(headers)
-        
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF")
-        for cell in ws[1]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center")
-        
-        for form in forms:
-            ws.append([
-                form.id,
-                form.first_name,
-                form.last_name,
-                form.email,
-                form.phone,
-                form.job_title or "",
-                form.company_name,
-                form.industry or "",
-                form.company_size or "",
-                form.website or "",
-                form.address or "",
-                form.current_system or "",
-                form.warehouses or "",
-                form.users or "",
-                form.requirements or "",
-                form.timeline or "",
-                form.submitted_at.strftime("%Y-%m-%d %H:%M:%S") if form.submitted_at else ""
-            ])
-        
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-
-    def _export_talk_to_sales_forms(self, wb: Workbook, db: Session):
-        """Export talk to sales forms"""
-        ws = wb.create_sheet("Talk to Sales")
-        forms = db.query(TalkToSalesForm).order_by(TalkToSalesForm.submitted_at.desc()).all()
-        
-        headers = [
-            "ID", "Name", "Email", "Phone", "Company", "Message",
-            "Current ERP System", "Number of Warehouses", "Expected Number of Users",
-            "Specific Requirements or Challenges", "Implementation Timeline", "Submitted At"
-        ]
-        ws.append(headers)
-        
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF")
-        for cell in ws[1]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center")
-        
-        for form in forms:
-            ws.append([
-                form.id,
-                form.name,
-                form.email,
-                form.phone,
-                form.company or "",
-                form.message,
-                form.current_system or "",
-                form.warehouses or "",
-                form.users or "",
-                form.requirements or "",
-                form.timeline or "",
-                form.submitted_at.strftime("%Y-%m-%d %H:%M:%S") if form.submitted_at else ""
-            ])
-        
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
+        return self._write_sheet(wb, db, "product_profile_forms", use_cache)
 
+    def _export_talk_to_sales_forms(self, wb: Workbook, db: Session, use_cache: bool = True) -> int:
+        """Export talk to sales forms"""
+        return self._write_sheet(wb, db, "talk_to_sales_forms", use_cache)
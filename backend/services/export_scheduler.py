@@ -0,0 +1,237 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from database import SessionLocal
+from services.excel_service import ExcelService
+
+
+@contextmanager
+def _file_lock(lock_path: Path):
+    """Exclusive advisory lock shared by every process (uvicorn worker) on this host"""
+    with open(lock_path, "a+b") as handle:
+        if os.name == "nt":
+            import msvcrt
+            handle.seek(0)
+            while True:
+                try:
+                    # LK_LOCK retries for ~10s before raising, keep waiting until we get it
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        else:
+            import fcntl
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == "nt":
+                import msvcrt
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def run_export_job(full_rebuild: bool = False) -> str:
+    """Run one export. Executed in the export worker process, so it opens its own
+    database session and takes the cross-process lock itself."""
+    excel_service = ExcelService()
+    lock_path = excel_service.excel_dir / f"{excel_service.filename}.lock"
+    db = SessionLocal()
+    try:
+        with _file_lock(lock_path):
+            return excel_service.export_all_forms(db, full_rebuild=full_rebuild)
+    finally:
+        db.close()
+
+
+class ExportScheduler:
+    """Coalescing, single-flight scheduler for ExcelService.export_all_forms.
+
+    Every trigger inside the coalescing window is folded into one rebuild. Only
+    one rebuild runs at a time: a thread lock guards this process and a file
+    lock next to the workbook guards the other uvicorn workers.
+
+    The openpyxl work is CPU-bound, so by default it runs in a dedicated
+    single-process pool (EXCEL_EXPORT_EXECUTOR=process) and never holds the
+    API worker's GIL. EXCEL_EXPORT_EXECUTOR=thread runs it on the scheduler
+    thread instead.
+    """
+
+    def __init__(self, excel_service: Optional[ExcelService] = None, window_seconds: Optional[float] = None):
+        self.excel_service = excel_service or ExcelService()
+        if window_seconds is None:
+            try:
+                window_seconds = float(os.getenv("EXCEL_EXPORT_COALESCE_SECONDS", "5"))
+            except (ValueError, TypeError):
+                window_seconds = 5.0
+        self.window_seconds = max(window_seconds, 0.0)
+        self.lock_path = self.excel_service.excel_dir / f"{self.excel_service.filename}.lock"
+        self.executor_kind = os.getenv("EXCEL_EXPORT_EXECUTOR", "process").strip().lower()
+        if self.executor_kind not in ("process", "thread"):
+            print(f"Unknown EXCEL_EXPORT_EXECUTOR '{self.executor_kind}', using process")
+            self.executor_kind = "process"
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+        self._state_lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._pending = 0
+
+        # Counters
+        self.triggers = 0
+        self.coalesced = 0
+        self.runs = 0
+        self.failures = 0
+        self.running = False
+        self.last_batch_size = 0
+        self.max_batch_size = 0
+        self.last_run_at: Optional[str] = None
+        self.last_duration_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def trigger(self) -> None:
+        """Request a rebuild. Returns immediately; the export runs after the window closes"""
+        with self._state_lock:
+            self.triggers += 1
+            self._pending += 1
+            if self._timer is not None:
+                self.coalesced += 1
+                return
+            self._timer = threading.Timer(self.window_seconds, self._fire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _fire(self) -> None:
+        """Timer callback - run one export for every trigger collected so far"""
+        with self._state_lock:
+            self._timer = None
+            batch = self._pending
+            self._pending = 0
+        if batch:
+            self._run(batch)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: the worker must not inherit the parent's open SQLite connections
+            self._executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def _run(self, batch: int, full_rebuild: bool = False) -> Optional[str]:
+        # Triggers that arrive while we are exporting start a new window and
+        # wait here, so they are picked up by exactly one follow-up run
+        with self._run_lock:
+            self.running = True
+            started = time.perf_counter()
+            try:
+                if self.executor_kind == "process":
+                    file_path = self._get_executor().submit(run_export_job, full_rebuild).result()
+                else:
+                    db = SessionLocal()
+                    try:
+                        with _file_lock(self.lock_path):
+                            file_path = self.excel_service.export_all_forms(db, full_rebuild=full_rebuild)
+                    finally:
+                        db.close()
+                self.last_error = None
+                return file_path
+            except BrokenProcessPool as e:
+                # Worker died (killed, out of memory); start a fresh one next time
+                self._executor = None
+                self.failures += 1
+                self.last_error = f"export worker died: {e}"
+                print(f"Excel export failed: {self.last_error}")
+                return None
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                print(f"Excel export failed: {str(e)}")
+                return None
+            finally:
+                self.runs += 1
+                self.running = False
+                self.last_batch_size = batch
+                self.max_batch_size = max(self.max_batch_size, batch)
+                self.last_run_at = datetime.now().isoformat()
+                self.last_duration_seconds = round(time.perf_counter() - started, 4)
+                print(f"Excel export finished in {self.last_duration_seconds}s ({batch} trigger(s) coalesced into 1 run)")
+
+    def flush(self) -> None:
+        """Run any pending export now instead of waiting for the window (used on shutdown)"""
+        batch = self._take_pending()
+        if batch:
+            self._run(batch)
+
+    def run_now(self, full_rebuild: bool = False) -> Optional[str]:
+        """Export immediately and wait for it, absorbing any pending triggers.
+
+        Returns the workbook path, or None if the export failed.
+        """
+        with self._state_lock:
+            self.triggers += 1
+            self._pending += 1
+        batch = self._take_pending()
+        return self._run(batch, full_rebuild)
+
+    def _take_pending(self) -> int:
+        """Cancel the open window and return the number of triggers it held"""
+        with self._state_lock:
+            timer = self._timer
+            self._timer = None
+            batch = self._pending
+            self._pending = 0
+        if timer is not None:
+            timer.cancel()
+        return batch
+
+    def export_lock(self):
+        """Context manager holding the cross-process export lock (no export can replace the workbook meanwhile)"""
+        return _file_lock(self.lock_path)
+
+    def shutdown(self) -> None:
+        """Flush pending work and stop the export worker process"""
+        self.flush()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def get_stats(self) -> dict:
+        """Counters for monitoring"""
+        with self._state_lock:
+            pending = self._pending
+        return {
+            "window_seconds": self.window_seconds,
+            "executor": self.executor_kind,
+            "triggers": self.triggers,
+            "coalesced": self.coalesced,
+            "runs": self.runs,
+            "failures": self.failures,
+            "pending_triggers": pending,
+            "running": self.running,
+            "last_batch_size": self.last_batch_size,
+            "max_batch_size": self.max_batch_size,
+            "last_run_at": self.last_run_at,
+            "last_duration_seconds": self.last_duration_seconds,
+            "last_error": self.last_error,
+        }
+
+
+# Lazy initialization - one scheduler per process
+_export_scheduler = None
+
+def get_export_scheduler() -> ExportScheduler:
+    """Get or create export scheduler instance"""
+    global _export_scheduler
+    if _export_scheduler is None:
+        _export_scheduler = ExportScheduler()
+    return _export_scheduler
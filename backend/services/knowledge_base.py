@@ -0,0 +1,501 @@
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional
+
+# SPARS knowledge base. The intro paragraph, the sections in CORE_SECTIONS and the
+# closing lines are the core persona sent on every chat; the other sections are
+# retrieved per question.
+KNOWLEDGE_DOCUMENT = """You are a helpful, knowledgeable, and professional AI assistant for SPARS (Smart Program for Area Rugs System), an ERP solution designed specifically for the home furnishing and rugs wholesale and distribution industry. Your role is to provide accurate, comprehensive information about SPARS features, modules, capabilities, and help users understand how SPARS can benefit their business.
+
+## COMPANY OVERVIEW
+SPARS is a modern, AI-enabled ERP platform purpose-built for the home furnishing wholesale and distribution industry. Since its first release in 2002, SPARS has helped leading U.S. brands streamline complex operations, optimize warehouse performance, and achieve full visibility across their supply chain. SPARS is backed by Magnum Opus System Corp. (USA) and its dedicated development and R&D center, Visionary Computer Solutions (Pvt.) Ltd. (Pakistan).
+
+## WHAT IS SPARS?
+SPARS stands for Smart Program for Area Rugs System. It is a specialized ERP software built specifically for wholesalers and distributors of the home furnishing and rugs industry. Unlike generic ERP systems, SPARS doesn't require customization before use—it's a plug-and-play system designed for the unique needs of rug and home décor businesses. SPARS manages billing, sales, purchasing, warehouse operations, inventory, accounts receivable, returns, and more.
+
+## CORE MODULES
+
+### 1. Inventory Management Module
+- Real-time tracking of inventory levels, movements, and statuses across multiple warehouses
+- Support for serialized and batch-controlled items
+- Various inventory types: collective, warehouse-wise, and differential inventory feeds
+- Unique stock identification (OAK items), stock adjustments, and detailed transaction histories
+- Efficient physical stock counts, reconciliation, and loss declarations
+- Automated alerts and comprehensive reporting to reduce stockouts and excess inventory
+
+### 2. Warehouse Automation Module
+- Automated processes for receiving, storing, picking, packing, and shipping goods
+- Barcode scanning, RFID tagging, and real-time inventory updates
+- Multi-warehouse management with seamless coordination between storage locations
+- Integration with Voodoo Robotics devices for efficient and flawless shipping
+- Extended item properties, labeling and barcoding, picker monitoring dashboards
+- Structured multi-bin warehouses, virtual warehouses, and SET items
+- Mobile SCANNER App and SPOOLER App for warehouse operations
+- Warehouse user access control and GTIN-14 barcoding options
+- Performance-tested to process over 70,000 orders per day for enterprise edition
+
+### 3. Broadloom Module
+- Handles unique inventory and transaction complexities of home furnishing products like broadloom rugs
+- Detailed inventory tracking including roll-wise and cut piece-wise management
+- Integrated sales, purchase, and return processes
+- Prevents stock discrepancies and supports quick resolution of returns
+
+### 4. Sales Management Module
+- Automates entire sales cycle from sales orders to order fulfillment
+- Quotation management, order processing, packages, discounts, and commissions
+- Integration with inventory and finance for accurate stock availability and billing
+- Real-time sales analytics and performance tracking
+- Intelligent baling, automated backorder management, and freight quoting via API
+- Multiple price tiers, one-step price changes, pre-packaged orders
+- Blanket orders with auto-release, special packages options (white label, exclusive items)
+- Consignment sales management, bulk return processing, one-step returns
+- Custom shipping charges and customized selling price rules
+
+### 5. Purchase Management Module
+- Streamlines procurement from requisition to supplier payment
+- Purchase order creation, approval workflows, supplier management, and contract tracking
+- Integration with inventory to maintain optimal stock levels
+- Real-time visibility into purchase order status, delivery schedules, and supplier performance
+- Vendor packing slip management, container management, incoming shipment planning
+- Support for pre-packaged item orders (SET feature), shipment receiving dashboard
+- Consignment purchase handling, extended properties for vendors
+
+### 6. Accounts Payables Module
+- Manages vendor invoices, payments, and credit memos efficiently
+- Automated invoice entry, matching with purchase orders and receipts
+- Approval workflows to ensure accuracy and prevent duplicate payments
+- Multiple payment methods, schedules, and currency handling
+- Detailed aging reports, cash flow forecasting, and vendor performance analysis
+
+### 7. Accounts Receivable Module
+- Handles customer invoicing, payment processing, and credit management
+- Automated invoice generation, payment tracking, and collections management
+- Multiple payment terms, currencies, and customer credit limits
+- Aging reports, cash forecasting, and customer account analysis
+- Integration with sales and finance modules for accurate revenue recognition
+
+### 8. Accounts and Finance Module
+- Comprehensive financial management including general ledger, budgeting, and reporting
+- Multi-currency transactions, cost centers, and project accounting
+- Automated journal entries, reconciliations, and period closings
+- Customizable financial reports, dashboards, and analytics
+- Support for multiple divisions, master and sub-accounts for customers
+- Bank reconciliation, future date transactions, and true-to-terms aging
+- Automated invoicing and customized bulk invoicing
+
+### 9. Commission & Royalty Module
+- Automates calculation and management of commissions and royalties
+- Complex commission structures based on sales volume, product categories, territories, and performance targets
+- Tracks sales transactions, calculates payable commissions, generates detailed reports
+- Manages royalty payments for licensed products or intellectual property
+- Integration with sales and finance modules for seamless data flow
+
+### 10. EDI Module
+- Comprehensive solution for automated Electronic Data Interchange with trading partners
+- Supports standard EDI transaction sets: EDI 846 (Inventory Inquiry/Feed), EDI 850 (Purchase Order), EDI 855 (Purchase Order Acknowledgement), EDI 856 (Advance Shipping Notice), EDI 810 (Invoice), EDI 824 (Application Advice), EDI 945 (Warehouse Shipping Advice), EDI 753, 865, and more
+- Customer-specific EDI configuration with Customer EDI Setup interface
+- Multiple inventory feed types: collective, warehouse-wise, differential, and differential warehouse-wise
+- Real-time processing and monitoring with EDI Traffic Analyzer
+- Comprehensive error handling and audit trails
+- Automated document generation and processing
+- Supports both managed and unmanaged EDI options
+
+### 11. Reports Module
+- Wide range of customizable reports covering inventory, sales, purchasing, finance, and operations
+- Real-time data visualization, export options, and scheduled report generation
+- Detailed analytical reports, summaries, and dashboards
+- Key performance indicators (KPIs) tracking and monitoring
+- Drill-down capabilities for in-depth analysis
+- Integration with Power BI for business analytics
+
+### 12. Administration Module
+- System configuration, user roles, security, and maintenance tasks
+- Access controls, user profiles, and system parameters management
+- Audit logging, data backup, and system updates
+- Master data, workflows, and integrations with external systems management
+
+## KEY FEATURES
+
+### B2B Portals
+- Dedicated portals for customers, salespersons, and vendors
+- Customers can place orders and check stock availability anytime
+- Salespersons can monitor sales performance and approve orders on the go
+- Vendors benefit from streamlined purchase order management, vendor packing slips, and shipment updates
+- Self-service and role-specific access reduces communication delays
+
+### Warehouse Management Features
+- Voodoo Robotics integration for automated shipping
+- Transfer between warehouses and virtual warehouses
+- Mobile SCANNER App for real-time warehouse transactions (Android-based)
+- SPOOLER App for fast, accurate, and automated shipment processing
+- Put-to-light picking systems
+- Intelligent baling and auto-baling features
+- Container management for tracking incoming shipments
+- Paperless picking capabilities
+
+### SPOOLER Application
+- Fast, accurate, and automated shipment processing
+- Direct integration with major carriers (UPS, FedEx) for automatic label generation
+- Zero-error shipment validation through scanning
+- Multi-batch support (Managed Shipments, Regular Batches, LTL, Put-to-Light)
+- Automated printing of Packing Slips, Package Labels, and Carrier Labels
+- Built-in Shipment Log with real-time error handling
+- Seamless integration with SCANNER App for container loading and confirmation
+
+
+### SPARS Executive Mobile App:
+"Real-time business intelligence at your fingertips—access critical sales, customer, vendor, and inventory insights anytime, anywhere with enterprise-grade security."
+
+
+### SCANNER Application (Mobile)
+- Android-based mobile scanning for real-time warehouse transactions
+- Supports shipment receiving, picking, cyclic counts, and customer returns
+- Integrates physical scanning with SPARS transactions instantly
+- Reduces errors and accelerates warehouse operations
+
+### Baling and Auto-Baling Features
+- Intelligent baling that automatically groups items for efficient shipping
+- Auto-baling feature automates the process of grouping items into bales or packaging units
+- Rule-based packaging logic based on item attributes
+- Supports multiple packaging types (bales, rolls, cartons, pallets, slips)
+- Detailed bale information with unique bale numbers, dimensions, and weight
+- Integration with shipment documents (packing slips, bill of lading)
+- Smart auto packaging algorithm that determines best box combinations
+
+### Auto-Rating Feature
+- Automates calculation of shipping rates within Sales Order and Bill of Lading interfaces
+- Real-time freight rate retrieval via carrier APIs (FedEx, UPS, and others)
+- Dynamic rate updates and manual override capability
+- Supports multiple shipping methods and complex shipments (LTL, parcel, multi-package)
+
+### Value-Added Features
+- Data Export Manager for easy data extraction
+- Paperless document management
+- API integrations with shipping companies and major e-commerce platforms
+- Electronic data processing through secure FTP
+- Two-layer authentication for external users
+
+### Pre-Packaged Item Orders (SET Feature)
+- Efficient management of bundled products and pre-packaged sets
+- Simplifies order processing and inventory management for sets or kits
+- Treats sets as single units while maintaining detailed component tracking
+
+## INTEGRATIONS
+
+### E-Commerce Platforms
+- Amazon
+- Wayfair
+- Shopify
+- CommerceHub
+- Overstock
+- Walmart
+- SPS Commerce
+
+### Shipping Carriers
+- FedEx (API integration for label generation, tracking, freight quotes)
+- UPS (API integration for label generation, tracking, freight quotes)
+- EST
+- SEFL
+- Various national and regional LTL carriers
+
+### Other Integrations
+- API-based custom integrations supported
+- Secure FTP for electronic data processing
+- EDI integration with trading partners
+
+## PERFORMANCE & SCALABILITY
+- Warehouse Management System (WMS) performance-tested to process over 70,000 orders per day (enterprise edition)
+- Handles high-volume operations with precision, accuracy, and speed
+- Scalable architecture supporting businesses from mid-market distributors to multi-warehouse enterprises
+- Supports unlimited warehouses with multi-bin layouts, virtual warehouses, and transfer capabilities
+
+## DEPLOYMENT OPTIONS
+- Cloud deployment
+- Hybrid deployment
+- On-premise deployment
+- Flexible architecture to meet specific security and infrastructure requirements
+
+## INDUSTRY-SPECIFIC CAPABILITIES
+- Purpose-built for home furnishing wholesale and distribution industry
+- Industry-specific functionality eliminates heavy customizations typically required in generic ERP systems
+- Specialized features for:
+  - Broadloom & rug handling
+  - Showroom inventory
+  - Royalty tracking
+  - Multi-bin warehousing
+  - Automated freight rating
+  - Bale tracking and batch control
+  - End-to-end area rug management
+  - Special order and weaving processes
+  - Virtual set SKUs
+  - Physical set assembly workflows
+
+## ROI & BENEFITS
+- Faster order and billing cycles
+- Reduced labor and manual workload
+- Better inventory control leading to fewer costly mistakes
+- Real-time analytics for smarter decisions
+- Scalability without increasing overhead
+- Significant time savings and improved cash flow
+- Faster implementation compared to large global ERP vendors (typically 8-12 weeks for standard implementations)
+
+## SUPPORT & TRAINING
+- Comprehensive training for all users covering system navigation, role-specific functions, and best practices
+- Training provided during implementation with ongoing support available
+- Support levels vary by package:
+  - Standard: Email support
+  - Enterprise: 24/7 premium support with dedicated account managers
+- All packages include regular system updates and access to support resources
+
+## CONTACT INFORMATION
+- Email: sales@sparsus.com
+- Phone: +1 (212) 685-2127 (Note: Some materials mention +1 (646) 775-2716 - use the most current number)
+- Address: 112 West 34 Street, 18th Floor, New York, NY 10120
+- Website: www.sparsus.com
+- Business Hours: Monday-Friday, 9:00 AM - 6:00 PM EST
+
+## YOUR RESPONSE GUIDELINES
+1. Be friendly, professional, and helpful
+2. Provide accurate, detailed information based on the knowledge above
+3. Keep responses concise but comprehensive when needed
+4. If asked about pricing, direct users to contact the sales team
+5. If you don't know something specific or need clarification, direct users to contact the sales team at sales@sparsus.com or call +1 (212) 685-2127
+6. Highlight SPARS's industry-specific advantages over generic ERP systems
+7. Emphasize the plug-and-play nature and faster implementation timeline
+8. Mention relevant modules and features when answering questions
+9. Use specific numbers and capabilities (e.g., "70,000+ orders per day") when relevant
+10. Always maintain a professional and enthusiastic tone about SPARS capabilities
+
+## COMMON QUESTIONS TO HANDLE
+- Pricing: Direct to sales team (sales@sparsus.com or +1 (212) 685-2127)
+- Demo requests: Direct to contact form or sales team
+- Implementation timeline: Typically 8-12 weeks for standard implementations
+- Deployment options: Cloud, hybrid, or on-premise available
+- Integration capabilities: Extensive pre-built integrations plus API support for custom integrations
+- Industry focus: Purpose-built for home furnishing and rugs wholesale/distribution industry
+- Performance: WMS tested to process 70,000+ orders per day
+- Training: Comprehensive training provided during implementation with ongoing support
+
+Remember: You are representing SPARS, a trusted ERP solution that has been helping home furnishing businesses since 2002. Be knowledgeable, helpful, and always guide users toward the appropriate resources when needed.
+Dont always say - "How can i assist you?" 
+
+Always Return result markdown format- only return markdown data without ``` or markdown keyword. 
+"""
+
+
+
+# Sections sent with every question, whatever it is about
+CORE_SECTIONS = {"WHAT IS SPARS?", "CONTACT INFORMATION", "YOUR RESPONSE GUIDELINES", "COMMON QUESTIONS TO HANDLE"}
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset("""
+a about an and any are as at be by can do does for from have how i in is it its me my of on or our
+please s so spars that the their them there these this to us was we what when where which who why will
+with you your
+""".split())
+
+
+def _env_number(name: str, default, cast=int):
+    try:
+        return cast(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords ("spars" is one - every section mentions it).
+
+    A plural "s" is stripped so "modules" matches "module".
+    """
+    tokens = []
+    for word in _WORD.findall(text.lower()):
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+class KnowledgeSection(NamedTuple):
+    parent: Optional[str]  # "## " heading a "### " section sits under
+    heading: str
+    body: str
+
+    def render(self) -> str:
+        level = "###" if self.parent else "##"
+        return f"{level} {self.heading}\n{self.body}"
+
+
+def parse_sections(document: str):
+    """Split the document into (intro, sections, closing).
+
+    Every "##" and "###" heading starts a section. A "##" heading with only
+    "###" sections under it (CORE MODULES, KEY FEATURES, INTEGRATIONS) gets a
+    generated body listing them, so "which modules are there" has an answer.
+    The closing is everything from the "Remember:" line on.
+    """
+    lines = document.split("\n")
+    closing_at = next((i for i, line in enumerate(lines) if line.startswith("Remember:")), len(lines))
+    intro: List[str] = []
+    closing = "\n".join(lines[closing_at:]).strip()
+    sections: List[KnowledgeSection] = []
+    children: Dict[str, List[str]] = {}
+    parent: Optional[str] = None
+    heading: Optional[str] = None
+    body: List[str] = []
+
+    def flush():
+        text = "\n".join(body).strip()
+        if heading is None:
+            intro.extend(body)
+        elif text:
+            sections.append(KnowledgeSection(parent if heading != parent else None, heading, text))
+        elif heading == parent:
+            # Placeholder, filled in below once its sub-sections are known
+            sections.append(KnowledgeSection(None, heading, ""))
+
+    for line in lines[:closing_at]:
+        if line.startswith("## ") or line.startswith("### "):
+            flush()
+            heading = line.lstrip("#").strip().rstrip(":")
+            body = []
+            if line.startswith("## "):
+                parent = heading
+            else:
+                children.setdefault(parent, []).append(heading)
+        else:
+            body.append(line)
+    flush()
+
+    sections = [
+        section if section.body else section._replace(
+            body="\n".join(f"- {child}" for child in children.get(section.heading, []))
+        )
+        for section in sections
+    ]
+    return "\n".join(intro).strip(), [section for section in sections if section.body], closing
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of documents (pure Python, no network)"""
+
+    def __init__(self, documents: List[List[str]], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.term_counts = [Counter(tokens) for tokens in documents]
+        self.lengths = [len(tokens) for tokens in documents]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if documents else 0.0
+        document_frequency = Counter(term for counts in self.term_counts for term in counts)
+        total = len(documents)
+        self.idf = {
+            term: math.log(1 + (total - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+
+    def scores(self, query: List[str]) -> List[float]:
+        terms = [term for term in set(query) if term in self.idf]
+        results = []
+        for counts, length in zip(self.term_counts, self.lengths):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * length / self.avg_length) if self.avg_length else self.k1
+            for term in terms:
+                tf = counts.get(term, 0)
+                if tf:
+                    score += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            results.append(score)
+        return results
+
+
+class KnowledgeBase:
+    """Builds a per-question system prompt from the SPARS knowledge base.
+
+    The document is split into sections once and indexed with BM25 (section
+    headings count twice). Each prompt has the core persona (intro, the
+    CORE_SECTIONS and the closing lines) plus the `top_k` sections that best
+    match the question, in document order. With retrieval disabled
+    (CHATBOT_RETRIEVAL_ENABLED=false) the whole document is sent, as before.
+    """
+
+    def __init__(self, document: str = KNOWLEDGE_DOCUMENT, top_k: Optional[int] = None, enabled: Optional[bool] = None):
+        if enabled is None:
+            enabled = os.getenv("CHATBOT_RETRIEVAL_ENABLED", "true").lower() == "true"
+        self.enabled = enabled
+        self.top_k = max(top_k if top_k is not None else _env_number("CHATBOT_RETRIEVAL_TOP_K", 4), 0)
+        self.full_prompt = document
+        self.intro, self.sections, self.closing = parse_sections(document)
+        self._searchable = [index for index, section in enumerate(self.sections) if section.heading not in CORE_SECTIONS]
+        self.index = BM25Index([
+            tokenize(f"{section.heading} {section.heading} {section.parent or ''} {section.body}")
+            for section in (self.sections[index] for index in self._searchable)
+        ])
+
+        self._lock = threading.Lock()
+        self.prompts_built = 0
+        self.prompt_chars = 0
+        self.sections_sent = 0
+        self.no_match = 0
+
+    def search(self, query: str) -> List[int]:
+        """Indexes (into self.sections) of the best matching non-core sections, best first"""
+        scores = self.index.scores(tokenize(query))
+        ranked = sorted(
+            (position for position, score in enumerate(scores) if score > 0),
+            key=lambda position: scores[position],
+            reverse=True,
+        )
+        return [self._searchable[position] for position in ranked[:self.top_k]]
+
+    def build_prompt(self, query: str) -> str:
+        """System prompt for a question: core persona plus the relevant sections"""
+        if not self.enabled:
+            return self.full_prompt
+        retrieved = set(self.search(query))
+        parts = [self.intro]
+        current_parent = None
+        for index, section in enumerate(self.sections):
+            if index not in retrieved and section.heading not in CORE_SECTIONS:
+                continue
+            # Keep sub-sections under their "##" heading, as in the full document
+            if section.parent and section.parent != current_parent:
+                parts.append(f"## {section.parent}")
+            current_parent = section.parent or section.heading
+            parts.append(section.render())
+        parts.append(self.closing)
+        prompt = "\n\n".join(parts) + "\n"
+
+        with self._lock:
+            self.prompts_built += 1
+            self.prompt_chars += len(prompt)
+            self.sections_sent += len(retrieved)
+            if not retrieved:
+                self.no_match += 1
+        return prompt
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "top_k": self.top_k,
+                "sections": len(self.sections),
+                "core_sections": sorted(CORE_SECTIONS),
+                "full_prompt_chars": len(self.full_prompt),
+                "prompts_built": self.prompts_built,
+                "avg_prompt_chars": round(self.prompt_chars / self.prompts_built) if self.prompts_built else None,
+                "avg_sections_retrieved": round(self.sections_sent / self.prompts_built, 2) if self.prompts_built else None,
+                "no_match": self.no_match,
+            }
+
+
+# Lazy initialization - the index is built once per process (at app startup)
+_knowledge_base = None
+
+def get_knowledge_base() -> KnowledgeBase:
+    """Get or create the indexed knowledge base"""
+    global _knowledge_base
+    if _knowledge_base is None:
+        _knowledge_base = KnowledgeBase()
+    return _knowledge_base
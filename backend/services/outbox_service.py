@@ -0,0 +1,400 @@
+import asyncio
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional, Set, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from database import EmailOutbox, SessionLocal, get_local_time
+from services.email_service import EmailService
+from services.send_quota import LANE_NAMES, SendQuotaGovernor, get_send_quota, is_quota_error, priority_for_kind
+
+
+def _env_number(name: str, default, cast=int):
+    try:
+        return cast(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+def enqueue_email(db: Session, message: dict) -> EmailOutbox:
+    """Add a composed message (EmailService.compose_*) to the outbox.
+
+    Does not commit - the caller commits it in the same transaction as the form
+    row, so either both are stored or neither is.
+    """
+    row = EmailOutbox(
+        kind=message.get("kind", "generic"),
+        priority=priority_for_kind(message.get("kind", "generic")),
+        to_email=message["to_email"],
+        subject=message["subject"],
+        body=message["body"],
+        html_body=message.get("html_body"),
+        attachments=json.dumps(message["attachments"]) if message.get("attachments") else None,
+        embedded_images=json.dumps(message["embedded_images"]) if message.get("embedded_images") else None,
+        status="pending",
+        attempts=0,
+        throttled_attempts=0,
+        next_attempt_at=get_local_time(),
+    )
+    db.add(row)
+    return row
+
+
+def _row_to_message(row: EmailOutbox) -> dict:
+    """send_email keyword arguments for an outbox row"""
+    return {
+        "to_email": row.to_email,
+        "subject": row.subject,
+        "body": row.body,
+        "html_body": row.html_body,
+        "attachments": json.loads(row.attachments) if row.attachments else None,
+        "embedded_images": json.loads(row.embedded_images) if row.embedded_images else None,
+        "kind": row.kind,
+    }
+
+
+class EmailOutboxWorker:
+    """Drains the email_outbox table on the event loop.
+
+    Due rows are claimed with a conditional UPDATE (pending -> sending), so
+    several uvicorn workers can drain the same table without sending a message
+    twice. Claimed rows go out in batches of up to `batch_size` over one SMTP
+    session each (so the two or three emails of a submission share a session),
+    and at most `concurrency` batches are in flight per process. A failed
+    send is retried with exponential backoff and jitter, and after
+    `max_attempts` the row is dead-lettered (status "dead") and kept for
+    inspection. While a batch is being sent its locks are refreshed every
+    third of `lock_timeout_seconds`; rows left in "sending" by a crash or
+    restart stop being refreshed and are retried once the lock is older than
+    that, so delivery is at-least-once.
+
+    Rows are claimed by priority lane (user-facing emails first, see
+    services/send_quota.py), and only as fast as the send quota governor
+    allows; rows it defers simply stay pending until the next drain. A send the
+    provider rejects for rate or quota reasons is rescheduled after the
+    governor's cooldown without using up an attempt; those retries have their
+    own limit (`max_throttled_attempts`), after which the row is dead-lettered.
+    """
+
+    def __init__(
+        self,
+        email_service: Optional[EmailService] = None,
+        concurrency: Optional[int] = None,
+        poll_seconds: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        retry_base_seconds: Optional[float] = None,
+        retry_max_seconds: Optional[float] = None,
+        lock_timeout_seconds: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        quota: Optional[SendQuotaGovernor] = None,
+        max_throttled_attempts: Optional[int] = None,
+    ):
+        self.email_service = email_service or EmailService()
+        self.quota = quota or get_send_quota()
+        self.concurrency = max(concurrency if concurrency is not None else _env_number("EMAIL_OUTBOX_CONCURRENCY", 3), 1)
+        self.poll_seconds = poll_seconds if poll_seconds is not None else _env_number("EMAIL_OUTBOX_POLL_SECONDS", 5.0, float)
+        self.max_attempts = max(max_attempts if max_attempts is not None else _env_number("EMAIL_OUTBOX_MAX_ATTEMPTS", 6), 1)
+        self.retry_base_seconds = retry_base_seconds if retry_base_seconds is not None else _env_number("EMAIL_OUTBOX_RETRY_BASE_SECONDS", 30.0, float)
+        self.retry_max_seconds = retry_max_seconds if retry_max_seconds is not None else _env_number("EMAIL_OUTBOX_RETRY_MAX_SECONDS", 3600.0, float)
+        self.lock_timeout_seconds = lock_timeout_seconds if lock_timeout_seconds is not None else _env_number("EMAIL_OUTBOX_LOCK_TIMEOUT_SECONDS", 300.0, float)
+        self.batch_size = max(batch_size if batch_size is not None else _env_number("EMAIL_OUTBOX_BATCH_SIZE", 10), 1)
+        self.max_throttled_attempts = max(max_throttled_attempts if max_throttled_attempts is not None else _env_number("EMAIL_OUTBOX_MAX_THROTTLED_ATTEMPTS", 20), 1)
+
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._in_flight: Set[asyncio.Task] = set()
+        self._stopping = False
+
+        # Counters (this process)
+        self.claimed = 0
+        self.sent = 0
+        self.batches = 0
+        self.failed_attempts = 0
+        self.retries_scheduled = 0
+        self.dead_lettered = 0
+        self.throttled = 0
+        self.recovered = 0
+        self.total_delivery_seconds = 0.0
+        self.last_sent_at: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.started_at: Optional[float] = None
+
+    def start(self) -> None:
+        """Start draining; must be called from the running event loop (app startup)"""
+        if self._task is not None:
+            return
+        self._stopping = False
+        self._wake = asyncio.Event()
+        self.started_at = time.monotonic()
+        self._task = asyncio.create_task(self._run())
+        print(f"Email outbox worker started (concurrency={self.concurrency}, poll={self.poll_seconds}s)")
+
+    def notify(self) -> None:
+        """Wake the worker right away instead of waiting for the next poll (call after commit)"""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            self._wake.clear()
+            try:
+                await self.drain()
+            except Exception as e:
+                self.last_error = f"drain: {type(e).__name__}"
+                print(f"Email outbox error: {str(e)}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def drain(self) -> None:
+        """Claim due messages and start delivering them in batches, up to the free concurrency slots"""
+        free = self.concurrency - len(self._in_flight)
+        if free <= 0:
+            return
+        claimed = await asyncio.to_thread(self._claim_due, free * self.batch_size)
+        for start in range(0, len(claimed), self.batch_size):
+            task = asyncio.create_task(self._deliver(claimed[start:start + self.batch_size]))
+            self._in_flight.add(task)
+            task.add_done_callback(self._on_delivery_done)
+
+    def _on_delivery_done(self, task: asyncio.Task) -> None:
+        self._in_flight.discard(task)
+        # A slot is free - pick up anything that queued up meanwhile
+        self.notify()
+
+    def _claim_due(self, limit: int) -> List[Tuple[int, int, dict]]:
+        """Mark up to `limit` due rows as sending and return (id, attempts, message) for each"""
+        db = SessionLocal()
+        try:
+            now = get_local_time()
+            recovered = db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.status == "sending")
+                .where(EmailOutbox.locked_at < now - timedelta(seconds=self.lock_timeout_seconds))
+                .values(status="pending", locked_at=None)
+            ).rowcount
+            if recovered:
+                self.recovered += recovered
+                print(f"Email outbox: retrying {recovered} message(s) left in sending state")
+
+            candidates = db.execute(
+                select(EmailOutbox.id, EmailOutbox.priority)
+                .where(EmailOutbox.status == "pending")
+                .where(EmailOutbox.next_attempt_at <= now)
+                .order_by(EmailOutbox.priority, EmailOutbox.next_attempt_at, EmailOutbox.id)
+                .limit(limit)
+            ).all()
+
+            claimed_ids = []
+            deferred_lanes = set()
+            for outbox_id, priority in candidates:
+                # Once a lane is over quota, leave the rest of it for a later drain
+                if priority in deferred_lanes:
+                    continue
+                if not self.quota.try_acquire(priority):
+                    deferred_lanes.add(priority)
+                    continue
+                # Another worker process may have claimed it since the SELECT
+                result = db.execute(
+                    update(EmailOutbox)
+                    .where(EmailOutbox.id == outbox_id)
+                    .where(EmailOutbox.status == "pending")
+                    .values(status="sending", locked_at=now, attempts=EmailOutbox.attempts + 1)
+                )
+                if result.rowcount == 1:
+                    claimed_ids.append(outbox_id)
+                else:
+                    self.quota.release()
+            db.commit()
+
+            if not claimed_ids:
+                return []
+            rows = db.execute(select(EmailOutbox).where(EmailOutbox.id.in_(claimed_ids))).scalars().all()
+            self.claimed += len(rows)
+            return [(row.id, row.attempts, _row_to_message(row)) for row in rows]
+        finally:
+            db.close()
+
+    async def _deliver(self, batch: List[Tuple[int, int, dict]]) -> None:
+        """Send a batch over one session and record each message's outcome"""
+        started = time.perf_counter()
+        heartbeat = asyncio.create_task(self._keep_locked([outbox_id for outbox_id, _, _ in batch]))
+        try:
+            errors = await self.email_service.deliver_email_batch([message for _, _, message in batch])
+        except Exception as e:
+            errors = [e] * len(batch)
+        finally:
+            heartbeat.cancel()
+        elapsed = time.perf_counter() - started
+        self.batches += 1
+
+        for (outbox_id, attempts, message), error in zip(batch, errors):
+            if error is not None:
+                self.failed_attempts += 1
+                # Recipient and provider text stay in the row's last_error column, not in the metrics
+                self.last_error = f"#{outbox_id} ({message['kind']}): {type(error).__name__}"
+                print(f"Email outbox: delivery of #{outbox_id} failed (attempt {attempts}/{self.max_attempts}): {str(error)}")
+                throttled = is_quota_error(error)
+                if throttled:
+                    self.quota.note_provider_throttle(error)
+                await asyncio.to_thread(self._mark_failed, outbox_id, attempts, str(error), throttled)
+            else:
+                self.sent += 1
+                self.total_delivery_seconds += elapsed / len(batch)
+                self.last_sent_at = datetime.now().isoformat()
+                await asyncio.to_thread(self._mark_sent, outbox_id)
+
+    async def _keep_locked(self, outbox_ids: List[int]) -> None:
+        """Refresh locked_at while a send is in progress, so a slow send is not
+        mistaken for an abandoned one and sent a second time"""
+        interval = max(self.lock_timeout_seconds / 3, 1.0)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self._refresh_locks, outbox_ids)
+            except Exception as e:
+                print(f"Email outbox: could not refresh lock of {outbox_ids}: {str(e)}")
+
+    def _refresh_locks(self, outbox_ids: List[int]) -> None:
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_(outbox_ids))
+                .where(EmailOutbox.status == "sending")
+                .values(locked_at=get_local_time())
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _retry_delay(self, attempts: int) -> float:
+        """Exponential backoff with +/-20% jitter so failed messages do not retry in lockstep"""
+        delay = min(self.retry_base_seconds * (2 ** (attempts - 1)), self.retry_max_seconds)
+        return delay * random.uniform(0.8, 1.2)
+
+    def _mark_sent(self, outbox_id: int) -> None:
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id == outbox_id)
+                .values(status="sent", sent_at=get_local_time(), locked_at=None, last_error=None)
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _mark_failed(self, outbox_id: int, attempts: int, error: str, throttled: bool = False) -> None:
+        db = SessionLocal()
+        try:
+            if throttled:
+                throttled_attempts = (db.execute(
+                    select(EmailOutbox.throttled_attempts).where(EmailOutbox.id == outbox_id)
+                ).scalar() or 0) + 1
+            if throttled and throttled_attempts >= self.max_throttled_attempts:
+                values = {"status": "dead", "locked_at": None, "last_error": error, "attempts": attempts - 1, "throttled_attempts": throttled_attempts}
+                self.dead_lettered += 1
+                print(f"Email outbox: #{outbox_id} dead-lettered after {throttled_attempts} throttled attempts")
+            elif throttled:
+                # Over the provider's quota - not the message's fault, so the attempt does not count
+                next_attempt_at = get_local_time() + timedelta(seconds=self.quota.cooldown_seconds)
+                values = {
+                    "status": "pending", "locked_at": None, "last_error": error,
+                    "next_attempt_at": next_attempt_at, "attempts": attempts - 1,
+                    "throttled_attempts": throttled_attempts,
+                }
+                self.throttled += 1
+            elif attempts >= self.max_attempts:
+                values = {"status": "dead", "locked_at": None, "last_error": error}
+                self.dead_lettered += 1
+                print(f"Email outbox: #{outbox_id} dead-lettered after {attempts} attempts")
+            else:
+                next_attempt_at = get_local_time() + timedelta(seconds=self._retry_delay(attempts))
+                values = {"status": "pending", "locked_at": None, "last_error": error, "next_attempt_at": next_attempt_at}
+                self.retries_scheduled += 1
+            db.execute(update(EmailOutbox).where(EmailOutbox.id == outbox_id).values(**values))
+            db.commit()
+        finally:
+            db.close()
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop polling and give in-flight sends `timeout` seconds to finish.
+
+        Anything still unfinished stays in "sending" and is retried after the lock timeout.
+        """
+        if self._task is None:
+            return
+        if timeout is None:
+            timeout = _env_number("EMAIL_OUTBOX_SHUTDOWN_SECONDS", 10.0, float)
+        self._stopping = True
+        self.notify()
+        try:
+            await asyncio.wait_for(self._task, timeout=timeout)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+        self._task = None
+        if self._in_flight:
+            done, pending = await asyncio.wait(set(self._in_flight), timeout=timeout)
+            for task in pending:
+                task.cancel()
+
+    def get_stats(self) -> dict:
+        """Throughput and failure counters, plus outbox row counts by status"""
+        db = SessionLocal()
+        try:
+            by_status = dict(db.execute(select(EmailOutbox.status, func.count()).group_by(EmailOutbox.status)).all())
+            pending_by_priority = dict(db.execute(
+                select(EmailOutbox.priority, func.count())
+                .where(EmailOutbox.status == "pending")
+                .group_by(EmailOutbox.priority)
+            ).all())
+            oldest_pending = db.execute(
+                select(func.min(EmailOutbox.created_at)).where(EmailOutbox.status == "pending")
+            ).scalar()
+        finally:
+            db.close()
+        uptime = time.monotonic() - self.started_at if self.started_at else None
+        return {
+            "running": self._task is not None,
+            "concurrency": self.concurrency,
+            "batch_size": self.batch_size,
+            "in_flight_batches": len(self._in_flight),
+            "claimed": self.claimed,
+            "sent": self.sent,
+            "batches": self.batches,
+            "failed_attempts": self.failed_attempts,
+            "retries_scheduled": self.retries_scheduled,
+            "dead_lettered": self.dead_lettered,
+            "throttled": self.throttled,
+            "recovered": self.recovered,
+            "sent_per_minute": round(self.sent / uptime * 60, 2) if uptime else None,
+            "avg_delivery_seconds": round(self.total_delivery_seconds / self.sent, 4) if self.sent else None,
+            "last_sent_at": self.last_sent_at,
+            "last_error": self.last_error,
+            "queue": {
+                "pending": by_status.get("pending", 0),
+                "sending": by_status.get("sending", 0),
+                "sent": by_status.get("sent", 0),
+                "dead": by_status.get("dead", 0),
+                "pending_by_lane": {LANE_NAMES.get(priority, str(priority)): count for priority, count in pending_by_priority.items()},
+                "oldest_pending_at": oldest_pending.isoformat() if oldest_pending else None,
+            },
+        }
+
+
+# Lazy initialization - one worker per process
+_email_outbox = None
+
+def get_email_outbox() -> EmailOutboxWorker:
+    """Get or create email outbox worker instance"""
+    global _email_outbox
+    if _email_outbox is None:
+        _email_outbox = EmailOutboxWorker()
+    return _email_outbox
@@ -0,0 +1,228 @@
+import os
+import re
+import smtplib
+import threading
+import time
+from datetime import timedelta
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import func, or_, select
+
+from database import EmailOutbox, SessionLocal, get_local_time
+
+# Priority lanes, highest first. Lower number = sent first.
+LANE_USER = 0      # brochure, product profile and confirmation emails to the person who filled in a form
+LANE_SALES = 1     # lead notifications to the sales team
+LANE_INTERNAL = 2  # admin notifications and digests
+
+LANE_NAMES = {LANE_USER: "user", LANE_SALES: "sales", LANE_INTERNAL: "internal"}
+
+KIND_PRIORITIES = {
+    "brochure": LANE_USER,
+    "product_profile": LANE_USER,
+    "confirmation": LANE_USER,
+    "sales_notification": LANE_SALES,
+    "admin_notification": LANE_INTERNAL,
+    "admin_digest": LANE_INTERNAL,
+}
+
+# SMTP replies that mean "slow down" rather than "this message is bad": the reply
+# code must be one providers use for throttling and the text must name a sending
+# rate or quota, e.g. Gmail's "421 4.7.0 ... unusual rate of unsolicited mail" and
+# "550 5.4.5 Daily user sending limit exceeded", SES's "454 Throttling failure:
+# Maximum sending rate exceeded". Per-message failures such as "452 4.5.3 Too
+# many recipients" or a full mailbox do not match.
+_THROTTLE_SMTP_CODES = {421, 450, 451, 454, 550, 554}
+_QUOTA_TEXT = re.compile(
+    r"rate limit|rate-limit|throttl|unusual rate|maximum sending rate|too many (messages|emails|mails|connections)"
+    r"|(sending|daily|relay|message|submission) (rate|quota|limit)|submissionquotaexceeded|5\.4\.5",
+    re.IGNORECASE,
+)
+
+
+class ProviderThrottleError(RuntimeError):
+    """A transport's provider asked us to slow down (e.g. HTTP 429 from an email API)"""
+
+
+def _env_number(name: str, default, cast=int):
+    try:
+        return cast(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+def priority_for_kind(kind: str) -> int:
+    """Outbox lane for a message kind; unknown kinds are treated as internal"""
+    return KIND_PRIORITIES.get(kind, LANE_INTERNAL)
+
+
+def _smtp_replies(error: Exception):
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return list(error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return [(error.smtp_code, error.smtp_error)]
+    return []
+
+
+def is_quota_error(error: Exception) -> bool:
+    """True if the provider refused the send for rate or quota reasons (not because of the message)"""
+    if isinstance(error, ProviderThrottleError):
+        return True
+    for code, reply in _smtp_replies(error):
+        text = reply.decode("utf-8", errors="replace") if isinstance(reply, bytes) else str(reply)
+        if code in _THROTTLE_SMTP_CODES and _QUOTA_TEXT.search(text):
+            return True
+    return False
+
+
+class SendQuotaGovernor:
+    """Keeps outgoing mail under the provider's per-minute and per-day limits.
+
+    A token bucket refilled at `per_minute` tokens per minute (holding at most
+    `burst`) paces sends, and a rolling 24 hour count caps them at `per_day`.
+    The count is seeded from the outbox (`daily_count`), so it is shared with
+    other worker processes and survives restarts. A limit of 0 disables it.
+
+    Lower-priority lanes are deferred before the quota runs out. Internal and
+    sales mail only take a token while more than `reserve` of the bucket and of
+    the daily quota is left. The rest is kept for user-facing emails. When the
+    provider itself reports a rate or quota error, every lane pauses for
+    `cooldown_seconds`. Time comes from `clock` (monotonic seconds).
+    """
+
+    def __init__(
+        self,
+        per_minute: Optional[float] = None,
+        per_day: Optional[int] = None,
+        burst: Optional[float] = None,
+        reserve: Optional[float] = None,
+        cooldown_seconds: Optional[float] = None,
+        daily_count: Optional[Callable[[], int]] = None,
+        daily_count_refresh_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.per_minute = max(per_minute if per_minute is not None else _env_number("EMAIL_RATE_PER_MINUTE", 0.0, float), 0.0)
+        self.per_day = max(per_day if per_day is not None else _env_number("EMAIL_RATE_PER_DAY", 0), 0)
+        self.burst = max(burst if burst is not None else _env_number("EMAIL_RATE_BURST", self.per_minute, float), 1.0)
+        reserve = reserve if reserve is not None else _env_number("EMAIL_QUOTA_RESERVE_PERCENT", 20.0, float) / 100
+        self.reserve = min(max(reserve, 0.0), 1.0)
+        self.cooldown_seconds = cooldown_seconds if cooldown_seconds is not None else _env_number("EMAIL_QUOTA_COOLDOWN_SECONDS", 300.0, float)
+        self.daily_count = daily_count
+        self.daily_count_refresh_seconds = daily_count_refresh_seconds
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._refilled_at = self.clock()
+        self._sent_today = 0
+        self._counted_at: Optional[float] = None
+        self._paused_until = 0.0
+
+        # Counters
+        self.granted: Dict[str, int] = {name: 0 for name in LANE_NAMES.values()}
+        self.deferred: Dict[str, int] = {name: 0 for name in LANE_NAMES.values()}
+        self.provider_throttles = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.per_minute > 0 or self.per_day > 0
+
+    def _refill(self, now: float) -> None:
+        if self.per_minute > 0:
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.per_minute / 60)
+        self._refilled_at = now
+
+    def _refresh_daily(self, now: float) -> None:
+        """Re-read the rolling 24 hour count now and then, so other processes' sends are included"""
+        if self.per_day <= 0 or self.daily_count is None:
+            return
+        if self._counted_at is None or now - self._counted_at >= self.daily_count_refresh_seconds:
+            self._sent_today = self.daily_count()
+            self._counted_at = now
+
+    def try_acquire(self, priority: int) -> bool:
+        """Take one send slot for a message in lane `priority`; False means defer it"""
+        lane = LANE_NAMES.get(priority, "internal")
+        now = self.clock()
+        with self._lock:
+            if now < self._paused_until:
+                self.deferred[lane] += 1
+                return False
+            if not self.enabled:
+                self.granted[lane] += 1
+                return True
+            self._refill(now)
+            self._refresh_daily(now)
+            # User-facing mail may use the whole quota, other lanes stop at the reserve
+            floor = 0.0 if priority <= LANE_USER else self.reserve
+            if self.per_minute > 0 and self._tokens - 1 < self.burst * floor:
+                self.deferred[lane] += 1
+                return False
+            if self.per_day > 0 and self._sent_today + 1 > self.per_day * (1 - floor):
+                self.deferred[lane] += 1
+                return False
+            if self.per_minute > 0:
+                self._tokens -= 1
+            self._sent_today += 1
+            self.granted[lane] += 1
+            return True
+
+    def release(self) -> None:
+        """Return a slot that was acquired but not used (e.g. the row was claimed elsewhere)"""
+        with self._lock:
+            if self.per_minute > 0:
+                self._tokens = min(self.burst, self._tokens + 1)
+            self._sent_today = max(self._sent_today - 1, 0)
+
+    def note_provider_throttle(self, error: Exception) -> None:
+        """The server rejected a send for rate or quota reasons - pause all lanes"""
+        with self._lock:
+            self.provider_throttles += 1
+            self._paused_until = self.clock() + self.cooldown_seconds
+            # Whatever we believed, the provider says the bucket is empty
+            self._tokens = 0.0
+        print(f"Email quota: provider throttled sending ({str(error)}), pausing for {self.cooldown_seconds:g}s")
+
+    def get_stats(self) -> dict:
+        now = self.clock()
+        with self._lock:
+            self._refill(now)
+            return {
+                "enabled": self.enabled,
+                "per_minute": self.per_minute,
+                "per_day": self.per_day,
+                "burst": self.burst,
+                "reserve_percent": round(self.reserve * 100, 1),
+                "tokens": round(self._tokens, 2) if self.per_minute > 0 else None,
+                "sent_last_24h": self._sent_today if self.per_day > 0 else None,
+                "paused_for_seconds": round(max(self._paused_until - now, 0.0), 1),
+                "provider_throttles": self.provider_throttles,
+                "granted": dict(self.granted),
+                "deferred": dict(self.deferred),
+            }
+
+
+def outbox_daily_count() -> int:
+    """Outbox messages sent or being sent in the last 24 hours"""
+    since = get_local_time() - timedelta(days=1)
+    db = SessionLocal()
+    try:
+        return db.execute(
+            select(func.count()).select_from(EmailOutbox).where(or_(
+                EmailOutbox.sent_at >= since,
+                (EmailOutbox.status == "sending") & (EmailOutbox.locked_at >= since),
+            ))
+        ).scalar() or 0
+    finally:
+        db.close()
+
+
+# Lazy initialization - one governor per process
+_send_quota = None
+
+def get_send_quota() -> SendQuotaGovernor:
+    """Get or create send quota governor instance"""
+    global _send_quota
+    if _send_quota is None:
+        _send_quota = SendQuotaGovernor(daily_count=outbox_daily_count)
+    return _send_quota
@@ -0,0 +1,448 @@
+import copy
+import io
+import os
+import re
+import smtplib
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from email.generator import BytesGenerator
+from email.utils import getaddresses
+from typing import Callable, Dict, List, Optional, Tuple
+
+from services.email_metrics import get_email_stage_metrics
+
+SMTP_TIMEOUT_SECONDS = 30
+
+
+def _env_number(name: str, default, cast=int):
+    try:
+        return cast(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+def _timed_connection(host: str, port: int, timeout, source_address) -> socket.socket:
+    """socket.create_connection with DNS resolution and the TCP connect timed as separate stages"""
+    metrics = get_email_stage_metrics()
+    with metrics.stage("dns"):
+        addresses = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+    error = None
+    with metrics.stage("connect"):
+        for _, _, _, _, address in addresses:
+            try:
+                return socket.create_connection((address[0], port), timeout, source_address)
+            except OSError as e:
+                error = e
+    raise error or OSError(f"Could not connect to {host}:{port}")
+
+
+class _TimedSMTP(smtplib.SMTP):
+    connected_at = None  # when the socket was ready; the server greeting follows
+
+    def _get_socket(self, host, port, timeout):
+        if timeout is not None and not timeout:
+            raise ValueError("Non-blocking socket (timeout=0) is not supported")
+        sock = _timed_connection(host, port, timeout, self.source_address)
+        self.connected_at = time.perf_counter()
+        return sock
+
+
+class _TimedSMTP_SSL(smtplib.SMTP_SSL):
+    connected_at = None
+
+    def _get_socket(self, host, port, timeout):
+        if timeout is not None and not timeout:
+            raise ValueError("Non-blocking socket (timeout=0) is not supported")
+        sock = _timed_connection(host, port, timeout, self.source_address)
+        with get_email_stage_metrics().stage("tls"):
+            sock = self.context.wrap_socket(sock, server_hostname=self._host)
+        self.connected_at = time.perf_counter()
+        return sock
+
+
+class PooledConnection:
+    """An authenticated SMTP session plus the bookkeeping the pool needs"""
+
+    def __init__(self, server: smtplib.SMTP):
+        self.server = server
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.messages_sent = 0
+
+    def idle_seconds(self) -> float:
+        return time.monotonic() - self.last_used
+
+
+class SMTPConnectionPool:
+    """Bounded pool of logged-in SMTP sessions reused across sends.
+
+    At most `max_size` sessions exist at once; callers block (up to
+    `acquire_timeout`) when all of them are busy. Idle sessions are closed
+    after `idle_timeout` seconds, sessions are retired after `max_messages`
+    sends, and a session idle for longer than `noop_interval` is probed with
+    NOOP before reuse. Port 465 uses SMTP_SSL, anything else plain SMTP with
+    optional STARTTLS.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        use_tls: bool = True,
+        max_size: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        max_messages: Optional[int] = None,
+        noop_interval: Optional[float] = None,
+        acquire_timeout: Optional[float] = None,
+        pipelining: Optional[bool] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.max_size = max(max_size if max_size is not None else _env_number("EMAIL_POOL_SIZE", 3), 1)
+        self.idle_timeout = idle_timeout if idle_timeout is not None else _env_number("EMAIL_POOL_IDLE_TIMEOUT", 60.0, float)
+        self.max_messages = max(max_messages if max_messages is not None else _env_number("EMAIL_POOL_MAX_MESSAGES", 100), 1)
+        self.noop_interval = noop_interval if noop_interval is not None else _env_number("EMAIL_POOL_NOOP_INTERVAL", 10.0, float)
+        self.acquire_timeout = acquire_timeout if acquire_timeout is not None else _env_number("EMAIL_POOL_ACQUIRE_TIMEOUT", 60.0, float)
+        self.pipelining = pipelining if pipelining is not None else os.getenv("EMAIL_SMTP_PIPELINING", "true").lower() == "true"
+
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self._idle: List[PooledConnection] = []
+        self._closed = False
+
+        # Counters
+        self.connections_opened = 0
+        self.connections_closed = 0
+        self.reuses = 0
+        self.reconnects = 0
+        self.noop_failures = 0
+        self.messages_sent = 0
+        self.pipelined_messages = 0
+        self.batches = 0
+        self.in_use = 0
+
+    def _connect(self) -> PooledConnection:
+        """Open, secure and authenticate a new session (each step timed as a delivery stage)"""
+        metrics = get_email_stage_metrics()
+        if self.port == 465:
+            print(f"Opening SMTP_SSL connection to {self.host}:{self.port}")
+            server = _TimedSMTP_SSL(self.host, self.port, timeout=SMTP_TIMEOUT_SECONDS)
+        else:
+            print(f"Opening SMTP connection to {self.host}:{self.port} (STARTTLS: {self.use_tls})")
+            server = _TimedSMTP(self.host, self.port, timeout=SMTP_TIMEOUT_SECONDS)
+        if server.connected_at is not None:
+            metrics.record("greeting", time.perf_counter() - server.connected_at)
+        try:
+            if self.port != 465 and self.use_tls:
+                with metrics.stage("tls"):
+                    server.starttls()
+            with metrics.stage("auth"):
+                server.login(self.username, self.password)
+        except Exception:
+            self._close_server(server)
+            raise
+        with self._lock:
+            self.connections_opened += 1
+        return PooledConnection(server)
+
+    @staticmethod
+    def _close_server(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def _discard(self, conn: PooledConnection) -> None:
+        self._close_server(conn.server)
+        with self._lock:
+            self.connections_closed += 1
+
+    def _is_alive(self, conn: PooledConnection) -> bool:
+        """NOOP probe for sessions that sat idle long enough for the server to drop them"""
+        if conn.idle_seconds() < self.noop_interval:
+            return True
+        try:
+            code, _ = conn.server.noop()
+            return code == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def acquire(self) -> PooledConnection:
+        """Check out a live session, reusing an idle one when possible"""
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise TimeoutError(f"No SMTP connection available within {self.acquire_timeout}s")
+        try:
+            while True:
+                with self._lock:
+                    if self._closed:
+                        raise RuntimeError("SMTP connection pool is closed")
+                    # Most recently used first - the one least likely to have timed out
+                    conn = self._idle.pop() if self._idle else None
+                if conn is None:
+                    conn = self._connect()
+                    break
+                if conn.idle_seconds() > self.idle_timeout:
+                    self._discard(conn)
+                    continue
+                if not self._is_alive(conn):
+                    with self._lock:
+                        self.noop_failures += 1
+                    self._discard(conn)
+                    continue
+                with self._lock:
+                    self.reuses += 1
+                break
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.in_use += 1
+        return conn
+
+    def release(self, conn: PooledConnection, discard: bool = False) -> None:
+        """Return a session to the pool, or close it if it is broken or used up"""
+        conn.last_used = time.monotonic()
+        retire = discard or conn.messages_sent >= self.max_messages
+        with self._lock:
+            self.in_use -= 1
+            if not retire and not self._closed:
+                self._idle.append(conn)
+                conn = None
+        if conn is not None:
+            self._discard(conn)
+        self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """`with pool.connection() as conn:` - discards the session if the block raises"""
+        conn = self.acquire()
+        try:
+            yield conn
+        except BaseException:
+            self.release(conn, discard=True)
+            raise
+        else:
+            self.release(conn)
+
+    @staticmethod
+    def _envelope(msg) -> Tuple[str, List[str], bytes]:
+        """Sender, recipients and wire bytes for a message, the way smtplib.send_message derives them"""
+        sender = msg["Sender"] or msg["From"]
+        from_addr = getaddresses([sender])[0][1] if sender else ""
+        to_addrs = [addr for _, addr in getaddresses(msg.get_all("To", []) + msg.get_all("Cc", []) + msg.get_all("Bcc", [])) if addr]
+        msg_copy = copy.copy(msg)
+        del msg_copy["Bcc"]
+        del msg_copy["Resent-Bcc"]
+        with io.BytesIO() as buffer:
+            BytesGenerator(buffer).flatten(msg_copy, linesep="\r\n")
+            data = buffer.getvalue()
+        return from_addr, to_addrs, data
+
+    @staticmethod
+    def _reset(server: smtplib.SMTP) -> None:
+        try:
+            server.rset()
+        except smtplib.SMTPServerDisconnected:
+            pass
+
+    def _send_pipelined(self, server: smtplib.SMTP, msg) -> None:
+        """MAIL, RCPT and DATA in one write, then the replies (RFC 2920).
+
+        Saves two round trips per recipient compared to smtplib, which waits for
+        each reply before sending the next command. Raises the same exceptions as
+        smtplib.SMTP.send_message.
+        """
+        from_addr, to_addrs, data = self._envelope(msg)
+        mail_options = f" SIZE={len(data)}" if server.has_extn("size") else ""
+        commands = [f"MAIL FROM:<{from_addr}>{mail_options}"]
+        commands += [f"RCPT TO:<{addr}>" for addr in to_addrs]
+        commands.append("DATA")
+        server.send("".join(f"{command}\r\n" for command in commands))
+
+        mail_code, mail_resp = server.getreply()
+        refused = {}
+        for addr in to_addrs:
+            code, resp = server.getreply()
+            if code not in (250, 251):
+                refused[addr] = (code, resp)
+        data_code, data_resp = server.getreply()
+
+        if data_code == 354 and (mail_code != 250 or len(refused) == len(to_addrs)):
+            # The server accepted DATA anyway - end it empty, then discard the transaction
+            server.send(".\r\n")
+            server.getreply()
+        if mail_code != 250:
+            if mail_code == 421:
+                server.close()
+            else:
+                self._reset(server)
+            raise smtplib.SMTPSenderRefused(mail_code, mail_resp, from_addr)
+        if len(refused) == len(to_addrs):
+            self._reset(server)
+            raise smtplib.SMTPRecipientsRefused(refused)
+        if data_code != 354:
+            self._reset(server)
+            raise smtplib.SMTPDataError(data_code, data_resp)
+
+        payload = re.sub(rb"(?m)^\.", b"..", data)
+        if not payload.endswith(b"\r\n"):
+            payload += b"\r\n"
+        server.send(payload + b".\r\n")
+        code, resp = server.getreply()
+        if code != 250:
+            if code == 421:
+                server.close()
+            else:
+                self._reset(server)
+            raise smtplib.SMTPDataError(code, resp)
+
+    def _send_on(self, conn: PooledConnection, msg) -> None:
+        """Send one message on a checked-out session, pipelined when the server advertises it"""
+        server = conn.server
+        if self.pipelining and server.does_esmtp and server.has_extn("pipelining") and not server.has_extn("smtputf8"):
+            self._send_pipelined(server, msg)
+            with self._lock:
+                self.pipelined_messages += 1
+        else:
+            server.send_message(msg)
+        conn.messages_sent += 1
+        with self._lock:
+            self.messages_sent += 1
+
+    def send_message(self, msg) -> None:
+        """Send one message, reconnecting once if the server dropped the session"""
+        error = self.send_messages([msg])[0]
+        if error is not None:
+            raise error
+
+    def send_messages(self, messages: list, before_send: Optional[Callable[[int], None]] = None) -> List[Optional[Exception]]:
+        """Send several messages over one pooled session.
+
+        Returns one entry per message, in order: None if it was sent, otherwise
+        the exception. A message the server refuses does not stop the batch. If
+        the session drops, the pool reconnects once and carries on with the
+        remaining messages. `before_send(index)` is called before each message
+        is started (used to attribute stage timings to it).
+        """
+        metrics = get_email_stage_metrics()
+        results: List[Optional[Exception]] = []
+        conn: Optional[PooledConnection] = None
+        reconnected = False
+        if len(messages) > 1:
+            with self._lock:
+                self.batches += 1
+        try:
+            for index, msg in enumerate(messages):
+                if before_send is not None:
+                    before_send(index)
+                while True:
+                    if conn is None:
+                        try:
+                            with metrics.stage("acquire"):
+                                conn = self.acquire()
+                        except Exception as e:
+                            results.append(e)
+                            break
+                    try:
+                        with metrics.stage("data"):
+                            self._send_on(conn, msg)
+                    except smtplib.SMTPServerDisconnected as e:
+                        self.release(conn, discard=True)
+                        conn = None
+                        if reconnected:
+                            results.append(e)
+                            break
+                        reconnected = True
+                        with self._lock:
+                            self.reconnects += 1
+                        print("SMTP server closed the pooled connection, reconnecting...")
+                        continue
+                    except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+                        # The server rejected this message but the session is still usable,
+                        # unless it is shutting the channel (421)
+                        if getattr(e, "smtp_code", None) == 421:
+                            self.release(conn, discard=True)
+                            conn = None
+                        results.append(e)
+                        break
+                    except Exception as e:
+                        self.release(conn, discard=True)
+                        conn = None
+                        results.append(e)
+                        break
+                    results.append(None)
+                    break
+        except BaseException:
+            if conn is not None:
+                self.release(conn, discard=True)
+                conn = None
+            raise
+        finally:
+            if conn is not None:
+                self.release(conn)
+        return results
+
+    def close(self) -> None:
+        """Close every idle session and refuse new checkouts (used on shutdown)"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._discard(conn)
+
+    def get_stats(self) -> dict:
+        """Counters for monitoring"""
+        with self._lock:
+            return {
+                "host": self.host,
+                "port": self.port,
+                "max_size": self.max_size,
+                "idle": len(self._idle),
+                "in_use": self.in_use,
+                "connections_opened": self.connections_opened,
+                "connections_closed": self.connections_closed,
+                "reuses": self.reuses,
+                "reconnects": self.reconnects,
+                "noop_failures": self.noop_failures,
+                "messages_sent": self.messages_sent,
+                "pipelined_messages": self.pipelined_messages,
+                "batches": self.batches,
+            }
+
+
+# One pool per SMTP account, shared by every EmailService in this process
+_pools: Dict[Tuple[str, int, str], SMTPConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+def get_smtp_pool(host: str, port: int, username: str, password: str, use_tls: bool = True) -> SMTPConnectionPool:
+    """Get or create the connection pool for this server and account"""
+    key = (host, port, username)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = SMTPConnectionPool(host, port, username, password, use_tls)
+            _pools[key] = pool
+        return pool
+
+def close_smtp_pools() -> None:
+    """Close every pooled SMTP session"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+def get_smtp_pool_stats() -> List[dict]:
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.get_stats() for pool in pools]
@@ -0,0 +1,20 @@
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# database.py creates its engine from DATABASE_URL at import time, so point it at
+# a throwaway SQLite file before any app module is imported
+_db_dir = tempfile.mkdtemp(prefix="spars-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{Path(_db_dir) / 'test.db'}"
+
+from database import Base, engine  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_database():
+    """Every test starts with empty tables"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
@@ -0,0 +1,91 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from services.export_scheduler import ExportScheduler
+
+
+class StubExcelService:
+    """Stands in for ExcelService: counts exports and can hold one open until released"""
+
+    filename = "stub.xlsx"
+
+    def __init__(self, excel_dir: Path):
+        self.excel_dir = excel_dir
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+        self._lock = threading.Lock()
+
+    def export_all_forms(self, db, full_rebuild: bool = False) -> str:
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        self.started.set()
+        self.release.wait(timeout=5)
+        with self._lock:
+            self.active -= 1
+        return str(self.excel_dir / self.filename)
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def stub(tmp_path, monkeypatch):
+    monkeypatch.setenv("EXCEL_EXPORT_EXECUTOR", "thread")
+    return StubExcelService(tmp_path)
+
+
+def test_triggers_inside_the_window_produce_one_run(stub):
+    scheduler = ExportScheduler(excel_service=stub, window_seconds=0.2)
+    assert scheduler.executor_kind == "thread"
+
+    for _ in range(10):
+        scheduler.trigger()
+
+    assert wait_for(lambda: scheduler.runs == 1)
+    # Nothing left over for a second run
+    time.sleep(0.4)
+    assert stub.calls == 1
+    stats = scheduler.get_stats()
+    assert stats["triggers"] == 10
+    assert stats["coalesced"] == 9
+    assert stats["last_batch_size"] == 10
+    assert stats["pending_triggers"] == 0
+
+
+def test_run_now_waits_for_the_running_export(stub):
+    scheduler = ExportScheduler(excel_service=stub, window_seconds=0)
+    stub.release.clear()
+    scheduler.trigger()
+    assert stub.started.wait(timeout=5)
+
+    result = {}
+    waiter = threading.Thread(target=lambda: result.setdefault("path", scheduler.run_now()))
+    waiter.start()
+    time.sleep(0.3)
+    # run_now is queued behind the running export, not started alongside it
+    assert stub.calls == 1
+    assert waiter.is_alive()
+
+    stub.release.set()
+    waiter.join(timeout=5)
+    assert not waiter.is_alive()
+    assert stub.max_active == 1
+    # It then exports once more so the workbook includes rows saved meanwhile
+    assert stub.calls == 2
+    assert result["path"] == str(stub.excel_dir / stub.filename)
+    assert scheduler.get_stats()["runs"] == 2
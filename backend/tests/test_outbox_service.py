@@ -0,0 +1,217 @@
+import asyncio
+import smtplib
+import threading
+from datetime import timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import Select, update
+
+import services.outbox_service as outbox_service
+from database import EmailOutbox, SessionLocal, get_local_time
+from services.email_service import EmailService
+from services.email_transports import MemorySink, MemoryTransport
+from services.outbox_service import EmailOutboxWorker, enqueue_email
+from services.send_quota import SendQuotaGovernor
+
+
+class FailingTransport(MemoryTransport):
+    """MemoryTransport that refuses every message with the same error"""
+
+    def __init__(self, service, error: Exception):
+        super().__init__(service, sink=MemorySink())
+        self.error = error
+
+    def send_messages(self, messages):
+        return self._count([self.error] * len(messages))
+
+
+class StaleSelectSession:
+    """Session whose first SELECT answers with rows as they were before another
+    worker claimed them - the window between _claim_due's SELECT and UPDATE"""
+
+    def __init__(self, stale_rows: list):
+        self._session = SessionLocal()
+        self._stale_rows = stale_rows
+
+    def execute(self, statement, *args, **kwargs):
+        if self._stale_rows is not None and isinstance(statement, Select):
+            rows, self._stale_rows = self._stale_rows, None
+            return SimpleNamespace(all=lambda: rows)
+        return self._session.execute(statement, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+def make_worker(error: Exception = None, **kwargs) -> EmailOutboxWorker:
+    service = EmailService()
+    service._transport = FailingTransport(service, error) if error else MemoryTransport(service, sink=MemorySink())
+    kwargs.setdefault("quota", SendQuotaGovernor(per_minute=0, per_day=0))
+    return EmailOutboxWorker(email_service=service, **kwargs)
+
+
+def enqueue(count: int = 1, kind: str = "brochure") -> list:
+    db = SessionLocal()
+    try:
+        rows = [
+            enqueue_email(db, {"kind": kind, "to_email": f"lead{i}@example.com", "subject": "Your brochure", "body": "Thanks"})
+            for i in range(count)
+        ]
+        db.commit()
+        return [row.id for row in rows]
+    finally:
+        db.close()
+
+
+def get_row(outbox_id: int) -> EmailOutbox:
+    db = SessionLocal()
+    try:
+        return db.get(EmailOutbox, outbox_id)
+    finally:
+        db.close()
+
+
+def set_row(outbox_id: int, **values) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(update(EmailOutbox).where(EmailOutbox.id == outbox_id).values(**values))
+        db.commit()
+    finally:
+        db.close()
+
+
+def deliver_due(worker: EmailOutboxWorker) -> list:
+    batch = worker._claim_due(10)
+    if batch:
+        asyncio.run(worker._deliver(batch))
+    return batch
+
+
+def test_sent_message_is_marked_sent():
+    [outbox_id] = enqueue()
+    worker = make_worker()
+
+    deliver_due(worker)
+
+    row = get_row(outbox_id)
+    assert row.status == "sent"
+    assert row.attempts == 1
+    assert row.sent_at is not None
+    assert worker.email_service._transport.sink.received == 1
+
+
+def test_failed_send_is_retried_with_backoff():
+    [outbox_id] = enqueue()
+    worker = make_worker(smtplib.SMTPResponseException(451, b"4.3.0 Temporary server error"), retry_base_seconds=60, max_attempts=3)
+
+    before = get_local_time()
+    deliver_due(worker)
+    after = get_local_time()
+
+    row = get_row(outbox_id)
+    assert row.status == "pending"
+    assert row.attempts == 1
+    assert row.locked_at is None
+    assert "Temporary server error" in row.last_error
+    # 60s for the first retry, +/-20% jitter
+    assert before + timedelta(seconds=48) <= row.next_attempt_at <= after + timedelta(seconds=72)
+    assert worker.retries_scheduled == 1
+    # Not due yet
+    assert worker._claim_due(10) == []
+
+
+def test_metrics_error_does_not_expose_recipient_or_provider_text():
+    [outbox_id] = enqueue()
+    worker = make_worker(smtplib.SMTPResponseException(550, b"5.1.1 <lead0@example.com> User unknown"))
+
+    deliver_due(worker)
+
+    assert worker.last_error == f"#{outbox_id} (brochure): SMTPResponseException"
+    assert "lead0@example.com" in get_row(outbox_id).last_error
+
+
+def test_row_is_dead_lettered_after_max_attempts():
+    [outbox_id] = enqueue()
+    worker = make_worker(smtplib.SMTPResponseException(451, b"4.3.0 Temporary server error"), max_attempts=2)
+
+    for _ in range(2):
+        assert deliver_due(worker)
+        # Skip the backoff
+        set_row(outbox_id, next_attempt_at=get_local_time() - timedelta(seconds=1))
+
+    row = get_row(outbox_id)
+    assert row.status == "dead"
+    assert row.attempts == 2
+    assert worker.dead_lettered == 1
+    assert worker._claim_due(10) == []
+
+
+def test_stale_sending_row_is_recovered():
+    stale_id, fresh_id = enqueue(2)
+    now = get_local_time()
+    set_row(stale_id, status="sending", attempts=1, locked_at=now - timedelta(seconds=600))
+    set_row(fresh_id, status="sending", attempts=1, locked_at=now)
+    worker = make_worker(lock_timeout_seconds=300)
+
+    batch = worker._claim_due(10)
+
+    assert [(outbox_id, attempts) for outbox_id, attempts, _ in batch] == [(stale_id, 2)]
+    assert worker.recovered == 1
+    assert get_row(fresh_id).status == "sending"
+
+
+def test_lock_is_refreshed_while_sending():
+    [outbox_id] = enqueue()
+    worker = make_worker(lock_timeout_seconds=3)
+    set_row(outbox_id, status="sending", attempts=1, locked_at=get_local_time() - timedelta(seconds=60))
+
+    async def keep_locked_briefly():
+        heartbeat = asyncio.create_task(worker._keep_locked([outbox_id]))
+        await asyncio.sleep(1.5)
+        heartbeat.cancel()
+
+    asyncio.run(keep_locked_briefly())
+
+    assert get_local_time() - get_row(outbox_id).locked_at < timedelta(seconds=3)
+    assert worker._claim_due(10) == []
+
+
+def test_racing_workers_never_claim_the_same_row():
+    ids = enqueue(60)
+    workers = [make_worker(), make_worker()]
+    claimed = [[], []]
+    barrier = threading.Barrier(len(workers))
+
+    def drain(index: int) -> None:
+        barrier.wait()
+        while True:
+            batch = workers[index]._claim_due(7)
+            if not batch:
+                break
+            claimed[index].extend(outbox_id for outbox_id, _, _ in batch)
+
+    threads = [threading.Thread(target=drain, args=(index,)) for index in range(len(workers))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not set(claimed[0]) & set(claimed[1])
+    assert sorted(claimed[0] + claimed[1]) == ids
+    assert all(get_row(outbox_id).attempts == 1 for outbox_id in ids)
+
+
+def test_row_claimed_after_select_is_left_to_the_other_worker(monkeypatch):
+    ids = enqueue(3)
+    other = make_worker()
+    worker = make_worker(quota=SendQuotaGovernor(per_minute=0, per_day=100))
+    stale_candidates = [(outbox_id, get_row(outbox_id).priority) for outbox_id in ids]
+    assert len(other._claim_due(10)) == 3
+
+    monkeypatch.setattr(outbox_service, "SessionLocal", lambda: StaleSelectSession(stale_candidates))
+    assert worker._claim_due(10) == []
+
+    assert worker.claimed == 0
+    assert all(get_row(outbox_id).attempts == 1 for outbox_id in ids)
+    # The send slots taken for the lost rows were handed back
+    assert worker.quota.get_stats()["sent_last_24h"] == 0
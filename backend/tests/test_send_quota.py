@@ -0,0 +1,148 @@
+import smtplib
+
+import pytest
+
+from database import EmailOutbox, SessionLocal
+from services.email_service import EmailService
+from services.outbox_service import EmailOutboxWorker, enqueue_email
+from services.send_quota import LANE_INTERNAL, LANE_SALES, LANE_USER, ProviderThrottleError, SendQuotaGovernor, is_quota_error
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def acquire_all(governor: SendQuotaGovernor, priority: int, limit: int = 100) -> int:
+    """Number of slots granted in a row before the governor defers"""
+    granted = 0
+    while granted < limit and governor.try_acquire(priority):
+        granted += 1
+    return granted
+
+
+def test_token_bucket_paces_sends():
+    clock = FakeClock()
+    governor = SendQuotaGovernor(per_minute=60, per_day=0, burst=5, reserve=0, clock=clock)
+
+    assert acquire_all(governor, LANE_USER) == 5
+    # One token per second
+    clock.advance(1)
+    assert acquire_all(governor, LANE_USER) == 1
+    clock.advance(2.5)
+    assert acquire_all(governor, LANE_USER) == 2
+    # Refill is capped at the burst
+    clock.advance(600)
+    assert acquire_all(governor, LANE_USER) == 5
+    assert governor.deferred["user"] == 4
+
+
+def test_lower_lanes_leave_the_reserve_to_user_mail():
+    clock = FakeClock()
+    governor = SendQuotaGovernor(per_minute=60, per_day=0, burst=10, reserve=0.2, clock=clock)
+
+    # Internal mail stops while 2 of the 10 tokens are left; user mail may use them
+    assert acquire_all(governor, LANE_INTERNAL) == 8
+    assert acquire_all(governor, LANE_SALES) == 0
+    assert acquire_all(governor, LANE_USER) == 2
+
+
+def test_daily_cap_counts_the_outbox_and_refreshes():
+    clock = FakeClock()
+    sent_last_24h = [5]
+    governor = SendQuotaGovernor(
+        per_minute=0, per_day=10, reserve=0.2, clock=clock,
+        daily_count=lambda: sent_last_24h[0], daily_count_refresh_seconds=60,
+    )
+
+    # 5 already sent; internal mail stops at 80% of the cap, user mail at 100%
+    assert acquire_all(governor, LANE_INTERNAL) == 3
+    assert acquire_all(governor, LANE_USER) == 2
+    assert governor.get_stats()["sent_last_24h"] == 10
+
+    # Older sends leave the window, but the count is only re-read once a minute
+    sent_last_24h[0] = 4
+    clock.advance(30)
+    assert acquire_all(governor, LANE_USER) == 0
+    clock.advance(31)
+    assert acquire_all(governor, LANE_USER) == 6
+
+
+def test_provider_throttle_pauses_every_lane():
+    clock = FakeClock()
+    governor = SendQuotaGovernor(per_minute=0, per_day=100, reserve=0, cooldown_seconds=300, clock=clock)
+
+    governor.note_provider_throttle(ProviderThrottleError("429"))
+    assert not governor.try_acquire(LANE_USER)
+    assert not governor.try_acquire(LANE_INTERNAL)
+    clock.advance(299)
+    assert not governor.try_acquire(LANE_USER)
+    clock.advance(1)
+    assert governor.try_acquire(LANE_USER)
+    assert governor.provider_throttles == 1
+
+
+def test_disabled_governor_grants_everything():
+    governor = SendQuotaGovernor(per_minute=0, per_day=0, clock=FakeClock())
+    assert not governor.enabled
+    assert acquire_all(governor, LANE_INTERNAL, limit=1000) == 1000
+
+
+def test_claim_due_defers_a_lane_once_it_is_over_quota():
+    db = SessionLocal()
+    try:
+        for kind, count in (("admin_notification", 8), ("sales_notification", 2), ("brochure", 3)):
+            for i in range(count):
+                enqueue_email(db, {"kind": kind, "to_email": f"{kind}{i}@example.com", "subject": "s", "body": "b"})
+        db.commit()
+    finally:
+        db.close()
+    # Half of the 10-token bucket is reserved for user-facing mail
+    governor = SendQuotaGovernor(per_minute=60, per_day=0, burst=10, reserve=0.5, clock=FakeClock())
+    worker = EmailOutboxWorker(email_service=EmailService(), quota=governor)
+
+    batch = worker._claim_due(20)
+
+    kinds = [message["kind"] for _, _, message in batch]
+    assert sorted(kinds) == ["brochure"] * 3 + ["sales_notification"] * 2
+    # The internal lane was tried once, then skipped for the rest of the drain
+    assert governor.deferred == {"user": 0, "sales": 0, "internal": 1}
+    db = SessionLocal()
+    try:
+        pending = db.query(EmailOutbox).filter(EmailOutbox.status == "pending").all()
+    finally:
+        db.close()
+    assert {row.kind for row in pending} == {"admin_notification"}
+    assert all(row.attempts == 0 for row in pending)
+
+
+@pytest.mark.parametrize("error", [
+    smtplib.SMTPResponseException(421, b"4.7.0 Our system has detected an unusual rate of unsolicited mail"),
+    smtplib.SMTPDataError(550, b"5.4.5 Daily user sending limit exceeded"),
+    smtplib.SMTPSenderRefused(454, b"Throttling failure: Maximum sending rate exceeded", "sales@example.com"),
+    smtplib.SMTPRecipientsRefused({"lead@example.com": (450, b"4.2.1 Rate limit exceeded, try again later")}),
+    ProviderThrottleError("SendGrid API error 429: rate limit exceeded"),
+])
+def test_provider_throttling_is_a_quota_error(error):
+    assert is_quota_error(error)
+
+
+@pytest.mark.parametrize("error", [
+    # Per-message failures that used to pause every lane and retry forever
+    smtplib.SMTPRecipientsRefused({"lead@example.com": (452, b"4.5.3 Too many recipients")}),
+    smtplib.SMTPDataError(452, b"4.5.3 Too many recipients"),
+    smtplib.SMTPResponseException(421, b"4.7.0 Try again later, closing connection. (EHLO) security policy"),
+    smtplib.SMTPDataError(552, b"5.2.2 The email account that you tried to reach is over quota"),
+    smtplib.SMTPRecipientsRefused({"lead@example.com": (550, b"5.1.1 User unknown")}),
+    # Only SMTP replies and ProviderThrottleError count, not any text that mentions a limit
+    RuntimeError("SendGrid API error 400: rate limit exceeded"),
+    ValueError("EMAIL_HOST is not set in environment variables"),
+])
+def test_other_failures_are_not_quota_errors(error):
+    assert not is_quota_error(error)